@@ -0,0 +1,303 @@
+#amfi.py
+
+import hashlib
+import io
+import logging
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+NAV_HISTORY_PATH = '/DownloadNAVHistoryReport_Po.aspx'
+NAV_HISTORY_URL = f'https://portal.amfiindia.com{NAV_HISTORY_PATH}'
+# Every scheme's most recent NAV in one file, published as soon as AMFI receives them
+LATEST_NAV_PATH = '/spages/NAVAll.txt'
+LATEST_NAV_URL = f'https://www.amfiindia.com{LATEST_NAV_PATH}'
+
+NavRow = namedtuple('NavRow', ['scheme_code', 'scheme_name', 'amc_name', 'nav', 'nav_date', 'isin_growth',
+                               'isin_reinvestment', 'repurchase_price', 'sale_price', 'scheme_type', 'category'],
+                    defaults=(None, None, None, None, None, None))
+
+# "Open Ended Schemes(Debt Scheme - Banking and PSU Fund)", "Interval Fund Schemes(Income)"
+SCHEME_HEADER = re.compile(r'^(?P<scheme_type>[A-Za-z ]+?)\s+Schemes?\s*\((?P<category>.*)\)$')
+ISIN = re.compile(r'^[A-Z]{2}[A-Z0-9]{9}[0-9]$')
+
+# Header names (lower-cased, without spaces) of the feeds' columns and the NavRow field each holds
+FEED_COLUMNS = {
+    'schemecode': 'scheme_code',
+    'schemename': 'scheme_name',
+    'isindivpayout/isingrowth': 'isin_growth',
+    'isindivreinvestment': 'isin_reinvestment',
+    'netassetvalue': 'nav',
+    'repurchaseprice': 'repurchase_price',
+    'saleprice': 'sale_price',
+    'date': 'nav_date',
+}
+# Column positions of the NAV history report, used until a header line says otherwise
+HISTORY_LAYOUT = {'scheme_code': 0, 'scheme_name': 1, 'isin_growth': 2, 'isin_reinvestment': 3, 'nav': 4,
+                  'repurchase_price': 5, 'sale_price': 6, 'nav_date': 7}
+
+NavDownload = namedtuple('NavDownload', ['file', 'checksum', 'size'])
+
+
+def feed_base_url():
+    """AMFI_FEED_BASE_URL (e.g. an amfi_standin server) that replaces AMFI's hosts, or None"""
+    base = getattr(settings, 'AMFI_FEED_BASE_URL', None)
+    return base.rstrip('/') if base else None
+
+
+def nav_history_url(date):
+    """Build the AMFI NAV history report URL for a single date"""
+    base = feed_base_url()
+    url = f'{base}{NAV_HISTORY_PATH}' if base else NAV_HISTORY_URL
+    return f"{url}?frmdt={date.strftime('%d-%b-%Y')}"
+
+
+def latest_nav_url():
+    base = feed_base_url()
+    return f'{base}{LATEST_NAV_PATH}' if base else LATEST_NAV_URL
+
+
+def build_session(pool_size=10):
+    """Create a requests session whose connection pool can serve pool_size concurrent downloads"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter for the given zero-based retry attempt"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class HostRateLimiter:
+    """Thread-safe limiter spacing requests to the same host at least 1/rate seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def parse_nav(value):
+    """Parse an AMFI NAV value, returning None for blanks and markers like 'N.A.'"""
+    try:
+        return Decimal(value.strip().replace(',', ''))
+    except (InvalidOperation, AttributeError):
+        return None
+
+
+def parse_scheme_header(line):
+    """(scheme type, SEBI category) from a section header line, or None for any other line"""
+    match = SCHEME_HEADER.match(line)
+    if not match:
+        return None
+    category = ' '.join(match.group('category').split())
+    return match.group('scheme_type').strip(), category or None
+
+
+def clean_isin(value):
+    """Upper-cased ISIN, or None for blanks, '-' and anything that is not a 12 character ISIN"""
+    value = (value or '').strip().upper()
+    return value if ISIN.match(value) else None
+
+
+def feed_layout(fields):
+    """NavRow field -> column position from a feed header line, or None if fields is not a header"""
+    layout = {}
+    for position, name in enumerate(fields):
+        field = FEED_COLUMNS.get(''.join(name.lower().split()))
+        if field:
+            layout[field] = position
+    return layout if {'scheme_code', 'scheme_name', 'nav', 'nav_date'} <= layout.keys() else None
+
+
+def parse_nav_date(value):
+    """Parse an AMFI dd-MMM-yyyy date, returning None when it is missing or malformed"""
+    try:
+        return datetime.strptime(value.strip(), '%d-%b-%Y').date() if value else None
+    except ValueError:
+        return None
+
+
+def open_feed(url, session=None, timeout=30):
+    """Open a streaming GET against an AMFI feed without reading the body"""
+    response = (session or requests).get(url, timeout=timeout, stream=True)
+    response.raise_for_status()
+    if not response.encoding:
+        response.encoding = 'utf-8'
+    return response
+
+
+def iter_feed_lines(response, chunk_size=64 * 1024):
+    """Yield decoded lines from a streaming response, one chunk in memory at a time"""
+    try:
+        for line in response.iter_lines(chunk_size=chunk_size, decode_unicode=True):
+            if isinstance(line, bytes):
+                line = line.decode(response.encoding or 'utf-8', errors='replace')
+            yield line
+    finally:
+        response.close()
+
+
+def read_header(lines):
+    """Return the column names from the first non-empty line of a feed"""
+    for line in lines:
+        line = line.strip()
+        if line:
+            return [key.strip() for key in line.split(';')]
+    return []
+
+
+def _column(fields, layout, name):
+    position = layout.get(name)
+    return fields[position] if position is not None else None
+
+
+def iter_nav_rows(lines):
+    """
+    Parse AMFI NAV history or latest-NAV lines into NavRow tuples.
+
+    The feed is a header row followed by section lines: scheme type headers
+    ("Open Ended Schemes(<SEBI category>)"), AMC name lines without a ';', and
+    ';'-separated scheme rows belonging to the most recent AMC and header. The
+    header row gives the column order (the history report has code, name, ISIN
+    growth/payout, ISIN reinvestment, NAV, repurchase price, sale price, date;
+    NAVAll.txt has no prices and the ISINs before the name). Works on any iterable
+    of lines so a streaming response is never materialised in full.
+    """
+    current_amc_name = None
+    scheme_type = category = None
+    layout = HISTORY_LAYOUT
+    width = len(HISTORY_LAYOUT)
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        header = parse_scheme_header(line) if ';' not in line else None
+        if header:
+            scheme_type, category = header
+            continue
+
+        if ';' not in line:
+            current_amc_name = line
+            continue
+
+        fields = line.split(';')
+        if not current_amc_name:
+            header = feed_layout(fields)
+            if header:
+                layout, width = header, max(header.values()) + 1
+            continue
+
+        if len(fields) < width:
+            continue
+
+        yield NavRow(
+            scheme_code=_column(fields, layout, 'scheme_code'),
+            scheme_name=_column(fields, layout, 'scheme_name'),
+            amc_name=current_amc_name,
+            nav=parse_nav(_column(fields, layout, 'nav')),
+            nav_date=parse_nav_date(_column(fields, layout, 'nav_date')),
+            isin_growth=clean_isin(_column(fields, layout, 'isin_growth')),
+            isin_reinvestment=clean_isin(_column(fields, layout, 'isin_reinvestment')),
+            repurchase_price=parse_nav(_column(fields, layout, 'repurchase_price')),
+            sale_price=parse_nav(_column(fields, layout, 'sale_price')),
+            scheme_type=scheme_type,
+            category=category,
+        )
+
+
+def fetch_nav_rows(date, session=None, timeout=30, rate_limiter=None):
+    """Stream the NAV history report for a date and yield parsed NavRow tuples"""
+    url = nav_history_url(date)
+    if rate_limiter:
+        rate_limiter.wait(url)
+    response = open_feed(url, session=session, timeout=timeout)
+    return iter_nav_rows(iter_feed_lines(response))
+
+
+def download_feed(url, session=None, timeout=30, rate_limiter=None, chunk_size=64 * 1024,
+                  spool_size=8 * 1024 * 1024):
+    """
+    Download a feed into a spooled temporary file while hashing it.
+
+    Files larger than spool_size roll over to disk, so memory stays bounded,
+    and the sha256 checksum is known before any row is parsed or written.
+    """
+    if rate_limiter:
+        rate_limiter.wait(url)
+    response = open_feed(url, session=session, timeout=timeout)
+    digest = hashlib.sha256()
+    size = 0
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            spool.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+    except Exception:
+        spool.close()
+        raise
+    finally:
+        response.close()
+    spool.seek(0)
+    return NavDownload(spool, digest.hexdigest(), size)
+
+
+def download_nav_history(date, **kwargs):
+    """Download the NAV history report for a date; see download_feed"""
+    return download_feed(nav_history_url(date), **kwargs)
+
+
+def download_latest_navs(**kwargs):
+    """Download AMFI's latest-NAV file (NAVAll.txt); see download_feed"""
+    return download_feed(latest_nav_url(), **kwargs)
+
+
+def read_feed_file(path, chunk_size=64 * 1024):
+    """A NavDownload over a saved feed file, so recorded fixtures go through the same path as downloads"""
+    digest = hashlib.sha256()
+    size = 0
+    feed = open(path, 'rb')
+    for chunk in iter(lambda: feed.read(chunk_size), b''):
+        digest.update(chunk)
+        size += len(chunk)
+    feed.seek(0)
+    return NavDownload(feed, digest.hexdigest(), size)
+
+
+def iter_download_lines(download, encoding='utf-8'):
+    """Yield decoded lines from a NavDownload, closing its file once exhausted"""
+    text = io.TextIOWrapper(download.file, encoding=encoding, errors='replace', newline=None)
+    try:
+        for line in text:
+            yield line.rstrip('\n')
+    finally:
+        text.close()
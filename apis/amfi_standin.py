@@ -0,0 +1,261 @@
+#amfi_standin.py
+
+import logging
+import os
+import random
+import shutil
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from .amfi import NAV_HISTORY_PATH, NAV_HISTORY_URL, LATEST_NAV_PATH, LATEST_NAV_URL, download_feed
+
+logger = logging.getLogger(__name__)
+
+HISTORY_HEADER = ('Scheme Code;Scheme Name;ISIN Div Payout/ISIN Growth;ISIN Div Reinvestment;Net Asset Value;'
+                  'Repurchase Price;Sale Price;Date')
+LATEST_HEADER = 'Scheme Code;ISIN Div Payout/ ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Date'
+
+CATEGORIES = (
+    ('Open Ended', 'Equity Scheme - Large Cap Fund'),
+    ('Open Ended', 'Equity Scheme - Mid Cap Fund'),
+    ('Open Ended', 'Equity Scheme - ELSS'),
+    ('Open Ended', 'Debt Scheme - Liquid Fund'),
+    ('Open Ended', 'Debt Scheme - Banking and PSU Fund'),
+    ('Open Ended', 'Hybrid Scheme - Balanced Advantage'),
+    ('Open Ended', 'Other Scheme - Index Funds'),
+    ('Close Ended', 'Income'),
+    ('Interval Fund', 'Income'),
+)
+NAV_EPOCH = date(2000, 1, 1)
+LATEST_FIXTURE_NAME = 'NAVAll.txt'
+
+
+def history_fixture_name(day):
+    return f'NAVHistory_{day:%Y-%m-%d}.txt'
+
+
+def previous_trading_day(day):
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+class SyntheticFeed:
+    """
+    Deterministic AMFI feeds of any size.
+
+    Scheme i (code first_code + i, above real AMFI codes by default) belongs to
+    category i % len(CATEGORIES) and to AMC (i // len(CATEGORIES)) % amcs, has
+    fixed ISINs and a NAV that drifts by a per-scheme daily rate, so the same date
+    always yields the same file and consecutive dates differ the way real ones do.
+    Weekends are holidays: the history report then holds only its header line.
+    """
+
+    def __init__(self, schemes=2000, amcs=40, first_code=900000):
+        self.schemes = max(schemes, 0)
+        self.amcs = max(min(amcs, self.schemes), 1)
+        self.first_code = first_code
+
+    def amc_name(self, amc):
+        return f'Standin {amc:03d} Mutual Fund'
+
+    def scheme(self, index):
+        """(code, name, growth ISIN, reinvestment ISIN or '-') of scheme index"""
+        code = self.first_code + index
+        amc = (index // len(CATEGORIES)) % self.amcs
+        _, category = CATEGORIES[index % len(CATEGORIES)]
+        plan = 'Direct Plan' if index % 2 else 'Regular Plan'
+        option = 'IDCW' if index % 3 == 0 else 'Growth'
+        isin = f'INF{amc:03d}{code % 1000000:06d}'
+        reinvestment = f'INF{amc:03d}{(code + 500000) % 1000000:06d}' if option == 'IDCW' else '-'
+        return code, f'Standin {amc:03d} {category} Fund {code} - {plan} - {option}', isin, reinvestment
+
+    def nav(self, index, day):
+        base = 10 + (index * 7919) % 990
+        rate = 0.0001 * ((index % 7) - 2)
+        return base * (1 + rate) ** ((day - NAV_EPOCH).days / 7)
+
+    def iter_sections(self):
+        """(scheme type, category, amc, [scheme indexes]) in feed order"""
+        step = len(CATEGORIES) * self.amcs
+        for category_index, (scheme_type, category) in enumerate(CATEGORIES):
+            for amc in range(self.amcs):
+                indexes = range(category_index + len(CATEGORIES) * amc, self.schemes, step)
+                if len(indexes):
+                    yield scheme_type, category, amc, indexes
+
+    def iter_lines(self, day, latest=False):
+        """Lines of the history report for day, or of NAVAll.txt as published on day"""
+        yield LATEST_HEADER if latest else HISTORY_HEADER
+        yield ''
+        trading_day = previous_trading_day(day)
+        if not latest and trading_day != day:
+            return
+        current_header = None
+        for scheme_type, category, amc, indexes in self.iter_sections():
+            header = f'{scheme_type} Schemes({category})'
+            if header != current_header:
+                current_header = header
+                yield header
+                yield ''
+            yield self.amc_name(amc)
+            yield ''
+            for index in indexes:
+                code, name, isin, reinvestment = self.scheme(index)
+                nav_date = trading_day
+                if latest and index % 25 == 24:
+                    # A few schemes lag a day behind in the latest-NAV file
+                    nav_date = previous_trading_day(trading_day - timedelta(days=1))
+                nav = f'{self.nav(index, nav_date):.4f}'
+                if latest:
+                    yield f'{code};{isin};{reinvestment};{name};{nav};{nav_date:%d-%b-%Y}'
+                else:
+                    yield f'{code};{name};{isin};{reinvestment};{nav};;;{nav_date:%d-%b-%Y}'
+            yield ''
+
+    def write(self, path, day, latest=False):
+        """Save a feed to path; returns its size in bytes"""
+        with open(path, 'w', encoding='utf-8', newline='\r\n') as feed:
+            for line in self.iter_lines(day, latest=latest):
+                feed.write(line + '\n')
+        return os.path.getsize(path)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = 'AmfiStandin/1.0'
+
+    def do_GET(self):
+        standin = self.server.standin
+        url = urlparse(self.path)
+        if url.path == NAV_HISTORY_PATH:
+            try:
+                day = datetime.strptime(parse_qs(url.query)['frmdt'][0], '%d-%b-%Y').date()
+            except (KeyError, ValueError):
+                self.send_error(400, 'frmdt must be a dd-MMM-yyyy date')
+                return
+            latest = False
+        elif url.path == LATEST_NAV_PATH:
+            day, latest = standin.latest_date or date.today(), True
+        else:
+            self.send_error(404)
+            return
+
+        if not standin.before_response():
+            self.send_error(503, 'Injected failure')
+            return
+        try:
+            path = standin.fixture_path(day, latest)
+        except Exception as e:
+            logger.warning(f"Could not record the AMFI feed for {day}: {str(e)}")
+            self.send_error(502, 'Could not record the upstream feed')
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.end_headers()
+        if path:
+            with open(path, 'rb') as fixture:
+                shutil.copyfileobj(fixture, self.wfile, 64 * 1024)
+            return
+        chunk = []
+        for line in standin.feed.iter_lines(day, latest=latest):
+            chunk.append(line)
+            if len(chunk) >= 1000:
+                self.wfile.write(('\r\n'.join(chunk) + '\r\n').encode())
+                chunk = []
+        if chunk:
+            self.wfile.write(('\r\n'.join(chunk) + '\r\n').encode())
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class StandinServer:
+    """
+    Local HTTP stand-in for AMFI's NAV history and latest-NAV endpoints.
+
+    Serves files from fixtures_dir when it has one for the date requested
+    (NAVHistory_YYYY-MM-DD.txt, NAVAll.txt), otherwise a SyntheticFeed. With
+    record=True a missing fixture is downloaded from AMFI once and kept. Every
+    response waits latency_ms (plus up to jitter_ms), and error_rate of them are
+    answered with 503, drawn from a seeded generator so runs are reproducible.
+
+    Use as a context manager in tests and benchmarks; url is the value for
+    AMFI_FEED_BASE_URL.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, feed=None, fixtures_dir=None, record=False, latency_ms=0,
+                 jitter_ms=0, error_rate=0.0, seed=0, latest_date=None):
+        self.feed = feed or SyntheticFeed()
+        self.fixtures_dir = fixtures_dir
+        self.record = record
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.latest_date = latest_date
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.httpd = ThreadingHTTPServer((host, port), StandinHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.standin = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def before_response(self):
+        """Apply the injected latency; False when this response should fail"""
+        with self.lock:
+            self.requests += 1
+            delay = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        return not failed
+
+    def fixture_path(self, day, latest):
+        if not self.fixtures_dir:
+            return None
+        name = LATEST_FIXTURE_NAME if latest else history_fixture_name(day)
+        path = os.path.join(self.fixtures_dir, name)
+        if os.path.exists(path):
+            return path
+        if not self.record:
+            return None
+        upstream = LATEST_NAV_URL if latest else f"{NAV_HISTORY_URL}?frmdt={day:%d-%b-%Y}"
+        download = download_feed(upstream)
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        with download.file, open(f'{path}.tmp', 'wb') as fixture:
+            shutil.copyfileobj(download.file, fixture)
+        os.replace(f'{path}.tmp', path)
+        logger.info(f"Recorded {upstream} to {path}")
+        return path
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name='amfi-standin', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,271 @@
+#analytics.py
+
+import logging
+import math
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+from django.db.models import Q
+
+from .models import NavModel, FundModel
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 365.25
+TRADING_DAYS_PER_YEAR = 252
+ROLLING_YEARS = (1, 3, 5)
+
+NavSeries = namedtuple('NavSeries', ['dates', 'values'])
+
+
+def _to_series(dates, values):
+    return NavSeries(np.array(dates, dtype='datetime64[D]'), np.array(values, dtype=np.float64))
+
+
+def _nav_queryset(date_from=None, date_to=None):
+    queryset = NavModel.objects.filter(hideStatus=0, nav__isnull=False, navDate__isnull=False)
+    if date_from:
+        queryset = queryset.filter(navDate__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(navDate__lte=date_to)
+    return queryset
+
+
+def load_nav_series(fund_id, date_from=None, date_to=None):
+    """Load one fund's NAV history into a NavSeries of datetime64 dates and float64 values"""
+    rows = _nav_queryset(date_from, date_to).filter(navFundName_id=fund_id).order_by('navDate')
+    rows = list(rows.values_list('navDate', 'nav'))
+    if not rows:
+        return _to_series([], [])
+    dates, values = zip(*rows)
+    return _to_series(dates, values)
+
+
+def load_scheme_series(scheme_code, date_from=None, date_to=None):
+    """NAV series for an AMFI scheme code, as carried by mailback reports such as ClientWiseAumReportModel"""
+    fund_id = FundModel.objects.filter(schemeCode=scheme_code).values_list('id', flat=True).first()
+    return load_nav_series(fund_id, date_from, date_to) if fund_id else _to_series([], [])
+
+
+def load_isin_series(isin, date_from=None, date_to=None):
+    """NAV series for a growth/payout or reinvestment ISIN, as carried by mailback reports"""
+    isin = (isin or '').strip().upper()
+    if not isin:
+        return _to_series([], [])
+    fund_id = FundModel.objects.filter(Q(fundIsinGrowth=isin) | Q(fundIsinReinvestment=isin)) \
+        .values_list('id', flat=True).first()
+    return load_nav_series(fund_id, date_from, date_to) if fund_id else _to_series([], [])
+
+
+def load_amc_series(amc_id, date_from=None, date_to=None):
+    """Load every fund of an AMC with a single query; returns {fund_id: NavSeries}"""
+    return _group_series(_nav_queryset(date_from, date_to).filter(navFundName__fundAmcName_id=amc_id))
+
+
+def load_category_series(category, date_from=None, date_to=None):
+    """Load every visible fund of a SEBI category with a single query; returns {fund_id: NavSeries}"""
+    return _group_series(_nav_queryset(date_from, date_to).filter(navFundName__fundCategory=category,
+                                                                   navFundName__hideStatus=0))
+
+
+def _group_series(queryset):
+    """Split a NAV queryset into {fund_id: NavSeries}"""
+    rows = list(queryset.order_by('navFundName_id', 'navDate').values_list('navFundName_id', 'navDate', 'nav'))
+    if not rows:
+        return {}
+
+    fund_ids, dates, values = zip(*rows)
+    fund_ids = np.array(fund_ids)
+    series = _to_series(dates, values)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(fund_ids)) + 1))
+    ends = np.append(starts[1:], len(fund_ids))
+    return {
+        int(fund_ids[start]): NavSeries(series.dates[start:end], series.values[start:end])
+        for start, end in zip(starts, ends)
+    }
+
+
+def _index_on_or_before(series, day):
+    """Position of the last NAV on or before day, or -1"""
+    return int(np.searchsorted(series.dates, np.datetime64(day, 'D'), side='right')) - 1
+
+
+def _years_between(start, end):
+    return (end - start).astype('timedelta64[D]').astype(np.float64) / DAYS_PER_YEAR
+
+
+def point_to_point_return(series, start=None, end=None):
+    """Absolute return between the NAVs on or before start and end (defaults: first and last NAV)"""
+    if len(series.values) < 2:
+        return math.nan
+    first = 0 if start is None else max(_index_on_or_before(series, start), 0)
+    last = len(series.values) - 1 if end is None else _index_on_or_before(series, end)
+    if last <= first:
+        return math.nan
+    return float(series.values[last] / series.values[first] - 1)
+
+
+def cagr(series, start=None, end=None):
+    """Compound annual growth rate between two points of a series"""
+    if len(series.values) < 2:
+        return math.nan
+    first = 0 if start is None else max(_index_on_or_before(series, start), 0)
+    last = len(series.values) - 1 if end is None else _index_on_or_before(series, end)
+    years = _years_between(series.dates[first], series.dates[last]) if last > first else 0
+    if years <= 0:
+        return math.nan
+    return float((series.values[last] / series.values[first]) ** (1 / years) - 1)
+
+
+def trailing_return(series, years):
+    """Return over the trailing period ending at the latest NAV; annualised when longer than a year"""
+    if len(series.values) < 2:
+        return math.nan
+    start = series.dates[-1] - np.timedelta64(int(round(years * DAYS_PER_YEAR)), 'D')
+    if series.dates[0] > start:
+        return math.nan
+    first = _index_on_or_before(series, start)
+    growth = series.values[-1] / series.values[first]
+    return float(growth ** (1 / years) - 1 if years > 1 else growth - 1)
+
+
+def rolling_returns(series, years):
+    """
+    Rolling returns over a window of the given length, one per NAV date.
+
+    For every date the start NAV is the last one on or before date - window,
+    found for all dates at once with searchsorted. Returns (end_dates, returns),
+    annualised for windows longer than a year.
+    """
+    if len(series.values) < 2:
+        return series.dates[:0], series.values[:0]
+    window = np.timedelta64(int(round(years * DAYS_PER_YEAR)), 'D')
+    starts = np.searchsorted(series.dates, series.dates - window, side='right') - 1
+    valid = starts >= 0
+    growth = series.values[valid] / series.values[starts[valid]]
+    returns = growth ** (1 / years) - 1 if years > 1 else growth - 1
+    return series.dates[valid], returns
+
+
+def drawdown(series):
+    """Drawdown from the running peak at every date, and the maximum drawdown (both <= 0)"""
+    if not len(series.values):
+        return series.values, math.nan
+    peaks = np.maximum.accumulate(series.values)
+    drawdowns = series.values / peaks - 1
+    return drawdowns, float(drawdowns.min())
+
+
+def volatility(series, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Annualised standard deviation of daily log returns"""
+    if len(series.values) < 3:
+        return math.nan
+    log_returns = np.diff(np.log(series.values))
+    return float(log_returns.std(ddof=1) * math.sqrt(periods_per_year))
+
+
+def xirr(cashflows, guess=0.1, tolerance=1e-7, max_iterations=100):
+    """
+    Annualised internal rate of return for irregular cash flows.
+
+    cashflows is an iterable of (date, amount) with investments negative and
+    redemptions/current value positive. The NPV and its derivative are evaluated
+    over all flows at once with NumPy, using Newton's method and falling back
+    to bisection when Newton leaves the valid range.
+    """
+    cashflows = sorted(cashflows, key=lambda flow: flow[0])
+    if len(cashflows) < 2:
+        return math.nan
+    dates = np.array([flow[0] for flow in cashflows], dtype='datetime64[D]')
+    amounts = np.array([float(flow[1]) for flow in cashflows], dtype=np.float64)
+    if not (amounts > 0).any() or not (amounts < 0).any():
+        return math.nan
+    years = _years_between(dates[0], dates)
+
+    def npv(rate):
+        return float(np.sum(amounts / (1 + rate) ** years))
+
+    rate = guess
+    for _ in range(max_iterations):
+        factors = (1 + rate) ** years
+        value = np.sum(amounts / factors)
+        derivative = np.sum(-years * amounts / (factors * (1 + rate)))
+        if derivative == 0:
+            break
+        next_rate = rate - value / derivative
+        if not np.isfinite(next_rate) or next_rate <= -1:
+            break
+        if abs(next_rate - rate) < tolerance:
+            return float(next_rate)
+        rate = next_rate
+
+    low, high = -0.9999, 10.0
+    if npv(low) * npv(high) > 0:
+        return math.nan
+    for _ in range(200):
+        mid = (low + high) / 2
+        if npv(low) * npv(mid) <= 0:
+            high = mid
+        else:
+            low = mid
+        if high - low < tolerance:
+            break
+    return (low + high) / 2
+
+
+def _clean(value):
+    return None if value is None or (isinstance(value, float) and not math.isfinite(value)) else round(value, 6)
+
+
+def fund_metrics(series):
+    """Headline return and risk metrics for a NavSeries, JSON ready (NaN becomes None)"""
+    if not len(series.values):
+        return None
+
+    _, max_drawdown = drawdown(series)
+    metrics = {
+        'latestNav': _clean(float(series.values[-1])),
+        'latestNavDate': str(series.dates[-1]),
+        'firstNavDate': str(series.dates[0]),
+        'sinceInceptionReturn': _clean(point_to_point_return(series)),
+        'sinceInceptionCagr': _clean(cagr(series)),
+        'volatility': _clean(volatility(series)),
+        'maxDrawdown': _clean(max_drawdown),
+    }
+    for years in ROLLING_YEARS:
+        metrics[f'return{years}y'] = _clean(trailing_return(series, years))
+        _, returns = rolling_returns(series, years)
+        metrics[f'rolling{years}y'] = {
+            'mean': _clean(float(returns.mean())) if len(returns) else None,
+            'min': _clean(float(returns.min())) if len(returns) else None,
+            'max': _clean(float(returns.max())) if len(returns) else None,
+        }
+    return metrics
+
+
+def amc_metrics(amc_id, date_from=None, date_to=None):
+    """Metrics for every fund of an AMC from a single NAV query"""
+    return {
+        fund_id: fund_metrics(series)
+        for fund_id, series in load_amc_series(amc_id, date_from, date_to).items()
+    }
+
+
+def category_metrics(category, date_from=None, date_to=None):
+    """Metrics for every fund of a SEBI category from a single NAV query"""
+    return {
+        fund_id: fund_metrics(series)
+        for fund_id, series in load_category_series(category, date_from, date_to).items()
+    }
+
+
+def statement_xirr(statement, as_of=None):
+    """XIRR of a StatementModel holding from its cost of investment to its current value"""
+    if not (statement.statementInvestmentDate and statement.statementCostOfInvestment
+            and statement.statementCurrentValue):
+        return math.nan
+    return xirr([
+        (statement.statementInvestmentDate, -statement.statementCostOfInvestment),
+        (as_of or statement.statementDate or date.today(), statement.statementCurrentValue),
+    ])
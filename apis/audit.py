@@ -0,0 +1,216 @@
+#audit.py
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+MODE_SYNC = 'sync'          # write each event immediately, inside the caller's transaction (tests)
+MODE_BUFFERED = 'buffered'  # queue in-process; a background thread bulk_creates batches
+MODE_CELERY = 'celery'      # queue in-process; batches are handed to write_activity_logs on the audit queue
+MODES = (MODE_SYNC, MODE_BUFFERED, MODE_CELERY)
+
+
+def audit_mode():
+    mode = getattr(settings, 'ACTIVITY_LOG_MODE', MODE_BUFFERED)
+    if mode not in MODES:
+        logger.warning(f"Unknown ACTIVITY_LOG_MODE {mode!r}, writing activity logs synchronously")
+        return MODE_SYNC
+    return mode
+
+
+def build_event(user_id, username, action, entity_type, entity_id, details, previous_data, ip_address):
+    """Compact, JSON-serializable form of one ActivityLog row"""
+    return {
+        'user_id': user_id,
+        'username': username,
+        'action': action,
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'details': details,
+        'previous_data': previous_data,
+        'ip_address': ip_address,
+        'created_at': timezone.now().isoformat(),
+    }
+
+
+def event_to_instance(event):
+    from .models import ActivityLog
+
+    created_at = event.get('created_at')
+    if isinstance(created_at, str):
+        created_at = parse_datetime(created_at)
+    return ActivityLog(
+        user_id=event.get('user_id'),
+        username=event.get('username'),
+        action=event.get('action'),
+        entity_type=event.get('entity_type'),
+        entity_id=event.get('entity_id'),
+        details=event.get('details'),
+        previous_data=event.get('previous_data'),
+        ip_address=event.get('ip_address'),
+        created_at=created_at or timezone.now(),
+    )
+
+
+def write_events(events):
+    """bulk_create a batch of events; returns the number of rows written"""
+    from .models import ActivityLog
+
+    if not events:
+        return 0
+    instances = [event_to_instance(event) for event in events]
+    batch_size = getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 200)
+    try:
+        ActivityLog.objects.bulk_create(instances, batch_size=batch_size)
+    except Exception:
+        # One bad row (e.g. a user deleted since the event was queued) must not lose the batch
+        logger.exception(f"Bulk write of {len(instances)} activity logs failed, retrying one by one")
+        written = 0
+        for instance in instances:
+            try:
+                instance.save()
+                written += 1
+            except Exception:
+                logger.exception(f"Dropping activity log {instance.action} {instance.entity_type} {instance.entity_id}")
+        return written
+    return len(instances)
+
+
+class ActivityLogBuffer:
+    """
+    In-process queue of audit events drained by a daemon thread.
+
+    The thread flushes whenever batch_size events are waiting or flush_ms has passed
+    since the first event of the batch, so a request only pays for a queue put. When
+    the queue is full the event is written inline rather than dropped. Anything still
+    queued is flushed at interpreter exit; after a fork the child starts its own thread.
+    """
+
+    def __init__(self, sink, batch_size=200, flush_ms=500, max_size=10000):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.queue = queue.Queue(maxsize=max_size)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    def put(self, event):
+        self.ensure_started()
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            logger.warning("Activity log queue is full, writing inline")
+            self.sink([event])
+
+    def ensure_started(self):
+        if self.thread is not None and self.thread.is_alive() and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive() and self.pid == os.getpid():
+                return
+            if self.pid != os.getpid():
+                # Events inherited across a fork belong to the parent's writer
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self.run, name='activity-log-writer', daemon=True)
+            self.thread.start()
+
+    def take_batch(self, first_timeout=None):
+        try:
+            batch = [self.queue.get(timeout=first_timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.take_batch()
+            self.write(batch)
+
+    def write(self, batch):
+        if not batch:
+            return
+        try:
+            self.sink(batch)
+        except Exception:
+            logger.exception(f"Failed to write {len(batch)} activity logs")
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Write everything queued so far from the calling thread"""
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = []
+        self.write(batch)
+
+
+def celery_sink(events):
+    from .tasks import write_activity_logs
+
+    write_activity_logs.delay(events)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ActivityLogBuffer(
+                    celery_sink if audit_mode() == MODE_CELERY else write_events,
+                    batch_size=getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 200),
+                    flush_ms=getattr(settings, 'ACTIVITY_LOG_FLUSH_MS', 500),
+                    max_size=getattr(settings, 'ACTIVITY_LOG_QUEUE_SIZE', 10000),
+                )
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def enqueue_event(event):
+    """
+    Record an audit event according to ACTIVITY_LOG_MODE.
+
+    Buffered events are queued only once the surrounding transaction commits, so a
+    rolled-back request leaves no log behind, just as when the row was saved inline.
+    """
+    if audit_mode() == MODE_SYNC:
+        write_events([event])
+        return
+    buffer = get_buffer()
+    transaction.on_commit(lambda: buffer.put(event))
+
+
+def flush_activity_logs():
+    """Write any queued events now (management commands, tests, shutdown hooks)"""
+    if _buffer is not None:
+        _buffer.flush()
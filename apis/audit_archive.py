@@ -0,0 +1,193 @@
+#audit_archive.py
+
+import datetime
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import partitions
+from .audit_diff import FORMAT_DIFF, depends_on_earlier_state, reconstruct_entity
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUBDIR = 'activity_log_archive'
+ARCHIVE_FIELDS = ('id', 'user_id', 'username', 'action', 'entity_type', 'entity_id', 'details', 'previous_data',
+                  'ip_address', 'created_at')
+ARCHIVE_FILE = re.compile(r'(\d{4})-(\d{2})(?:\.\d+)?\.jsonl\.gz$')
+CHECKPOINT_ACTION = 'CHECKPOINT'
+
+
+class ArchiveJSONEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, (datetime.date, datetime.datetime)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def archive_dir():
+    return os.path.join(settings.MEDIA_ROOT, ARCHIVE_SUBDIR)
+
+
+def month_bounds(start):
+    """Aware UTC datetimes bounding the month starting on `start`, matching the partition bounds"""
+    end = partitions.next_period(start, partitions.MONTH)
+    utc = datetime.timezone.utc
+    return (datetime.datetime(start.year, start.month, 1, tzinfo=utc),
+            datetime.datetime(end.year, end.month, 1, tzinfo=utc))
+
+
+def archive_path(start):
+    """Path for a month's archive; a second archive of the same month gets a numbered name"""
+    base = os.path.join(archive_dir(), f'{start:%Y-%m}')
+    path, counter = f'{base}.jsonl.gz', 1
+    while os.path.exists(path):
+        path, counter = f'{base}.{counter}.jsonl.gz', counter + 1
+    return path
+
+
+def month_queryset(start):
+    lower, upper = month_bounds(start)
+    return ActivityLog.objects.filter(created_at__gte=lower, created_at__lt=upper)
+
+
+def write_archive(start):
+    """Stream a month of activity logs into a gzipped JSON Lines file; returns (path, rows)"""
+    os.makedirs(archive_dir(), exist_ok=True)
+    path = archive_path(start)
+    temp_path = f'{path}.tmp'
+    rows = 0
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as archive:
+        for row in month_queryset(start).order_by('id').values(*ARCHIVE_FIELDS).iterator(chunk_size=2000):
+            archive.write(json.dumps(row, cls=ArchiveJSONEncoder, separators=(',', ':')))
+            archive.write('\n')
+            rows += 1
+    if not rows:
+        os.remove(temp_path)
+        return None, 0
+    os.replace(temp_path, path)
+    return path, rows
+
+
+def carry_forward_checkpoints(start):
+    """
+    Keep the entities of a month rebuildable once it is removed: every entity whose
+    later diff-only UPDATEs rely on a full state (CREATE or checkpoint) recorded in
+    this month gets a CHECKPOINT entry. It carries the timestamp of the entity's
+    first later entry and its state as of then, so it sorts right after every
+    entry it already includes. Returns the entries written.
+    """
+    _, upper = month_bounds(start)
+    entities = (month_queryset(start).filter(entity_id__isnull=False)
+                .values_list('entity_type', 'entity_id').distinct())
+    checkpoints = []
+    for entity_type, entity_id in entities.iterator():
+        later = ActivityLog.objects.filter(entity_type=entity_type, entity_id=entity_id,
+                                           created_at__gte=upper).order_by('created_at', 'id')
+        first = later.first()
+        if first is None or not depends_on_earlier_state(later.iterator(chunk_size=100)):
+            continue
+        state = reconstruct_entity(entity_type, entity_id, at=first.created_at)
+        if state is None:
+            logger.warning(f"No full state to carry forward for {entity_type} {entity_id} from {start:%Y-%m}")
+            continue
+        checkpoints.append(ActivityLog(
+            username='system',
+            action=CHECKPOINT_ACTION,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            details={'format': FORMAT_DIFF, 'diff': [], 'checkpoint': True, 'data': state,
+                     'archived_month': f'{start:%Y-%m}'},
+            ip_address='0.0.0.0',
+            created_at=first.created_at,
+        ))
+    ActivityLog.objects.bulk_create(checkpoints, batch_size=500)
+    return len(checkpoints)
+
+
+@transaction.atomic
+def remove_month(start, expected_rows):
+    """
+    Remove an archived month from the table: its partition is detached and dropped
+    when there is one, otherwise the rows are deleted. Entities whose later entries
+    depend on the month first get a checkpoint (carry_forward_checkpoints). Returns
+    the rows removed.
+    """
+    if expected_rows:
+        carried = carry_forward_checkpoints(start)
+        if carried:
+            logger.info(f"Carried {carried} entity checkpoints forward from {start:%Y-%m}")
+    table = ActivityLog._meta.db_table
+    name = partitions.partition_name(table, start, partitions.MONTH)
+    with connection.cursor() as cursor:
+        if partitions.is_partitioned(table) and partitions.relation_exists(cursor, name):
+            cursor.execute(f"SELECT COUNT(*) FROM {partitions.qn(name)}")
+            rows = cursor.fetchone()[0]
+            if rows != expected_rows:
+                raise RuntimeError(f"{name} has {rows} rows but {expected_rows} were archived")
+            partitions.drop_partition(cursor, table, name)
+            return rows
+    rows, _ = month_queryset(start).delete()
+    if rows != expected_rows:
+        raise RuntimeError(f"Deleted {rows} activity logs for {start:%Y-%m} but {expected_rows} were archived")
+    return rows
+
+
+def archive_month(start):
+    """Archive and remove one month of activity logs; returns (path, rows)"""
+    path, rows = write_archive(start)
+    if path is None:
+        # Drop an empty partition all the same
+        remove_month(start, 0)
+        return None, 0
+    try:
+        remove_month(start, rows)
+    except Exception:
+        os.remove(path)
+        raise
+    logger.info(f"Archived {rows} activity logs for {start:%Y-%m} to {path}")
+    return path, rows
+
+
+def archived_months():
+    """Sorted (month start, path) of every archive file"""
+    months = []
+    for path in glob.glob(os.path.join(archive_dir(), '*.jsonl.gz')):
+        match = ARCHIVE_FILE.search(os.path.basename(path))
+        if match:
+            months.append((datetime.date(int(match.group(1)), int(match.group(2)), 1), path))
+    return sorted(months)
+
+
+def iter_archived_logs(since=None, until=None, entity_type=None, entity_id=None, user_id=None, action=None):
+    """
+    Yield archived activity logs (as dicts, created_at an ISO string) matching the filters,
+    oldest first. since/until are aware datetimes; only the archive files of the months
+    they span are opened.
+    """
+    for start, path in archived_months():
+        lower, upper = month_bounds(start)
+        if (since is not None and upper <= since) or (until is not None and lower > until):
+            continue
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                row = json.loads(line)
+                if entity_type is not None and row['entity_type'] != entity_type:
+                    continue
+                if entity_id is not None and row['entity_id'] != str(entity_id):
+                    continue
+                if user_id is not None and row['user_id'] != user_id:
+                    continue
+                if action is not None and row['action'] != action:
+                    continue
+                if since is not None or until is not None:
+                    created_at = datetime.datetime.fromisoformat(row['created_at'])
+                    if (since is not None and created_at < since) or (until is not None and created_at > until):
+                        continue
+                yield row
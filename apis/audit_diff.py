@@ -0,0 +1,247 @@
+#audit_diff.py
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+OP_ADD = '+'
+OP_REMOVE = '-'
+OP_CHANGE = '~'
+
+FORMAT_DIFF = 'diff'
+
+INVERSE = {OP_ADD: OP_REMOVE, OP_REMOVE: OP_ADD, OP_CHANGE: OP_CHANGE}
+
+# Entities whose update count is kept per process for picking checkpoints
+CHECKPOINT_TRACKED_ENTITIES = 10000
+
+_update_sequences = OrderedDict()
+_update_sequences_lock = threading.Lock()
+
+
+def _same(old, new):
+    """Equality that ignores representation-only differences such as '12.50' vs 12.5"""
+    if old == new:
+        return True
+    if isinstance(old, bool) or isinstance(new, bool):
+        return False
+    if isinstance(old, (str, int, float, Decimal)) and isinstance(new, (str, int, float, Decimal)):
+        if isinstance(old, str) and isinstance(new, str) and not ('.' in old and '.' in new):
+            # Codes such as account or phone numbers: '0123' and '123' differ
+            return False
+        try:
+            return Decimal(str(old)) == Decimal(str(new))
+        except (InvalidOperation, ValueError):
+            return False
+    return False
+
+
+def json_diff(old, new, path=()):
+    """
+    Structural diff of two JSON documents as a list of operations.
+
+    Operations are compact lists: ['+', path, new], ['-', path, old] or
+    ['~', path, old, new], where path is a list of keys/indexes. Removed and
+    replaced values are kept so a diff can be applied forwards or undone.
+    Dicts are compared key by key and lists index by index; extra list items become
+    adds (ascending) or removes (descending) at the end of the list.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append([OP_REMOVE, [*path, key], old[key]])
+            else:
+                ops.extend(json_diff(old[key], new[key], (*path, key)))
+        for key in new:
+            if key not in old:
+                ops.append([OP_ADD, [*path, key], new[key]])
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            ops.extend(json_diff(old[index], new[index], (*path, index)))
+        for index in range(common, len(new)):
+            ops.append([OP_ADD, [*path, index], new[index]])
+        for index in reversed(range(common, len(old))):
+            ops.append([OP_REMOVE, [*path, index], old[index]])
+        return ops
+
+    if _same(old, new):
+        return []
+    return [[OP_CHANGE, list(path), old, new]]
+
+
+def invert_diff(ops):
+    """The diff that undoes ops"""
+    inverted = []
+    for op in reversed(ops):
+        if op[0] == OP_CHANGE:
+            inverted.append([OP_CHANGE, op[1], op[3], op[2]])
+        else:
+            inverted.append([INVERSE[op[0]], op[1], op[2]])
+    return inverted
+
+
+def apply_diff(document, ops):
+    """Return a copy of document with ops applied"""
+    document = copy.deepcopy(document)
+    for op in ops:
+        kind, path, value = op[0], op[1], op[-1]
+        if not path:
+            document = copy.deepcopy(value)
+            continue
+        parent = document
+        for key in path[:-1]:
+            parent = parent[key]
+        key = path[-1]
+        if kind == OP_REMOVE:
+            if isinstance(parent, list):
+                parent.pop(key)
+            else:
+                parent.pop(key, None)
+        elif kind == OP_ADD and isinstance(parent, list):
+            parent.insert(key, copy.deepcopy(value))
+        else:
+            parent[key] = copy.deepcopy(value)
+    return document
+
+
+def updated_document(previous, data):
+    """State after an update: data overlaid on the previous top-level keys it does not mention"""
+    if isinstance(previous, dict) and isinstance(data, dict):
+        return {**previous, **data}
+    return data
+
+
+def is_checkpoint_due(entity_type, entity_id):
+    """
+    True on the first update of an entity seen by this process and then every
+    ACTIVITY_LOG_CHECKPOINT_EVERY updates. The counts live in process memory (the
+    least recently updated entities are forgotten past CHECKPOINT_TRACKED_ENTITIES),
+    so deciding costs no round-trip and cannot fail; a forgotten or restarted
+    counter only adds checkpoints.
+    """
+    every = getattr(settings, 'ACTIVITY_LOG_CHECKPOINT_EVERY', 20)
+    if not every:
+        return False
+    key = (entity_type, str(entity_id))
+    with _update_sequences_lock:
+        sequence = _update_sequences.pop(key, 0) + 1
+        _update_sequences[key] = sequence
+        if len(_update_sequences) > CHECKPOINT_TRACKED_ENTITIES:
+            _update_sequences.popitem(last=False)
+    return sequence % every == 1 or every == 1
+
+
+def diff_details(details, previous_data, entity_type, entity_id):
+    """
+    Replace the full before/after payloads of an UPDATE by the changed paths.
+
+    Returns (details, previous_data) to store. Checkpoint entries also keep the
+    full state after the update under details['data'] so history can be rebuilt
+    without replaying every change since the entity was created.
+    """
+    data = details.get('data')
+    if not isinstance(previous_data, dict) or not isinstance(data, dict):
+        return details, previous_data
+    after = updated_document(previous_data, data)
+    stored = {key: value for key, value in details.items() if key != 'data'}
+    stored['format'] = FORMAT_DIFF
+    stored['diff'] = json_diff(previous_data, after)
+    if is_checkpoint_due(entity_type, entity_id):
+        stored['checkpoint'] = True
+        stored['data'] = after
+    return stored, None
+
+
+def _state_after(log):
+    """Full entity state right after a log entry, or None if the entry only holds a diff"""
+    details = log.details or {}
+    if log.action == 'DELETE':
+        return log.previous_data
+    if details.get('format') == FORMAT_DIFF:
+        return details.get('data') if details.get('checkpoint') else None
+    if 'data' not in details:
+        return None
+    return updated_document(log.previous_data, details['data'])
+
+
+def _state_before(log):
+    """Full entity state right before a log entry, or None if it cannot be told from the entry"""
+    details = log.details or {}
+    if details.get('format') == FORMAT_DIFF:
+        after = _state_after(log)
+        return apply_diff(after, invert_diff(details['diff'])) if after is not None else None
+    return log.previous_data
+
+
+def _replay(state, log):
+    details = log.details or {}
+    if details.get('format') == FORMAT_DIFF:
+        return apply_diff(state, details['diff'])
+    after = _state_after(log)
+    return after if after is not None else state
+
+
+def depends_on_earlier_state(logs):
+    """
+    True when replaying logs (oldest first) needs a full state from before them,
+    i.e. a diff-only entry comes before any entry that holds a full state
+    """
+    for log in logs:
+        details = log.details or {}
+        if details.get('format') == FORMAT_DIFF and not details.get('checkpoint'):
+            return True
+        if _state_after(log) is not None:
+            return False
+    return False
+
+
+def reconstruct_entity(entity_type, entity_id, at=None):
+    """
+    Rebuild the audited state of an entity as of `at` (a datetime, default now).
+
+    Starts from the newest full state at or before `at` (a checkpoint, a CREATE or a
+    pre-diff entry) and replays the diffs recorded after it. When only later entries
+    hold a full state, it walks back from the earliest of them instead. Returns None
+    when the log has nothing to rebuild from.
+    """
+    from .models import ActivityLog
+
+    logs = ActivityLog.objects.filter(entity_type=entity_type, entity_id=str(entity_id)).order_by('created_at', 'id')
+    if at is not None:
+        earlier = list(logs.filter(created_at__lte=at))
+    else:
+        earlier = list(logs)
+
+    for index in range(len(earlier) - 1, -1, -1):
+        state = _state_after(earlier[index])
+        if state is not None:
+            for log in earlier[index + 1:]:
+                state = _replay(state, log)
+            return state
+
+    if at is None:
+        return None
+    later = list(logs.filter(created_at__gt=at))
+    undo = []
+    for log in later:
+        state = _state_before(log)
+        if state is not None:
+            for undone in reversed(undo):
+                state = apply_diff(state, invert_diff(undone.details['diff']))
+            return state
+        if log.action == 'CREATE' or (log.details or {}).get('format') != FORMAT_DIFF:
+            # Created after `at`, or an entry that cannot be undone
+            return None
+        undo.append(log)
+    return None
@@ -0,0 +1,140 @@
+#catalog.py
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .master_cache import cached_master_data, master_namespace
+
+logger = logging.getLogger(__name__)
+
+
+def table_version(model, visible_only=True):
+    """'label:max updatedAt:row count' of a table; any save, insert or soft delete changes it"""
+    queryset = model._base_manager.all()
+    if visible_only:
+        queryset = queryset.filter(hideStatus=0)
+    version = queryset.aggregate(latest=Max('updatedAt'), rows=Count('id'))
+    latest = version['latest'].isoformat() if version['latest'] else '-'
+    return f"{model._meta.label_lower}:{latest}:{version['rows']}"
+
+
+def cached_table_version(model, visible_only=True):
+    """table_version kept in the master-data cache; only for tables whose writes invalidate it"""
+    return cached_master_data(master_namespace(model), f'table-version:{int(visible_only)}',
+                              lambda: table_version(model, visible_only))
+
+
+def catalog_etag(models, variant='', cached=False):
+    """
+    Strong ETag for a response built from models[0]'s visible rows; the other models
+    are tables whose values appear in it (e.g. the AMC name on each fund).
+    """
+    version = cached_table_version if cached else table_version
+    parts = [version(models[0])] + [version(model, visible_only=False) for model in models[1:]]
+    parts.append(variant)
+    return '"' + hashlib.sha1('|'.join(parts).encode()).hexdigest() + '"'
+
+
+def request_variant(request):
+    return f"{request.path}?{'&'.join(sorted(request.GET.urlencode().split('&')))}"
+
+
+def conditional_response(request, build, models, cached=False):
+    """
+    Answer 304 Not Modified when If-None-Match carries the catalog's current ETag;
+    otherwise build the body and send it with the ETag so the next request can.
+    With cached=True the table versions come from the master-data cache, so a
+    revalidation does not touch the database.
+    """
+    etag = catalog_etag(models, request_variant(request), cached=cached)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    response = Response(build())
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def parse_since(value):
+    """Aware datetime from an ISO timestamp or date; raises ValueError"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid since: {value}")
+        moment = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class CatalogSyncMixin:
+    """
+    Conditional GET and delta sync for catalog ViewSets.
+
+    `changes?since=<timestamp>` returns the visible rows modified after `since` and
+    the ids hidden since then, plus next_since to send on the following call. Rows
+    also count as modified when a table in catalog_related changed their
+    representation (e.g. funds when their AMC is renamed). next_since lags the
+    server clock by CATALOG_CHANGES_OVERLAP_SECONDS so rows committed by slower
+    transactions are not missed; clients upsert by id, so repeats are harmless.
+    """
+    catalog_related = ()  # (field name, model) pairs whose updatedAt changes the representation
+    catalog_version_cached = False  # True when every write to these tables invalidates the master cache
+
+    @property
+    def catalog_model(self):
+        return self.get_serializer_class().Meta.model
+
+    def catalog_models(self):
+        return (self.catalog_model,) + tuple(model for _, model in self.catalog_related)
+
+    def catalog_response(self, request, build):
+        return conditional_response(request, build, self.catalog_models(), cached=self.catalog_version_cached)
+
+    @action(detail=False, methods=['GET'])
+    def changes(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        started = timezone.now()
+        try:
+            since = parse_since(request.query_params['since']) if request.query_params.get('since') else None
+        except ValueError as e:
+            return Response({'code': 0, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            model = self.catalog_model
+            changed = model._base_manager.filter(hideStatus=0)
+            deleted = []
+            if since is not None:
+                modified = Q(updatedAt__gt=since)
+                for field, _ in self.catalog_related:
+                    modified |= Q(**{f'{field}__updatedAt__gt': since})
+                changed = changed.filter(modified)
+                deleted = list(model._base_manager.exclude(hideStatus=0).filter(updatedAt__gt=since)
+                               .values_list('id', flat=True))
+            related = [field for field, _ in self.catalog_related]
+            if related:
+                changed = changed.select_related(*related)
+            overlap = getattr(settings, 'CATALOG_CHANGES_OVERLAP_SECONDS', 60)
+            return {
+                'code': 1,
+                'data': self.get_serializer_class()(changed.order_by('id'), many=True).data,
+                'deleted': deleted,
+                'next_since': (started - timedelta(seconds=overlap)).isoformat(),
+                'message': "Retrieved Successfully",
+            }
+
+        return self.catalog_response(request, build)
@@ -0,0 +1,203 @@
+#client_aggregate.py
+
+import json
+import logging
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Prefetch, TextField
+from django.db.models.expressions import RawSQL
+
+from .models import (ClientModel, ClientFamilyDetailModel, ClientChildrenDetailModel, ClientPresentAddressModel,
+                     ClientPermanentAddressModel, ClientOfficeAddressModel, ClientOverseasAddressModel,
+                     ClientNomineeModel, ClientInsuranceModel, ClientMedicalInsuranceModel, ClientTermInsuranceModel,
+                     ClientUploadFileModel, ClientBankModel, ClientTaxModel, ClientPowerOfAttorneyModel,
+                     ClientGuardianModel)
+from .serializers import (ClientModelSerializers, ClientFamilyDetailModelSerializers,
+                          ClientChildrenDetailModelSerializers, ClientPresentAddressModelSerializers,
+                          ClientPermanentAddressModelSerializers, ClientOfficeAddressModelSerializers,
+                          ClientOverseasAddressModelSerializers, ClientNomineeModelSerializers,
+                          ClientInsuranceModelSerializers, ClientMedicalInsuranceModelSerializers,
+                          ClientTermInsuranceModelSerializers, ClientUploadFileModelSerializers,
+                          ClientBankModelSerializers, ClientTaxModelSerializers,
+                          ClientPowerOfAttorneyModelSerializers, ClientGuardianModelSerializers)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ONE = 'one'
+SNAPSHOT_MANY = 'many'
+
+WRITE_ONE = 'one'                    # a single row, created on first save
+WRITE_ONE_IF_GIVEN = 'one_if_given'  # a single row, only touched when its payload is non-empty
+WRITE_DIFF = 'diff'                  # rows matched by id: updated, created or deleted
+WRITE_REPLACE = 'replace'            # every row replaced by the submitted list
+WRITE_FILES = 'files'                # base64 file uploads on a single row
+
+# key: response/snapshot key, fk: foreign key to ClientModel (also its related_name),
+# snapshot: shape in the audit snapshot, None when the relation is not audited,
+# payload_key/write: where processing reads the relation from and how it is saved
+ClientRelation = namedtuple('ClientRelation', ['key', 'model', 'fk', 'serializer', 'snapshot', 'payload_key', 'write'])
+
+CLIENT_RELATIONS = (
+    ClientRelation('family', ClientFamilyDetailModel, 'clientFamilyDetailId',
+                   ClientFamilyDetailModelSerializers, SNAPSHOT_ONE, 'familyJson', WRITE_ONE),
+    ClientRelation('children', ClientChildrenDetailModel, 'clientChildrenId',
+                   ClientChildrenDetailModelSerializers, SNAPSHOT_MANY, 'childrenJson', WRITE_DIFF),
+    ClientRelation('present_address', ClientPresentAddressModel, 'clientPresentAddressId',
+                   ClientPresentAddressModelSerializers, SNAPSHOT_ONE, 'presentAddressJson', WRITE_ONE_IF_GIVEN),
+    ClientRelation('permanent_address', ClientPermanentAddressModel, 'clientPermanentAddressId',
+                   ClientPermanentAddressModelSerializers, SNAPSHOT_ONE, 'permanentAddressJson', WRITE_ONE_IF_GIVEN),
+    ClientRelation('office_address', ClientOfficeAddressModel, 'clientOfficeAddressId',
+                   ClientOfficeAddressModelSerializers, SNAPSHOT_ONE, 'officeAddressJson', WRITE_ONE_IF_GIVEN),
+    ClientRelation('overseas_address', ClientOverseasAddressModel, 'clientOverseasAddressId',
+                   ClientOverseasAddressModelSerializers, SNAPSHOT_ONE, 'overseasAddressJson', WRITE_ONE_IF_GIVEN),
+    ClientRelation('nominee', ClientNomineeModel, 'clientNomineeId',
+                   ClientNomineeModelSerializers, SNAPSHOT_MANY, 'nomineeJson', WRITE_REPLACE),
+    ClientRelation('insurance', ClientInsuranceModel, 'clientInsuranceId',
+                   ClientInsuranceModelSerializers, SNAPSHOT_MANY, 'insuranceJson', WRITE_REPLACE),
+    ClientRelation('medical_insurance', ClientMedicalInsuranceModel, 'clientMedicalInsuranceId',
+                   ClientMedicalInsuranceModelSerializers, SNAPSHOT_MANY, 'medicalInsuranceJson', WRITE_REPLACE),
+    ClientRelation('term_insurance', ClientTermInsuranceModel, 'clientTermInsuranceId',
+                   ClientTermInsuranceModelSerializers, SNAPSHOT_MANY, 'termInsuranceJson', WRITE_REPLACE),
+    ClientRelation('upload_files', ClientUploadFileModel, 'clientUploadFileId',
+                   ClientUploadFileModelSerializers, None, 'uploadFilesJson', WRITE_FILES),
+    ClientRelation('bank', ClientBankModel, 'clientBankId',
+                   ClientBankModelSerializers, SNAPSHOT_MANY, 'bankJson', WRITE_REPLACE),
+    ClientRelation('tax', ClientTaxModel, 'clientTaxId',
+                   ClientTaxModelSerializers, SNAPSHOT_ONE, 'taxJson', WRITE_ONE),
+    ClientRelation('attorney', ClientPowerOfAttorneyModel, 'clientPowerOfAttorneyId',
+                   ClientPowerOfAttorneyModelSerializers, SNAPSHOT_ONE, 'attorneyJson', WRITE_ONE),
+    ClientRelation('guardian', ClientGuardianModel, 'clientGuardianId',
+                   ClientGuardianModelSerializers, SNAPSHOT_ONE, 'guardianJSON', WRITE_ONE),
+)
+
+# client: ClientModel instance; related: {relation key: [instances, newest id first]}
+ClientAggregate = namedtuple('ClientAggregate', ['client', 'related'])
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _related_rows_sql(relation, include_hidden):
+    """Correlated subquery returning a relation's rows for the outer client as JSON text"""
+    meta = relation.model._meta
+    fk_column = meta.get_field(relation.fk).column
+    hidden = '' if include_hidden else ' AND t."hideStatus" = 0'
+    return (
+        f"SELECT COALESCE(jsonb_agg(to_jsonb(t) ORDER BY t.id DESC), '[]')::text "
+        f"FROM {qn(meta.db_table)} t "
+        f"WHERE t.{qn(fk_column)} = {qn(ClientModel._meta.db_table)}.id{hidden}"
+    )
+
+
+def _instances_from_json(model, payload):
+    """Rebuild model instances from to_jsonb() rows, converting each column like a normal fetch would"""
+    fields = model._meta.concrete_fields
+    names = [field.attname for field in fields]
+    return [
+        model.from_db(connection.alias, names, [field.to_python(row.get(field.column)) for field in fields])
+        for row in json.loads(payload, parse_float=Decimal)
+    ]
+
+
+def _load_json(client_id, include_hidden):
+    queryset = ClientModel.objects.filter(id=client_id).select_related('clientPhoneCountryCode')
+    if not include_hidden:
+        queryset = queryset.filter(hideStatus=0)
+    queryset = queryset.annotate(**{
+        f'related_{relation.key}': RawSQL(_related_rows_sql(relation, include_hidden), [], output_field=TextField())
+        for relation in CLIENT_RELATIONS
+    })
+    client = queryset.first()
+    if client is None:
+        return None
+    return ClientAggregate(client, {
+        relation.key: _instances_from_json(relation.model, getattr(client, f'related_{relation.key}'))
+        for relation in CLIENT_RELATIONS
+    })
+
+
+def _load_prefetch(client_id, include_hidden):
+    prefetches = []
+    for relation in CLIENT_RELATIONS:
+        related = relation.model.objects.order_by('-id')
+        if not include_hidden:
+            related = related.filter(hideStatus=0)
+        prefetches.append(Prefetch(relation.fk, queryset=related, to_attr=f'related_{relation.key}'))
+
+    queryset = ClientModel.objects.filter(id=client_id).select_related('clientPhoneCountryCode')
+    if not include_hidden:
+        queryset = queryset.filter(hideStatus=0)
+    client = queryset.prefetch_related(*prefetches).first()
+    if client is None:
+        return None
+    return ClientAggregate(client, {
+        relation.key: getattr(client, f'related_{relation.key}') for relation in CLIENT_RELATIONS
+    })
+
+
+def load_client_aggregate(client_id, include_hidden=False):
+    """
+    Load a client with every related record in one round-trip, or None if it does not exist.
+
+    On PostgreSQL each relation is a jsonb_agg subquery of the client SELECT, so
+    the whole graph arrives in a single row; elsewhere it falls back to
+    prefetch_related (one query per relation). Hidden rows, including a hidden
+    client, are skipped unless include_hidden is set.
+    """
+    if connection.vendor == 'postgresql':
+        return _load_json(client_id, include_hidden)
+    return _load_prefetch(client_id, include_hidden)
+
+
+def serialize_client_profile(aggregate):
+    """The listing_client payload: every section as a list, empty when the client is missing"""
+    profile = {'client': [ClientModelSerializers(aggregate.client).data] if aggregate else []}
+    for relation in CLIENT_RELATIONS:
+        instances = aggregate.related[relation.key] if aggregate else []
+        profile[relation.key] = relation.serializer(instances, many=True).data
+    return profile
+
+
+def client_snapshot(aggregate):
+    """Audit snapshot of a client: single relations as one dict (the oldest row) or None, others as lists"""
+    snapshot = {'client': ClientModelSerializers(aggregate.client).data}
+    for relation in CLIENT_RELATIONS:
+        if relation.snapshot is None:
+            continue
+        instances = aggregate.related[relation.key]
+        if relation.snapshot == SNAPSHOT_ONE:
+            snapshot[relation.key] = relation.serializer(instances[-1]).data if instances else None
+        else:
+            snapshot[relation.key] = relation.serializer(instances, many=True).data
+    return snapshot
+
+
+@transaction.atomic
+def soft_delete_client(client):
+    """
+    Hide a client and all of its related records.
+
+    On PostgreSQL the sixteen UPDATEs run as data-modifying CTEs of a single statement.
+    """
+    client.hideStatus = 1
+    if connection.vendor != 'postgresql':
+        client.save()
+        for relation in CLIENT_RELATIONS:
+            relation.model.objects.filter(**{relation.fk: client}).update(hideStatus=1)
+        return
+
+    updates = [
+        f"{qn('hide_' + relation.key)} AS (UPDATE {qn(relation.model._meta.db_table)} SET \"hideStatus\" = 1 "
+        f"WHERE {qn(relation.model._meta.get_field(relation.fk).column)} = %(client_id)s)"
+        for relation in CLIENT_RELATIONS
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH {', '.join(updates)} "
+            f"UPDATE {qn(ClientModel._meta.db_table)} SET \"hideStatus\" = 1, \"updatedAt\" = NOW() "
+            f"WHERE id = %(client_id)s",
+            {'client_id': client.id},
+        )
@@ -0,0 +1,229 @@
+#client_writes.py
+
+import base64
+import logging
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from .client_aggregate import (CLIENT_RELATIONS, ClientAggregate, WRITE_ONE_IF_GIVEN, WRITE_DIFF, WRITE_REPLACE,
+                               WRITE_FILES)
+from .serializers import ClientModelSerializers
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchedLookup:
+    """
+    Stands in for a PrimaryKeyRelatedField queryset, answering get(pk=...) from rows
+    fetched up front, so validating many rows costs one query per related model.
+    """
+
+    def __init__(self, model, instances):
+        self.model = model
+        self.instances = {str(instance.pk): instance for instance in instances}
+
+    def get(self, pk):
+        try:
+            return self.instances[str(pk)]
+        except KeyError:
+            raise self.model.DoesNotExist(f"{self.model.__name__} {pk} does not exist")
+
+
+def _lookup_fields(serializer):
+    fields = serializer.child.fields if hasattr(serializer, 'child') else serializer.fields
+    return [
+        (name, field) for name, field in fields.items()
+        if isinstance(field, PrimaryKeyRelatedField) and not field.read_only and field.queryset is not None
+    ]
+
+
+def prefetch_lookups(serializers_with_rows):
+    """
+    Resolve every primary-key reference in the submitted rows with one query per related
+    model, then point each serializer's relational fields at the prefetched rows.
+    """
+    wanted = defaultdict(set)
+    bound = []
+    for serializer, rows in serializers_with_rows:
+        for name, field in _lookup_fields(serializer):
+            model = field.queryset.model
+            bound.append((field, model))
+            for row in rows:
+                value = row.get(name) if isinstance(row, dict) else None
+                if (isinstance(value, int) and not isinstance(value, bool)) or str(value).isdigit():
+                    wanted[model].add(int(value))
+
+    fetched = {}
+    for field, model in bound:
+        if model not in fetched:
+            ids = wanted.get(model, ())
+            fetched[model] = PrefetchedLookup(model, field.queryset.filter(pk__in=ids) if ids else [])
+        field.queryset = fetched[model]
+
+
+def _assign(instance, validated_data):
+    """Copy validated values onto an instance; returns the names of the fields that changed"""
+    changed = []
+    for name, value in validated_data.items():
+        field = instance._meta.get_field(name)
+        if field.many_to_one:
+            # Compare raw ids so unloaded relations are never fetched
+            current, new = getattr(instance, field.attname), value.pk if value is not None else None
+        else:
+            current, new = getattr(instance, name), value
+        if current != new:
+            setattr(instance, name, value)
+            changed.append(name)
+    return changed
+
+
+def _decode_upload(field_name, file_data):
+    if isinstance(file_data, str) and file_data.startswith('data:'):
+        format, imgstr = file_data.split(';base64,')
+        ext = format.split('/')[-1]
+        return ContentFile(base64.b64decode(imgstr), name=f'{field_name}.{ext}')
+    if isinstance(file_data, dict) and 'name' in file_data and 'content' in file_data:
+        return ContentFile(base64.b64decode(file_data['content']), name=file_data['name'])
+    logger.warning(f"Unexpected file data format for {field_name}")
+    return None
+
+
+class ClientGraphWriter:
+    """
+    Saves a client and its related records from the processing payload by diffing it
+    against an aggregate loaded with load_client_aggregate(include_hidden=True).
+
+    Every related table is written with at most one bulk_create, one bulk_update and
+    one delete-by-id, and lookups referenced by the payload (countries, states, banks,
+    relationships...) are fetched once per model, so the query count does not grow
+    with the number of children, nominees, policies or bank accounts. The returned
+    aggregate reflects the saved state and can be snapshotted without reloading.
+    """
+
+    def __init__(self, aggregate=None):
+        self.aggregate = aggregate or ClientAggregate(None, {relation.key: [] for relation in CLIENT_RELATIONS})
+        self.client_serializer = None
+        self.relation_serializers = []
+
+    def prepare(self, payload):
+        """Build every serializer with shared lookups; returns the client serializer for validation"""
+        client_data = payload.get('clientJson', {})
+        self.client_serializer = ClientModelSerializers(instance=self.aggregate.client, data=client_data)
+        serializers_with_rows = [(self.client_serializer, [client_data])]
+
+        for relation in CLIENT_RELATIONS:
+            data = payload.get(relation.payload_key)
+            if relation.write in (WRITE_DIFF, WRITE_REPLACE):
+                rows = list(data or [])
+                serializer = relation.serializer(data=rows, many=True)
+            elif relation.write == WRITE_FILES:
+                self.relation_serializers.append((relation, None, data or {}))
+                continue
+            else:
+                if relation.write == WRITE_ONE_IF_GIVEN and not data:
+                    continue
+                rows = [data or {}]
+                existing = self.aggregate.related[relation.key]
+                serializer = relation.serializer(instance=existing[-1] if existing else None, data=rows[0])
+            self.relation_serializers.append((relation, serializer, rows))
+            serializers_with_rows.append((serializer, rows))
+
+        prefetch_lookups(serializers_with_rows)
+        return self.client_serializer
+
+    def save(self):
+        """Write the client and all related tables; raises ValidationError on invalid related data"""
+        client = self.client_serializer.save()
+        related = {key: list(instances) for key, instances in self.aggregate.related.items()}
+
+        for relation, serializer, rows in self.relation_serializers:
+            existing = related[relation.key]
+            if relation.write == WRITE_FILES:
+                related[relation.key] = self._save_files(relation, client, existing, rows)
+                continue
+
+            if not serializer.is_valid():
+                raise ValidationError(serializer.errors)
+
+            if relation.write == WRITE_REPLACE:
+                related[relation.key] = self._replace(relation, client, existing, serializer.validated_data)
+            elif relation.write == WRITE_DIFF:
+                related[relation.key] = self._diff(relation, client, existing, rows, serializer.validated_data)
+            else:
+                related[relation.key] = self._save_one(relation, client, existing, serializer.validated_data)
+
+        self.aggregate = ClientAggregate(client, related)
+        return self.aggregate
+
+    def _new(self, relation, client, validated_data):
+        instance = relation.model(**validated_data)
+        setattr(instance, relation.fk, client)
+        return instance
+
+    def _write(self, relation, created=(), updated=(), update_fields=(), deleted_ids=()):
+        model = relation.model
+        if deleted_ids:
+            model.objects.filter(id__in=deleted_ids).delete()
+        if updated and update_fields:
+            update_fields = set(update_fields)
+            now = timezone.now()
+            for field in model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    update_fields.add(field.name)
+                    for instance in updated:
+                        setattr(instance, field.attname, now)
+            model.objects.bulk_update(updated, sorted(update_fields))
+        if created:
+            model.objects.bulk_create(created)
+
+    def _save_one(self, relation, client, existing, validated_data):
+        if existing:
+            instance = existing[-1]
+            changed = _assign(instance, validated_data)
+            self._write(relation, updated=[instance], update_fields=changed)
+            return existing
+        instance = self._new(relation, client, validated_data)
+        self._write(relation, created=[instance])
+        return [instance]
+
+    def _replace(self, relation, client, existing, validated_rows):
+        created = [self._new(relation, client, data) for data in validated_rows]
+        self._write(relation, created=created, deleted_ids=[instance.id for instance in existing])
+        return list(reversed(created))
+
+    def _diff(self, relation, client, existing, rows, validated_rows):
+        by_id = {instance.id: instance for instance in existing}
+        kept, created, updated, update_fields = set(), [], [], set()
+
+        for row, data in zip(rows, validated_rows):
+            instance = by_id.get(row.get('id'))
+            if instance is None:
+                created.append(self._new(relation, client, data))
+                continue
+            kept.add(instance.id)
+            changed = _assign(instance, data)
+            setattr(instance, relation.fk, client)
+            if changed:
+                updated.append(instance)
+                update_fields.update(changed)
+
+        deleted_ids = [instance_id for instance_id in by_id if instance_id not in kept]
+        self._write(relation, created=created, updated=updated, update_fields=update_fields,
+                    deleted_ids=deleted_ids)
+        remaining = [instance for instance in existing if instance.id in kept]
+        return list(reversed(created)) + remaining
+
+    def _save_files(self, relation, client, existing, upload_files_data):
+        instance = existing[-1] if existing else self._new(relation, client, {})
+        for field_name, file_data in upload_files_data.items():
+            if file_data:
+                data = _decode_upload(field_name, file_data)
+                if data is not None:
+                    setattr(instance, field_name, data)
+        if upload_files_data or instance.pk is None:
+            instance.save()
+        return existing if existing else [instance]
@@ -0,0 +1,453 @@
+#mailback.py
+
+import csv
+import hashlib
+import io
+import logging
+import os
+import re
+import struct
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import models
+from .models import MailbackImportJobModel
+
+logger = logging.getLogger(__name__)
+
+IMPORT_RUNNING = 'RUNNING'
+IMPORT_SUCCESS = 'SUCCESS'
+IMPORT_FAILED = 'FAILED'
+IMPORT_SKIPPED = 'SKIPPED'
+
+FILE_FORMATS = {'.dbf': 'dbf', '.csv': 'csv', '.txt': 'csv', '.xlsx': 'xlsx'}
+
+# The models mirroring CAMS/KFin mailback reports (the #DBF section of models.py)
+MAILBACK_MODELS = (
+    models.TransactionModel, models.CommonFormatModel, models.AumMainModel, models.AumReportCityModel,
+    models.AumReportStatusModel, models.AumReportCategoryModel, models.AumReportSubBrokerModel,
+    models.AumReportTransactionTypeModel, models.AumReportFundTypeModel, models.ClientWiseAumReportModel,
+    models.MarketMovementReportMainSheetModel, models.MarketMovementReportCityWiseModel,
+    models.MarketMovementReportAgeingOfAssetsModel, models.MarketMovementReportStatusWiseModel,
+    models.MarketMovementReportSubBrokerWiseModel, models.BrokerageReportModel, models.BrokerageEarningsReportModel,
+    models.InvestorBrokerageReportModel, models.TransactionWiseBrokerageReportModel,
+    models.CeoSummaryReportMovementOfAssetsModel, models.CeoSummaryReportKeyIndicatorsModel,
+    models.CeoSummaryReportTopFiveInvestorsModel, models.CeoSummaryReportTopFiveRedemptionsModel,
+    models.CeoSummaryReportTopFivePurchasesModel, models.CeoSummaryReportTopFiveSwitchesModel,
+    models.CeoSummaryReportTopFiveSubBrokersModel, models.RecentlyExitedInvestorsModel,
+    models.InvestorMasterInformationReportModel, models.TopFiveThousandProfitableInvestorsModel,
+    models.DividendAndBonusInformationReportModel, models.TopFiveInvestorsModel,
+    models.TopFiveMostFrequentInvestorsModel, models.NavReportModel, models.RejectionReportModel,
+    models.AverageAumRejectionReportModel, models.TransactionWiseInvestorMasterReportModel,
+    models.ChequeNumberWiseBrokerageReportModel, models.AccountWiseTransactionInvestorMasterModel,
+    models.AccountWiseInvestorMasterDetailsModel, models.SubBrokerProcurementAnalysisModel,
+    models.RegionAndCityWiseProcurementAnalysisModel, models.SlabWiseProcurementAnalysisModel,
+    models.AgeingWiseBrokeragePayoutAnalysisCashModel, models.AgeingWiseBrokeragePayoutAnalysisEquityAndIncomeModel,
+    models.RegionAndCityWiseBrokeragePayoutAnalysisModel, models.SubBrokerWiseBrokeragePayoutAnalysisModel,
+    models.CategoryWiseBrokeragePayoutAnalysisModel, models.SIPAndSTPInvestorsWhosePlanExpireShortlyModel,
+    models.SIPRejectionsModel, models.ClosedSIPAndSTPNonOperationalModel, models.SIPAndSTPReportModel,
+    models.SIPTerminationAndPauseReportModel, models.PANMissingReportModel, models.ConsolidateReportModel,
+    models.ActiveAndInactiveInvestorsReportModel, models.PreProcessRejectionReportModel,
+    models.TransactionWiseTITOReportModel, models.BrokerageSummaryReportModel, models.KYCReportModel,
+    models.INVKYCReportModel,
+)
+
+# File column codes of the CAMS (WBR2) and KFin transaction feeds that do not match a field name
+REPORT_ALIASES = {
+    models.TransactionModel: {
+        'TRXNTYPE': 'transactionType', 'TRXN_NATUR': 'transactionDescription', 'TRDESC': 'transactionDescription',
+        'TRXNMODE': 'transactionMode', 'SWFLAG': 'transactionFlag', 'PURRED': 'transactionPurred',
+        'TD_PURRED': 'transactionPurred',
+    },
+    models.CommonFormatModel: {
+        # CAMS
+        'PRODCODE': 'productCode', 'AMC_CODE': 'amcCode', 'FOLIO_NO': 'folioNumber', 'DIVOPT': 'dividendOption',
+        'TRXNNO': 'transactionNumber', 'INV_NAME': 'investorName', 'TRXNMODE': 'transactionMode',
+        'TRXNSTAT': 'transactionStatus', 'TRADDATE': 'processDate', 'BROKCODE': 'agentCode',
+        'SUBBROK': 'subBrokerCode', 'REP_DATE': 'reportDate', 'APPLICATIO': 'applicationNumber',
+        'TRXN_NATUR': 'transactionDescription', 'TRXNTYPE': 'transactionType', 'SCHEME_TYP': 'assetType',
+        'TRXNSUBTYP': 'subTransactionType', 'TER_LOCATI': 'cityCategory', 'TRXN_CHARG': 'transactionCharges',
+        'DP_ID': 'clientIdDematAccount', 'LOCATION': 'branchCode', 'USRTRXNO': 'userTransactionNumber',
+        'PAN': 'panNumber', 'TOTAL_TAX': 'tdsAmount', 'LOAD': 'loadAmount', 'EUIN_VALID': 'euinValidateIndicator',
+        'EUIN_OPTED': 'euinDeclarationIndicator', 'SUB_BRK_AR': 'subBrokerArnCode',
+        'SYS_REGN_D': 'sipRegistrationDate', 'SIPTRXNNO': 'sipRegistrationSerialNo', 'INV_IIN': 'commonAccountNumber',
+        'SWFLAG': 'transactionFlag', 'PURPRICE': 'purchasePrice', 'REVERSAL_C': 'reversal',
+        'EXCHANGE_F': 'exchangeTransactionMode',
+        # KFin
+        'TD_FUND': 'amcCode', 'FMCODE': 'productCode', 'TD_ACNO': 'folioNumber', 'TD_TRNO': 'transactionNumber',
+        'INVNAME': 'investorName', 'TD_TRDT': 'processDate', 'TD_UNITS': 'units', 'TD_AMT': 'amount',
+        'TD_AGENT': 'agentCode', 'TD_APPNO': 'applicationNumber', 'TRDESC': 'transactionDescription',
+        'TD_TRTYPE': 'transactionType', 'TD_NAV': 'navValue', 'PAN1': 'panNumber', 'TRCHARGES': 'transactionCharges',
+        'STAMPDUTY': 'stampDuty', 'IHNO': 'inHouseNumber', 'TD_BROKER': 'subBrokerCode',
+    },
+}
+
+# Columns every mailback model has that never come from a file
+BOOKKEEPING_FIELDS = ('id', 'hideStatus', 'createdAt', 'updatedAt')
+
+
+class MailbackImportError(Exception):
+    pass
+
+
+def normalize_column(name):
+    """'FOLIO_NO', 'Folio No.' and 'folioNo' all become 'foliono'"""
+    return re.sub(r'[^a-z0-9]', '', str(name or '').lower())
+
+
+def report_name(model):
+    """CommonFormatModel -> common_format, SIPAndSTPReportModel -> sip_and_stp_report"""
+    name = model.__name__[:-len('Model')] if model.__name__.endswith('Model') else model.__name__
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', '_', name).lower()
+
+
+class ReportSchema:
+    """
+    How the columns of one mailback report map onto its model. A file column maps
+    to the field whose name it matches once case, spaces and punctuation are
+    ignored, or through the report's aliases (the cryptic DBF column codes).
+    """
+
+    def __init__(self, model, aliases=None):
+        self.model = model
+        self.name = report_name(model)
+        self.fields = {
+            field.name: field
+            for field in model._meta.concrete_fields
+            if field.name not in BOOKKEEPING_FIELDS
+        }
+        self.lookup = {normalize_column(name): name for name in self.fields}
+        self.lookup.update({normalize_column(column): field for column, field in (aliases or {}).items()})
+
+    def field_for(self, column):
+        return self.lookup.get(normalize_column(column))
+
+    def map_columns(self, header, overrides=None):
+        """
+        ({column index: field name}, [unmapped columns]) for a file header. overrides
+        ({file column: field name}) take precedence; when several columns map to the
+        same field the first one wins.
+        """
+        overrides = {normalize_column(column): field for column, field in (overrides or {}).items()}
+        for field in overrides.values():
+            if field not in self.fields:
+                raise MailbackImportError(f"{self.name} has no field {field}")
+        mapping = {}
+        unmapped = []
+        for index, column in enumerate(header):
+            field = overrides.get(normalize_column(column)) or self.field_for(column)
+            if field and field not in mapping.values():
+                mapping[index] = field
+            elif column:
+                unmapped.append(column)
+        return mapping, unmapped
+
+
+REPORT_SCHEMAS = {schema.name: schema for schema in (ReportSchema(model, REPORT_ALIASES.get(model))
+                                                     for model in MAILBACK_MODELS)}
+
+
+def get_schema(name):
+    """Schema by report name (common_format) or model name (CommonFormatModel)"""
+    if name in REPORT_SCHEMAS:
+        return REPORT_SCHEMAS[name]
+    for schema in REPORT_SCHEMAS.values():
+        if schema.model.__name__ == name:
+            return schema
+    raise MailbackImportError(f"Unknown mailback report: {name}")
+
+
+def detect_schema(header):
+    """The schema that maps the most columns of header; ambiguous or poor matches raise"""
+    scores = sorted(
+        ((len(schema.map_columns(header)[0]), schema.name) for schema in REPORT_SCHEMAS.values()),
+        reverse=True,
+    )
+    (best, name), (runner_up, other) = scores[0], scores[1]
+    if best < 3:
+        raise MailbackImportError("The file's columns do not match any mailback report; pass the report name")
+    if best == runner_up:
+        raise MailbackImportError(f"The file's columns match both {name} and {other} equally; pass the report name")
+    return REPORT_SCHEMAS[name]
+
+
+def file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FILE_FORMATS:
+        raise MailbackImportError(f"Unsupported mailback file type {extension or path}; expected .dbf, .csv or .xlsx")
+    return FILE_FORMATS[extension]
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    """(sha256, size) of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class DbfReader:
+    """
+    Streaming dBase III/IV reader (the format of CAMS mailbacks). Records are read
+    a block at a time and only the requested columns are sliced out; deleted
+    records are skipped. Character and numeric values are returned as stripped
+    text, dates (D) as ISO strings.
+    """
+
+    HEADER = struct.Struct('<BBBBLHH20x')
+    FIELD = struct.Struct('<11sc4xBB14x')
+
+    def __init__(self, path, encoding='cp1252', block_records=2000):
+        self.file = open(path, 'rb')
+        self.encoding = encoding
+        self.block_records = block_records
+        _, _, _, _, self.row_count, header_length, self.record_length = self.HEADER.unpack(
+            self.file.read(self.HEADER.size))
+        self.columns = []  # (name, type, offset, length)
+        offset = 1  # after the deletion flag
+        while True:
+            descriptor = self.file.read(self.FIELD.size)
+            if not descriptor or descriptor[0] == 0x0D:
+                break
+            name, kind, length, _ = self.FIELD.unpack(descriptor)
+            self.columns.append((name.split(b'\0')[0].decode('ascii', 'replace').strip(),
+                                 kind.decode('ascii', 'replace').upper(), offset, length))
+            offset += length
+        self.file.seek(header_length)
+        self.header = [name for name, _, _, _ in self.columns]
+        # Single-byte codecs keep byte offsets, so a record can be decoded once and sliced
+        self.single_byte = len('\xff'.encode(encoding, 'replace')) == 1
+
+    def _value(self, kind, text):
+        text = text.strip()
+        if kind == 'D' and len(text) == 8 and text.isdigit():
+            return f'{text[:4]}-{text[4:6]}-{text[6:]}'
+        return text
+
+    def rows(self, indexes):
+        """Yield a tuple of the values at indexes for every live record"""
+        wanted = [self.columns[index] for index in indexes]
+        record_length = self.record_length
+        remaining = self.row_count
+        while remaining > 0:
+            block = self.file.read(record_length * min(self.block_records, remaining))
+            count = len(block) // record_length
+            if not count:
+                break
+            remaining -= count
+            for start in range(0, count * record_length, record_length):
+                if block[start] == 0x2A:  # '*' marks a deleted record
+                    continue
+                if self.single_byte:
+                    record = block[start:start + record_length].decode(self.encoding, 'replace')
+                    yield tuple(self._value(kind, record[offset:offset + length])
+                                for _, kind, offset, length in wanted)
+                else:
+                    yield tuple(
+                        self._value(kind, block[start + offset:start + offset + length].decode(self.encoding, 'replace'))
+                        for _, kind, offset, length in wanted)
+
+    def close(self):
+        self.file.close()
+
+
+class CsvReader:
+    """Streaming CSV reader; the delimiter is sniffed from the first lines (comma by default)"""
+
+    def __init__(self, path, encoding='utf-8-sig', skip_rows=0):
+        self.row_count = None
+        self.file = open(path, encoding=encoding, errors='replace', newline='')
+        sample = self.file.read(64 * 1024)
+        self.file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;|\t')
+        except csv.Error:
+            dialect = csv.excel
+        self.reader = csv.reader(self.file, dialect)
+        for _ in range(skip_rows):
+            next(self.reader, None)
+        self.header = [column.strip() for column in next(self.reader, [])]
+
+    def rows(self, indexes):
+        width = max(indexes) + 1 if indexes else 0
+        for row in self.reader:
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            yield tuple(row[index] for index in indexes)
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxReader:
+    """Streaming XLSX reader (openpyxl read-only mode); dates become ISO strings, whole floats integers"""
+
+    def __init__(self, path, sheet=None, skip_rows=0):
+        from openpyxl import load_workbook
+
+        self.row_count = None
+        self.workbook = load_workbook(path, read_only=True, data_only=True)
+        worksheet = self.workbook[sheet] if sheet else self.workbook.active
+        self.iter_rows = worksheet.iter_rows(values_only=True)
+        for _ in range(skip_rows):
+            next(self.iter_rows, None)
+        self.header = [self._value(column) for column in next(self.iter_rows, ())]
+
+    @staticmethod
+    def _value(value):
+        if value is None:
+            return ''
+        if isinstance(value, datetime):
+            return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value).strip()
+
+    def rows(self, indexes):
+        for row in self.iter_rows:
+            yield tuple(self._value(row[index]) if index < len(row) else '' for index in indexes)
+
+    def close(self):
+        self.workbook.close()
+
+
+def open_mailback(path, file_format, encoding=None, sheet=None, skip_rows=0):
+    if file_format == 'dbf':
+        return DbfReader(path, encoding=encoding or 'cp1252')
+    if file_format == 'csv':
+        return CsvReader(path, encoding=encoding or 'utf-8-sig', skip_rows=skip_rows)
+    return XlsxReader(path, sheet=sheet, skip_rows=skip_rows)
+
+
+class ChunkWriter:
+    """
+    Appends rows of one model in chunks: COPY on PostgreSQL, bulk_create elsewhere.
+    Values are stripped text; blanks become NULL and over-long values are cut to
+    the field's max_length (counted in truncated).
+    """
+
+    def __init__(self, schema, fields):
+        self.model = schema.model
+        self.fields = fields
+        self.max_lengths = [schema.fields[field].max_length for field in fields]
+        self.truncated = 0
+
+    def clean(self, values):
+        """Row values ready to store, or None for a blank row"""
+        cleaned = []
+        blank = True
+        for value, max_length in zip(values, self.max_lengths):
+            value = value.strip() if isinstance(value, str) else value
+            if value == '' or value is None:
+                cleaned.append(None)
+                continue
+            blank = False
+            if max_length and len(value) > max_length:
+                value = value[:max_length]
+                self.truncated += 1
+            cleaned.append(value)
+        return None if blank else cleaned
+
+    def write(self, rows):
+        if not rows:
+            return
+        if connection.vendor == 'postgresql':
+            self._copy(rows)
+        else:
+            self.model.objects.bulk_create([self.model(**dict(zip(self.fields, row))) for row in rows],
+                                           batch_size=1000)
+
+    def _copy(self, rows):
+        opts = self.model._meta
+        quote = connection.ops.quote_name
+        columns = [opts.get_field(field).column for field in self.fields]
+        columns += [opts.get_field('hideStatus').column, opts.get_field('createdAt').column,
+                    opts.get_field('updatedAt').column]
+        now = timezone.now().isoformat()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row] + [0, now, now])
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(opts.db_table)} ({', '.join(quote(column) for column in columns)}) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+
+
+def import_mailback(path, report=None, file_format_name=None, encoding=None, sheet=None, skip_rows=0,
+                    overrides=None, chunk_size=20000, force=False):
+    """
+    Import one mailback file into its report model and record a MailbackImportJobModel.
+
+    The file is streamed: rows are read, mapped and written chunk_size at a time, so
+    memory stays flat however large the file is. All chunks are written in one
+    transaction, so a failed import leaves no rows behind. A file already imported
+    successfully for the same report (same sha256) is skipped unless force is set.
+    Raises MailbackImportError when the file cannot be mapped; the job records it.
+    """
+    started = time.monotonic()
+    fmt = file_format_name or file_format(path)
+    checksum, size = file_checksum(path)
+    job = MailbackImportJobModel(importFileName=os.path.basename(path), importFileFormat=fmt, importFileSize=size,
+                                 importChecksum=checksum, importStatus=IMPORT_RUNNING, importReport=report or '')
+
+    reader = None
+    try:
+        reader = open_mailback(path, fmt, encoding=encoding, sheet=sheet, skip_rows=skip_rows)
+        schema = get_schema(report) if report else detect_schema(reader.header)
+        job.importReport = schema.name
+        mapping, unmapped = schema.map_columns(reader.header, overrides)
+        if not mapping:
+            raise MailbackImportError(f"No column of {job.importFileName} maps to a {schema.name} field")
+        job.importColumns = {reader.header[index]: field for index, field in mapping.items()}
+        job.importUnmappedColumns = unmapped
+
+        if not force and MailbackImportJobModel.objects.filter(
+                importReport=schema.name, importChecksum=checksum, importStatus=IMPORT_SUCCESS).exists():
+            job.importStatus = IMPORT_SKIPPED
+            job.save()
+            return job
+        job.save()
+
+        indexes = list(mapping)
+        writer = ChunkWriter(schema, [mapping[index] for index in indexes])
+        rows = reader.rows(indexes)
+        with transaction.atomic():
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                cleaned = [values for values in map(writer.clean, chunk) if values is not None]
+                writer.write(cleaned)
+                job.importRowsRead += len(chunk)
+                job.importRowsImported += len(cleaned)
+                logger.debug(f"{job.importFileName}: {job.importRowsRead} rows read")
+        job.importRowsSkipped = job.importRowsRead - job.importRowsImported
+        job.importValuesTruncated = writer.truncated
+        job.importStatus = IMPORT_SUCCESS
+    except Exception as e:
+        job.importStatus = IMPORT_FAILED
+        job.importRowsImported = 0
+        job.importError = str(e)
+        logger.error(f"Mailback import of {path} failed: {str(e)}", exc_info=not isinstance(e, MailbackImportError))
+        raise
+    finally:
+        if reader is not None:
+            reader.close()
+        if job.importStatus != IMPORT_SKIPPED:
+            job.importDuration = Decimal(f'{time.monotonic() - started:.3f}')
+            job.save()
+    return job
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+import os
+from django.core.management.base import BaseCommand, CommandError
+from apis.amfi_standin import StandinServer, SyntheticFeed, history_fixture_name, LATEST_FIXTURE_NAME
+
+
+class Command(BaseCommand):
+    help = ('Serve recorded or synthetic AMFI NAV feeds over HTTP for offline ingestion runs and benchmarks '
+            '(set AMFI_FEED_BASE_URL to the printed URL), or write synthetic feed files with --write-fixtures')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to listen on')
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+        parser.add_argument('--schemes', type=int, default=2000, help='Schemes in each synthetic file')
+        parser.add_argument('--amcs', type=int, default=40, help='AMCs the synthetic schemes are spread over')
+        parser.add_argument(
+            '--fixtures',
+            type=str,
+            help='Directory of recorded files (NAVHistory_YYYY-MM-DD.txt, NAVAll.txt) served instead of synthetic ones',
+        )
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            help='With --fixtures, download and keep any file missing from the directory from AMFI',
+        )
+        parser.add_argument('--latency-ms', type=int, default=0, help='Delay added to every response')
+        parser.add_argument('--jitter-ms', type=int, default=0, help='Random extra delay of up to this much')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of responses answered with 503')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the latency jitter and injected errors')
+        parser.add_argument(
+            '--latest-date',
+            type=str,
+            help='Date (dd-MMM-yyyy) the latest-NAV file is published for (default: today)',
+        )
+        parser.add_argument(
+            '--write-fixtures',
+            type=str,
+            help='Write synthetic history files for --start_date..--end_date and a NAVAll.txt to this directory, then exit',
+        )
+        parser.add_argument('--start_date', type=str, help='With --write-fixtures, first date (dd-MMM-yyyy)')
+        parser.add_argument('--end_date', type=str, help='With --write-fixtures, last date (dd-MMM-yyyy)')
+
+    def handle(self, *args, **options):
+        feed = SyntheticFeed(schemes=options['schemes'], amcs=options['amcs'])
+        latest_date = self.parse_date(options.get('latest_date'))
+
+        if options.get('write_fixtures'):
+            self.write_fixtures(feed, options['write_fixtures'], self.parse_date(options.get('start_date')),
+                                self.parse_date(options.get('end_date')), latest_date)
+            return
+
+        if options['record'] and not options.get('fixtures'):
+            raise CommandError('--record needs --fixtures')
+
+        server = StandinServer(
+            host=options['host'], port=options['port'], feed=feed, fixtures_dir=options.get('fixtures'),
+            record=options['record'], latency_ms=options['latency_ms'], jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'], seed=options['seed'], latest_date=latest_date,
+        )
+        self.stdout.write(self.style.SUCCESS(f'AMFI stand-in listening on {server.url}'))
+        self.stdout.write(f'Run ingestion against it with AMFI_FEED_BASE_URL={server.url}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+            self.stdout.write(f'Served {server.requests} requests, {server.errors} injected errors')
+
+    def write_fixtures(self, feed, directory, start_date, end_date, latest_date):
+        if not start_date or not end_date:
+            raise CommandError('--write-fixtures needs --start_date and --end_date')
+        os.makedirs(directory, exist_ok=True)
+        day = start_date
+        total = 0
+        while day <= end_date:
+            total += feed.write(os.path.join(directory, history_fixture_name(day)), day)
+            day += timedelta(days=1)
+        total += feed.write(os.path.join(directory, LATEST_FIXTURE_NAME), latest_date or end_date, latest=True)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} bytes of fixtures to {directory}'))
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%d-%b-%Y').date() if value else None
+        except ValueError:
+            raise CommandError(f'Invalid date: {value}')
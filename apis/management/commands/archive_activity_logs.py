@@ -0,0 +1,67 @@
+from datetime import date
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from apis.models import ActivityLog
+from apis import audit_archive, partitions
+
+
+def months_before(day, months):
+    """First day of the month `months` months before day's month"""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = 'Archive activity logs older than the retention window to gzipped JSON Lines under MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months',
+            type=int,
+            default=getattr(settings, 'ACTIVITY_LOG_RETENTION_MONTHS', 12),
+            help='Number of months (including the current one) kept in the database',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the months that would be archived without touching them',
+        )
+
+    def oldest_month(self):
+        table = ActivityLog._meta.db_table
+        candidates = []
+        oldest = ActivityLog.objects.aggregate(oldest=Min('created_at'))['oldest']
+        if oldest:
+            candidates.append(partitions.period_start(oldest, partitions.MONTH))
+        if partitions.is_partitioned(table):
+            # Empty partitions are dropped as well
+            for name, _, _ in partitions.list_partitions(table):
+                suffix = name[len(table) + 2:]
+                if name.startswith(f'{table}_p') and len(suffix) == 7:
+                    candidates.append(date(int(suffix[:4]), int(suffix[5:]), 1))
+        return min(candidates) if candidates else None
+
+    def handle(self, *args, **options):
+        keep_months = max(options['keep_months'], 1)
+        cutoff = months_before(date.today(), keep_months - 1)
+        first = self.oldest_month()
+        if first is None or first >= cutoff:
+            self.stdout.write(f'Nothing older than {cutoff:%Y-%m} to archive')
+            return
+
+        total = 0
+        for start, _ in partitions.iter_periods(first, months_before(cutoff, 1), partitions.MONTH):
+            if options['dry_run']:
+                rows = audit_archive.month_queryset(start).count()
+                self.stdout.write(f'Would archive {start:%Y-%m}: {rows} rows')
+                continue
+            path, rows = audit_archive.archive_month(start)
+            total += rows
+            if path:
+                self.stdout.write(self.style.SUCCESS(f'Archived {start:%Y-%m}: {rows} rows to {path}'))
+            else:
+                self.stdout.write(f'{start:%Y-%m}: nothing to archive')
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Archived {total} activity logs older than {cutoff:%Y-%m}'))
@@ -0,0 +1,122 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from apis.amfi import download_nav_history, iter_download_lines, iter_nav_rows, build_session, HostRateLimiter
+from apis.models import FundModel, NavIngestionLedgerModel
+from apis.nav_ingest import NavEntityResolver, copy_upsert_navs, supports_copy_upsert, LEDGER_SUCCESS
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ('Backfill fund scheme types, SEBI categories and ISINs (and optionally NAV repurchase/sale prices) '
+            'from AMFI NAV history reports')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            action='append',
+            default=[],
+            help='Saved AMFI NAV history report to read instead of downloading; may be repeated',
+        )
+        parser.add_argument(
+            '--start_date',
+            type=str,
+            help='Only re-download ingested dates from this date (dd-MMM-yyyy)',
+        )
+        parser.add_argument(
+            '--end_date',
+            type=str,
+            help='Only re-download ingested dates up to this date (dd-MMM-yyyy)',
+        )
+        parser.add_argument(
+            '--prices',
+            action='store_true',
+            help='Also store repurchase and sale prices on every NAV row read (reads every date)',
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=50000,
+            help='Rows resolved and written per batch',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=2.0,
+            help='Maximum requests per second sent to the AMFI host (0 disables rate limiting)',
+        )
+
+    def handle(self, *args, **options):
+        if options['prices'] and not supports_copy_upsert():
+            raise CommandError('--prices needs PostgreSQL')
+
+        self.batch_size = options['batch_size']
+        self.prices = options['prices']
+        self.resolver = NavEntityResolver()
+        self.rows_read = 0
+
+        if options['file']:
+            for path in options['file']:
+                with open(path, encoding='utf-8', errors='replace') as report:
+                    self.backfill(iter_nav_rows(line.rstrip('\n') for line in report), path)
+        else:
+            self.backfill_ledger_dates(options.get('start_date'), options.get('end_date'), options.get('rate'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Read {self.rows_read} NAV rows; {self.funds_missing_category()} funds with a scheme code '
+            f'still have no category'))
+
+    def backfill_ledger_dates(self, start_date, end_date, rate):
+        """
+        Re-download successfully ingested dates, newest first. Without --prices it stops
+        as soon as every fund with a scheme code has a category, since a fund's
+        category and ISINs are the same on every date it appears.
+        """
+        ledger = NavIngestionLedgerModel.objects.filter(ledgerStatus=LEDGER_SUCCESS)
+        if start_date:
+            ledger = ledger.filter(ledgerDate__gte=datetime.strptime(start_date, '%d-%b-%Y').date())
+        if end_date:
+            ledger = ledger.filter(ledgerDate__lte=datetime.strptime(end_date, '%d-%b-%Y').date())
+        days = list(ledger.order_by('-ledgerDate').values_list('ledgerDate', flat=True))
+
+        session = build_session(pool_size=1)
+        rate_limiter = HostRateLimiter(rate)
+        for day in days:
+            if not self.prices and not self.funds_missing_category():
+                self.stdout.write('Every fund with a scheme code has a category; stopping')
+                return
+            try:
+                download = download_nav_history(day, session=session, rate_limiter=rate_limiter)
+            except requests.exceptions.RequestException as e:
+                self.stdout.write(self.style.WARNING(f'Could not download {day}: {str(e)}. Continuing.'))
+                continue
+            self.backfill(iter_nav_rows(iter_download_lines(download)), day)
+
+    def backfill(self, nav_rows, source):
+        count = 0
+        batch = []
+        for row in nav_rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+            count += len(batch)
+        self.rows_read += count
+        self.stdout.write(f'{source}: {count} rows')
+
+    def write_batch(self, rows):
+        # The resolver moves changed categories and ISINs with one bulk_update per batch
+        fund_ids = self.resolver.resolve(rows)
+        if self.prices:
+            copy_upsert_navs(
+                (fund_id, row.nav_date, row.nav, row.repurchase_price, row.sale_price)
+                for row, fund_id in zip(rows, fund_ids)
+            )
+
+    def funds_missing_category(self):
+        return FundModel.objects.filter(schemeCode__isnull=False, fundCategory__isnull=True).count()
@@ -0,0 +1,282 @@
+from datetime import datetime, timedelta
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from apis.amfi import read_feed_file, iter_download_lines, iter_nav_rows
+from apis.amfi_standin import SyntheticFeed, history_fixture_name
+from apis.management.commands.fetch_nav_data import Command as FetchNavDataCommand
+from apis.nav_ingest import supports_copy_upsert
+import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('parse', 'resolve', 'write')
+
+
+class RollBack(Exception):
+    pass
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class TimedIngest(FetchNavDataCommand):
+    """fetch_nav_data's ingest path, timing and counting the queries of each phase"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.phase = 'parse'
+        self.seconds = Counter()
+        self.queries = Counter()
+        self.write_batches = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        # COPY streams bypass Django's cursor wrapper; write_batches counts those (one per batch)
+        self.queries[self.phase] += 1
+        return execute(sql, params, many, context)
+
+    def write_nav_batch(self, rows):
+        started = time.perf_counter()
+        writing = self.seconds['write']
+        self.phase = 'resolve'
+        try:
+            super().write_nav_batch(rows)
+        finally:
+            self.phase = 'parse'
+        self.seconds['resolve'] += time.perf_counter() - started - (self.seconds['write'] - writing)
+
+    def bulk_update_or_create_nav(self, nav_data):
+        started = time.perf_counter()
+        self.phase = 'write'
+        try:
+            super().bulk_update_or_create_nav(nav_data)
+        finally:
+            self.phase = 'resolve'
+        self.seconds['write'] += time.perf_counter() - started
+        self.write_batches += 1
+
+    def ingest(self, path, day):
+        """Replay one feed file through process_nav_data; returns (rows, seconds)"""
+        started = time.perf_counter()
+        in_batches = self.seconds['resolve'] + self.seconds['write']
+        rows = self.process_nav_data(iter_nav_rows(iter_download_lines(read_feed_file(path))), day)
+        elapsed = time.perf_counter() - started
+        # Everything outside write_nav_batch is reading and parsing the file
+        self.seconds['parse'] += elapsed - (self.seconds['resolve'] + self.seconds['write'] - in_batches)
+        return rows, elapsed
+
+
+class Command(BaseCommand):
+    help = ('Benchmark NAV ingestion: replay days of recorded or synthetic AMFI history files through '
+            "fetch_nav_data's parse, resolve and write path and report throughput, queries, peak RSS and the "
+            'time spent in each phase as JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=5, help='Trading days to replay')
+        parser.add_argument('--schemes', type=int, default=10000, help='Schemes in each synthetic file')
+        parser.add_argument('--amcs', type=int, default=40, help='AMCs the synthetic schemes are spread over')
+        parser.add_argument(
+            '--start_date',
+            type=str,
+            default='01-Jan-2024',
+            help='First synthetic date (dd-MMM-yyyy); weekends are skipped',
+        )
+        parser.add_argument(
+            '--fixtures',
+            type=str,
+            help='Replay the first --days NAVHistory_YYYY-MM-DD.txt files of this directory instead of synthetic ones',
+        )
+        parser.add_argument('--batch_size', type=int, default=50000, help='Rows resolved and written per batch')
+        parser.add_argument(
+            '--only-new',
+            action='store_true',
+            help='Benchmark the insert-only path used by --latest instead of the upsert',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Commit the rows loaded (by default the run is rolled back)',
+        )
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file instead of stdout')
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='JSON report of an earlier run (e.g. another commit) to compare this one with',
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            help='With --baseline, fail when rows/sec drops or queries per 1k rows rise by more than this percent',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        baseline = self.load_baseline(options.get('baseline'))
+
+        with tempfile.TemporaryDirectory(prefix='nav-benchmark-') as scratch:
+            feeds = self.feed_files(options, scratch)
+            report = self.run(feeds, options)
+
+        report_json = json.dumps(report, indent=2)
+        if options.get('output'):
+            with open(options['output'], 'w') as output:
+                output.write(report_json + '\n')
+            self.print_report(report)
+            self.stdout.write(f"\nReport written to {options['output']}")
+        else:
+            self.stdout.write(report_json)
+
+        if baseline:
+            self.compare(report, baseline, options.get('max_regression'))
+
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read baseline {path}: {str(e)}')
+
+    def feed_files(self, options, scratch):
+        """[(date, path)] of the files to replay; synthetic ones are written to scratch before timing starts"""
+        if options.get('fixtures'):
+            paths = sorted(glob.glob(os.path.join(options['fixtures'], 'NAVHistory_*.txt')))
+            feeds = []
+            for path in paths[:options['days']]:
+                name = os.path.basename(path)
+                feeds.append((datetime.strptime(name, 'NAVHistory_%Y-%m-%d.txt'), path))
+            if not feeds:
+                raise CommandError(f"No NAVHistory_YYYY-MM-DD.txt files in {options['fixtures']}")
+            return feeds
+
+        try:
+            day = datetime.strptime(options['start_date'], '%d-%b-%Y')
+        except ValueError:
+            raise CommandError('--start_date must be a dd-MMM-yyyy date')
+        feed = SyntheticFeed(schemes=options['schemes'], amcs=options['amcs'])
+        feeds = []
+        while len(feeds) < options['days']:
+            if day.weekday() < 5:
+                path = os.path.join(scratch, history_fixture_name(day.date()))
+                feed.write(path, day.date())
+                feeds.append((day, path))
+            day += timedelta(days=1)
+        return feeds
+
+    def run(self, feeds, options):
+        ingest = TimedIngest(stdout=self.stdout, stderr=self.stderr)
+        ingest.prepare({'batch_size': options['batch_size']})
+        ingest.only_new = options['only_new']
+
+        rss_before = peak_rss_mb()
+        days = []
+        try:
+            with transaction.atomic(), connection.execute_wrapper(ingest.count_query):
+                for day, path in feeds:
+                    queries = sum(ingest.queries.values())
+                    rows, seconds = ingest.ingest(path, day)
+                    days.append({
+                        'date': day.date().isoformat(),
+                        'rows': rows,
+                        'seconds': round(seconds, 4),
+                        'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+                        'queries': sum(ingest.queries.values()) - queries,
+                    })
+                if not options['keep']:
+                    raise RollBack
+        except RollBack:
+            pass
+
+        rows = sum(day['rows'] for day in days)
+        seconds = sum(ingest.seconds[phase] for phase in PHASES)
+        queries = sum(ingest.queries.values())
+        return {
+            'benchmark': 'nav_ingest',
+            'revision': git_revision(),
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'write_path': ('copy_insert_new_navs' if ingest.only_new else 'copy_upsert_navs')
+            if supports_copy_upsert() else 'orm',
+            'options': {
+                'days': len(feeds),
+                'schemes': None if options.get('fixtures') else options['schemes'],
+                'fixtures': options.get('fixtures'),
+                'batch_size': options['batch_size'],
+                'only_new': options['only_new'],
+                'kept': options['keep'],
+            },
+            'rows': rows,
+            'rows_written': ingest.records_inserted,
+            'seconds': round(seconds, 4),
+            'rows_per_sec': round(rows / seconds, 1) if seconds else None,
+            'queries': queries,
+            'write_batches': ingest.write_batches,
+            'queries_per_1k_rows': round(queries * 1000 / rows, 2) if rows else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_rss_growth_mb': round(peak_rss_mb() - rss_before, 1) if rss_before is not None else None,
+            'phases': {
+                phase: {
+                    'seconds': round(ingest.seconds[phase], 4),
+                    'share': round(ingest.seconds[phase] / seconds, 4) if seconds else None,
+                    'queries': ingest.queries[phase],
+                }
+                for phase in PHASES
+            },
+            'days': days,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{report['rows']} rows over {report['options']['days']} days in {report['seconds']}s "
+            f"({report['rows_per_sec']} rows/sec, {report['write_path']})"))
+        self.stdout.write(f"Queries: {report['queries']} ({report['queries_per_1k_rows']} per 1k rows), "
+                          f"write batches: {report['write_batches']}")
+        self.stdout.write(f"Peak RSS: {report['peak_rss_mb']} MB (+{report['peak_rss_growth_mb']} MB during the run)")
+        for phase, split in report['phases'].items():
+            self.stdout.write(f"  {phase}: {split['seconds']}s ({split['share']:.0%}), {split['queries']} queries")
+
+    def compare(self, report, baseline, max_regression):
+        """Print the change of each headline metric from baseline; fail past max_regression percent"""
+        self.stdout.write(f"\nCompared with {baseline.get('revision') or 'baseline'}:")
+        regressions = []
+        # (metric, True when a higher value is better)
+        for metric, higher_is_better in (('rows_per_sec', True), ('queries_per_1k_rows', False),
+                                         ('peak_rss_mb', False)):
+            before, after = baseline.get(metric), report.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            self.stdout.write(f"  {metric}: {before} -> {after} ({change:+.1f}%)")
+            worse = -change if higher_is_better else change
+            if max_regression is not None and metric != 'peak_rss_mb' and worse > max_regression:
+                regressions.append(f"{metric} {change:+.1f}%")
+        if regressions:
+            raise CommandError(f"Regression over {max_regression}%: {', '.join(regressions)}")
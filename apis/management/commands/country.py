@@ -3,6 +3,7 @@ import requests
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from apis.models import CountryModel  # Replace 'your_app' with your actual app name
+from apis.master_cache import invalidate_master_data, master_namespace
 
 
 class Command(BaseCommand):
@@ -25,6 +26,7 @@ class Command(BaseCommand):
                             'dailCode': country['dial_code'],
                         }
                     )
+                invalidate_master_data(master_namespace(CountryModel))
 
             self.stdout.write(self.style.SUCCESS('Successfully populated CountryModel'))
         except requests.RequestException as e:
@@ -3,6 +3,7 @@ import requests
 from datetime import datetime
 import csv
 import os
+from apis.amfi import fetch_nav_rows
 
 
 class Command(BaseCommand):
@@ -36,47 +37,26 @@ class Command(BaseCommand):
         output_dir = os.path.dirname(output_file)
         os.makedirs(output_dir, exist_ok=True)
 
-        url = f"https://portal.amfiindia.com/DownloadNAVHistoryReport_Po.aspx?frmdt={date_str}"
-
         try:
-            response = requests.get(url)
-            response.raise_for_status()
+            date = datetime.strptime(date_str, '%d-%b-%Y')
+        except ValueError:
+            self.stdout.write(self.style.ERROR(f"Invalid date format: {date_str}"))
+            return
 
-            data_lines = response.text.splitlines()
+        try:
+            nav_rows = fetch_nav_rows(date)
 
             with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
                 csvwriter = csv.writer(csvfile)
                 csvwriter.writerow(['Date', 'Fund Family', 'Scheme Name', 'Net Asset Value'])
 
-                current_amc_name = None
-                for line in data_lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    if line.startswith("Open Ended Schemes") or line.startswith("Close Ended Schemes"):
-                        continue
-
-                    if not line[0].isdigit() and ';' not in line:
-                        current_amc_name = line
-                        continue
-
-                    if current_amc_name and ';' in line:
-                        fields = line.split(';')
-                        if len(fields) < 8:
-                            continue
-
-                        scheme_name = fields[1]
-                        net_asset_value = fields[4]
-                        date = fields[7]
-
-                        try:
-                            parsed_date = datetime.strptime(date, '%d-%b-%Y').strftime('%d-%b-%Y')
-                        except ValueError:
-                            self.stdout.write(self.style.WARNING(f"Invalid date format: {date}"))
-                            parsed_date = date
-
-                        csvwriter.writerow([parsed_date, current_amc_name, scheme_name, net_asset_value])
+                for row in nav_rows:
+                    csvwriter.writerow([
+                        row.nav_date.strftime('%d-%b-%Y') if row.nav_date else '',
+                        row.amc_name,
+                        row.scheme_name,
+                        str(row.nav) if row.nav is not None else '',
+                    ])
 
             self.stdout.write(self.style.SUCCESS(f'Successfully saved NAV data to {output_file}'))
 
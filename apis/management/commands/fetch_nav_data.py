@@ -1,13 +1,21 @@
 from django.core.management.base import BaseCommand
-from django.db import transaction, connection
+from django.db import transaction
 from django.db.utils import IntegrityError
-from apis.models import NavModel, AmcEntryModel, FundModel
+from apis.models import NavModel
+from apis.amfi import (download_nav_history, download_latest_navs, read_feed_file, iter_download_lines, iter_nav_rows,
+                       build_session, backoff_delay, HostRateLimiter)
+from apis.nav_ingest import (supports_copy_upsert, copy_upsert_navs, copy_insert_new_navs, refresh_latest_navs,
+                             NavEntityResolver, record_ledger, ledger_checksums, missing_nav_dates, LEDGER_FAILED)
+from apis.partitions import estimated_row_count
 from django.db.transaction import TransactionManagementError
 import requests
 from datetime import datetime, timedelta
 import pytz
 import logging
-from collections import defaultdict
+import queue
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import time
 from django.conf import settings
 from psycopg2 import OperationalError
@@ -16,7 +24,8 @@ logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = 'Fetch and create new NAV data for a specific date, yesterday, or a date range'
+    help = ('Fetch and create new NAV data from the latest-NAV file, or from the history report for a specific date, '
+            'yesterday, a date range, or every missing date')
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -43,6 +52,50 @@ class Command(BaseCommand):
             default=50000,
             help='Batch size for database operations',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of dates to download concurrently for a date range. Database writes stay on one writer.',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=2.0,
+            help='Maximum requests per second sent to the AMFI host (0 disables rate limiting)',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Fetch only the trading dates missing from the ingestion ledger within the last --days days',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='With --sync, how many days back from yesterday to look for gaps',
+        )
+        parser.add_argument(
+            '--recheck',
+            type=int,
+            default=2,
+            help='With --sync, always re-fetch this many most recent trading days (skipped if unchanged upstream)',
+        )
+        parser.add_argument(
+            '--latest',
+            action='store_true',
+            help="Daily fast path: read AMFI's latest-NAV file (NAVAll.txt) once and insert only new (scheme, date) rows",
+        )
+        parser.add_argument(
+            '--source-file',
+            type=str,
+            help='Read this saved feed file instead of downloading (with --latest or --date), e.g. a recorded fixture',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Process files even when their checksum matches the last successful ingest',
+        )
 
     def handle(self, *args, **options):
         logger.info(f"Starting fetch_nav_data command at {datetime.now()}")
@@ -50,14 +103,13 @@ class Command(BaseCommand):
             date = options.get('date')
             start_date = options.get('start_date')
             end_date = options.get('end_date')
-            self.batch_size = options.get('batch_size')
-
-            self.records_per_day = defaultdict(int)
-            self.records_per_month = defaultdict(int)
-            self.total_records_fetched = 0
-            self.total_records_processed = 0
+            self.prepare(options)
 
-            if start_date and end_date:
+            if options.get('latest'):
+                self.fetch_latest()
+            elif options.get('sync'):
+                self.fetch_missing_dates(options.get('days'), options.get('recheck'))
+            elif start_date and end_date:
                 self.fetch_date_range(start_date, end_date)
             elif date:
                 self.fetch_single_date(date)
@@ -71,17 +123,220 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(error_msg))
             logger.error(error_msg, exc_info=True)
 
+    def prepare(self, options):
+        """Reset the per-run state from this command's options"""
+        self.batch_size = options.get('batch_size')
+        self.workers = max(options.get('workers') or 1, 1)
+        self.session = build_session(pool_size=self.workers)
+        self.rate_limiter = HostRateLimiter(options.get('rate'))
+        self.max_retries = 3
+        self.retry_base_delay = 2
+        self.resolver = None
+        self.force = options.get('force')
+        self.ledger_checksums = {}
+        self.skipped_dates = 0
+        self.source_file = options.get('source_file')
+        self.only_new = False
+        self.records_inserted = 0
+
+        self.records_per_day = defaultdict(int)
+        self.records_per_month = defaultdict(int)
+        self.total_records_fetched = 0
+        self.total_records_processed = 0
+        self.dates_completed = 0
+        self.fetch_started = time.monotonic()
+
+    def fetch_latest(self):
+        """
+        Insert the rows of AMFI's latest-NAV file whose (scheme, date) is not stored yet.
+
+        One small file covers every scheme, so the daily run neither waits for the
+        history report to be generated nor rewrites NAVs already stored. The date
+        most schemes report is recorded in the ingestion ledger; the history report
+        stays the source for backfills and --sync.
+        """
+        self.only_new = True
+        for attempt in range(self.max_retries):
+            try:
+                started = time.monotonic()
+                if self.source_file:
+                    download = read_feed_file(self.source_file)
+                else:
+                    download = download_latest_navs(session=self.session, rate_limiter=self.rate_limiter)
+
+                dates = Counter()
+
+                def counted(rows):
+                    for row in rows:
+                        dates[row.nav_date] += 1
+                        yield row
+
+                nav_count = self.process_nav_data(counted(iter_nav_rows(iter_download_lines(download))), None)
+                dates.pop(None, None)
+                if not dates:
+                    self.stdout.write(self.style.WARNING("The latest-NAV file had no dated NAV rows"))
+                    return 0
+
+                day, day_count = dates.most_common(1)[0]
+                record_ledger(day, day_count, None, time.monotonic() - started)
+                self.update_statistics(datetime.combine(day, datetime.min.time()), nav_count)
+                self.stdout.write(self.style.SUCCESS(
+                    f"\nLatest NAVs read: {nav_count} ({day_count} dated {day.strftime('%d-%b-%Y')}), "
+                    f"new rows inserted: {self.records_inserted}"))
+                return nav_count
+
+            except requests.exceptions.RequestException as e:
+                if attempt < self.max_retries - 1:
+                    retry_delay = backoff_delay(attempt, base=self.retry_base_delay)
+                    self.stdout.write(self.style.WARNING(
+                        f"Error fetching the latest-NAV file. Retrying in {retry_delay:.1f} seconds..."))
+                    time.sleep(retry_delay)
+                else:
+                    error_msg = f'Error fetching the latest-NAV file after {self.max_retries} attempts: {str(e)}'
+                    self.stdout.write(self.style.ERROR(error_msg))
+                    logger.error(error_msg)
+                    return None
+
     def fetch_date_range(self, start_date_str, end_date_str):
         start_date = datetime.strptime(start_date_str, '%d-%b-%Y')
         end_date = datetime.strptime(end_date_str, '%d-%b-%Y')
+        dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        self.fetch_dates(dates)
+
+    def fetch_missing_dates(self, days, recheck):
+        kolkata_tz = pytz.timezone('Asia/Kolkata')
+        yesterday = (datetime.now(kolkata_tz) - timedelta(days=1)).date()
+        first_day = yesterday - timedelta(days=max(days, 1) - 1)
 
-        current_date = start_date
-        while current_date <= end_date:
+        missing = missing_nav_dates(first_day, yesterday, recheck_days=recheck)
+        if not missing:
+            self.stdout.write(self.style.SUCCESS(f"NAV data is complete from {first_day} to {yesterday}"))
+            return
+
+        self.stdout.write(f"Syncing {len(missing)} dates: {', '.join(str(day) for day in missing)}")
+        self.fetch_dates([datetime.combine(day, datetime.min.time()) for day in missing])
+
+    def fetch_dates(self, dates):
+        self.ledger_checksums.update(ledger_checksums(date.date() for date in dates))
+
+        if self.workers > 1:
+            self.fetch_dates_concurrently(dates)
+            return
+
+        for current_date in dates:
             records = self.fetch_data_for_date(current_date)
             if records is None:
                 self.stdout.write(
                     self.style.WARNING(f"Failed to fetch data for {current_date.date()}. Continuing to next date."))
-            current_date += timedelta(days=1)
+
+    def fetch_dates_concurrently(self, dates):
+        """
+        Download dates on a bounded worker pool and write them from this thread only.
+
+        Workers download and parse their day's file, handing rows over in batches
+        through a bounded queue, so memory stays flat and Postgres sees a single
+        writer no matter how many downloads are in flight.
+        """
+        work_queue = queue.Queue(maxsize=self.workers * 2)
+        self.stop_event = threading.Event()
+        chunk_size = min(self.batch_size, 10000)
+        pending = len(dates)
+
+        self.stdout.write(f"Fetching {pending} dates with {self.workers} workers")
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='nav-fetch')
+        try:
+            for date in dates:
+                executor.submit(self.download_date, date, work_queue, chunk_size)
+
+            while pending:
+                kind, date, payload = work_queue.get()
+                if kind == 'rows':
+                    self.process_nav_data(payload, date)
+                    continue
+
+                pending -= 1
+                if kind == 'done':
+                    nav_count, checksum, duration = payload
+                    record_ledger(date.date(), nav_count, checksum, duration)
+                    self.update_statistics(date, nav_count)
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Records fetched for {date.strftime('%d-%b-%Y')}: {nav_count} "
+                        f"({self.dates_per_minute():.1f} dates/min)"))
+                elif kind == 'skipped':
+                    self.skipped_dates += 1
+                    self.stdout.write(f"Unchanged upstream data for {date.strftime('%d-%b-%Y')}, skipped")
+                else:
+                    record_ledger(date.date(), status=LEDGER_FAILED)
+                    self.stdout.write(
+                        self.style.WARNING(f"Failed to fetch data for {date.date()}: {payload}. Continuing."))
+        finally:
+            self.stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            while True:
+                try:
+                    work_queue.get_nowait()
+                except queue.Empty:
+                    break
+            executor.shutdown(wait=True)
+
+    def download_date(self, date, work_queue, chunk_size):
+        date_str = date.strftime('%d-%b-%Y')
+
+        for attempt in range(self.max_retries):
+            if self.stop_event.is_set():
+                return
+
+            nav_count = 0
+            chunk = []
+            try:
+                started = time.monotonic()
+                download = download_nav_history(date, session=self.session, rate_limiter=self.rate_limiter)
+                if self.is_unchanged(date, download):
+                    download.file.close()
+                    self.enqueue(work_queue, ('skipped', date, None))
+                    return
+
+                for row in iter_nav_rows(iter_download_lines(download)):
+                    chunk.append(row)
+                    nav_count += 1
+                    if len(chunk) >= chunk_size:
+                        self.enqueue(work_queue, ('rows', date, chunk))
+                        chunk = []
+                if chunk:
+                    self.enqueue(work_queue, ('rows', date, chunk))
+                self.enqueue(work_queue, ('done', date, (nav_count, download.checksum, time.monotonic() - started)))
+                return
+
+            except requests.exceptions.RequestException as e:
+                if attempt < self.max_retries - 1:
+                    delay = backoff_delay(attempt, base=self.retry_base_delay)
+                    logger.warning(f"Error fetching data for {date_str}: {str(e)}. Retrying in {delay:.1f} seconds")
+                    time.sleep(delay)
+                else:
+                    logger.error(f'Error fetching data for {date_str} after {self.max_retries} attempts: {str(e)}')
+                    self.enqueue(work_queue, ('failed', date, str(e)))
+
+            except Exception as e:
+                logger.error(f'Error processing data for {date_str}: {str(e)}', exc_info=True)
+                self.enqueue(work_queue, ('failed', date, str(e)))
+                return
+
+    def is_unchanged(self, date, download):
+        # ledger_checksums is filled before any download starts, so workers only read it
+        return not self.force and self.ledger_checksums.get(date.date()) == download.checksum
+
+    def enqueue(self, work_queue, item):
+        while not self.stop_event.is_set():
+            try:
+                work_queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def dates_per_minute(self):
+        elapsed = time.monotonic() - self.fetch_started
+        return self.dates_completed * 60 / elapsed if elapsed > 0 else 0.0
 
     def fetch_single_date(self, date_str):
         date = datetime.strptime(date_str, '%d-%b-%Y')
@@ -94,19 +349,28 @@ class Command(BaseCommand):
 
     def fetch_data_for_date(self, date):
         date_str = date.strftime('%d-%b-%Y')
-        url = f"https://portal.amfiindia.com/DownloadNAVHistoryReport_Po.aspx?frmdt={date_str}"
         logger.info(f"Fetching data for date: {date_str}")
 
-        max_retries = 3
-        retry_delay = 5
+        max_retries = self.max_retries
+
+        if date.date() not in self.ledger_checksums:
+            self.ledger_checksums.update(ledger_checksums([date.date()]))
 
         for attempt in range(max_retries):
             try:
-                response = requests.get(url, timeout=30)
-                response.raise_for_status()
+                started = time.monotonic()
+                if self.source_file:
+                    download = read_feed_file(self.source_file)
+                else:
+                    download = download_nav_history(date, session=self.session, rate_limiter=self.rate_limiter)
+                if self.is_unchanged(date, download):
+                    download.file.close()
+                    self.skipped_dates += 1
+                    self.stdout.write(f"\nUnchanged upstream data for {date_str}, skipped")
+                    return 0
 
-                data_lines = response.text.splitlines()
-                nav_count = self.process_nav_data(data_lines, date)
+                nav_count = self.process_nav_data(iter_nav_rows(iter_download_lines(download)), date)
+                record_ledger(date.date(), nav_count, download.checksum, time.monotonic() - started)
 
                 self.update_statistics(date, nav_count)
                 self.stdout.write(self.style.SUCCESS(f"\nRecords fetched for {date_str}: {nav_count}"))
@@ -114,126 +378,80 @@ class Command(BaseCommand):
 
             except requests.exceptions.RequestException as e:
                 if attempt < max_retries - 1:
-                    self.stdout.write(
-                        self.style.WARNING(f"Error fetching data for {date_str}. Retrying in {retry_delay} seconds..."))
+                    retry_delay = backoff_delay(attempt, base=self.retry_base_delay)
+                    self.stdout.write(self.style.WARNING(
+                        f"Error fetching data for {date_str}. Retrying in {retry_delay:.1f} seconds..."))
                     time.sleep(retry_delay)
                 else:
                     error_msg = f'Error fetching data for {date_str} after {max_retries} attempts: {str(e)}'
                     self.stdout.write(self.style.ERROR(error_msg))
                     logger.error(error_msg)
+                    record_ledger(date.date(), status=LEDGER_FAILED)
                     return None
 
             except Exception as e:
                 error_msg = f'Error processing data for {date_str}: {str(e)}'
                 self.stdout.write(self.style.ERROR(error_msg))
                 logger.error(error_msg, exc_info=True)
+                record_ledger(date.date(), status=LEDGER_FAILED)
                 return None
 
-    def process_nav_data(self, data_lines, date):
+    def process_nav_data(self, nav_rows, date):
         nav_count = 0
-        nav_data = []
-        current_amc_name = None
-        amc_cache = {}
-        fund_cache = {}
-
-        for line in data_lines:
-            if not line.strip() or line.startswith("Open Ended Schemes") or line.startswith("Close Ended Schemes"):
-                continue
-
-            if ';' not in line:
-                current_amc_name = line.strip()
-                continue
-
-            if current_amc_name and ';' in line:
-                fields = line.split(';')
-                if len(fields) < 8:
-                    continue
-
-                scheme_code, scheme_name, net_asset_value, nav_date = fields[0], fields[1], fields[4], fields[7]
-
-                try:
-                    amc_entry = self.get_or_create_amc(current_amc_name, amc_cache)
-                    fund_entry = self.get_or_create_fund(amc_entry, scheme_name, scheme_code, fund_cache)
-
-                    try:
-                        parsed_date = datetime.strptime(nav_date, '%d-%b-%Y').date() if nav_date else None
-                    except ValueError:
-                        parsed_date = None
+        batch = []
 
-                    nav_data.append({
-                        'navFundName': fund_entry,
-                        'navDate': parsed_date,
-                        'nav': net_asset_value
-                    })
+        for row in nav_rows:
+            batch.append(row)
+            nav_count += 1
 
-                    nav_count += 1
-
-                    if len(nav_data) >= self.batch_size:
-                        self.bulk_update_or_create_nav(nav_data)
-                        nav_data = []
-
-                except Exception as e:
-                    logger.error(f"Error processing line: {line}. Error: {str(e)}")
-                    continue
+            if len(batch) >= self.batch_size:
+                self.write_nav_batch(batch)
+                batch = []
 
-        if nav_data:
-            self.bulk_update_or_create_nav(nav_data)
+        if batch:
+            self.write_nav_batch(batch)
 
         return nav_count
 
-    @transaction.atomic
-    def get_or_create_amc(self, amc_name, amc_cache):
-        if amc_name not in amc_cache:
-            amc, created = AmcEntryModel.objects.get_or_create(amcName=amc_name)
-            amc_cache[amc_name] = amc
-        return amc_cache[amc_name]
-
-    def get_or_create_fund(self, amc_entry, fund_name, scheme_code, fund_cache):
-        key = (amc_entry.id, fund_name)
-        if key not in fund_cache:
-            try:
-                fund = FundModel.objects.get(
-                    fundAmcName=amc_entry,
-                    fundName=fund_name
-                )
-                if fund.schemeCode != scheme_code and scheme_code and scheme_code != '-':
-                    existing_fund = FundModel.objects.filter(schemeCode=scheme_code).first()
-                    if existing_fund:
-                        if existing_fund.fundName != fund_name:
-                            logger.warning(
-                                f"SchemeCode {scheme_code} conflict: '{fund_name}' vs '{existing_fund.fundName}'. Using existing fund.")
-                            fund = existing_fund
-                        else:
-                            logger.info(f"Updating schemeCode for '{fund_name}' to {scheme_code}")
-                            fund.schemeCode = scheme_code
-                            fund.save()
-                    else:
-                        fund.schemeCode = scheme_code
-                        fund.save()
-            except FundModel.DoesNotExist:
-                existing_fund = FundModel.objects.filter(schemeCode=scheme_code).first()
-                if existing_fund:
-                    logger.warning(
-                        f"SchemeCode {scheme_code} already exists for '{existing_fund.fundName}'. Using existing fund.")
-                    fund = existing_fund
-                else:
-                    fund = FundModel.objects.create(
-                        fundAmcName=amc_entry,
-                        fundName=fund_name,
-                        schemeCode=scheme_code if scheme_code and scheme_code != '-' else None
-                    )
-            fund_cache[key] = fund
-        return fund_cache[key]
+    def write_nav_batch(self, rows):
+        # One resolver per run keeps the AMC/fund cache warm across every date fetched
+        if self.resolver is None:
+            self.resolver = NavEntityResolver()
+
+        fund_ids = self.resolver.resolve(rows)
+        nav_data = [
+            {
+                'navFundName_id': fund_id,
+                'navDate': row.nav_date,
+                'nav': row.nav,
+                'navRepurchasePrice': row.repurchase_price,
+                'navSalePrice': row.sale_price,
+            }
+            for row, fund_id in zip(rows, fund_ids)
+        ]
+        self.bulk_update_or_create_nav(nav_data)
 
-    @transaction.atomic
     def bulk_update_or_create_nav(self, nav_data):
+        if supports_copy_upsert():
+            write = copy_insert_new_navs if self.only_new else copy_upsert_navs
+            self.records_inserted += write(
+                (nav['navFundName_id'], nav['navDate'], nav['nav'], nav['navRepurchasePrice'], nav['navSalePrice'])
+                for nav in nav_data
+            )
+            self.total_records_processed += len(nav_data)
+        else:
+            self.orm_update_or_create_nav(nav_data)
+            refresh_latest_navs(nav['navFundName_id'] for nav in nav_data)
+
+    @transaction.atomic
+    def orm_update_or_create_nav(self, nav_data):
         existing_navs = NavModel.objects.filter(
-            navFundName__in=[data['navFundName'] for data in nav_data],
+            navFundName__in=[data['navFundName_id'] for data in nav_data],
             navDate__in=[data['navDate'] for data in nav_data]
-        ).values('id', 'navFundName', 'navDate')
+        ).values('id', 'navFundName', 'navDate', 'navRepurchasePrice', 'navSalePrice')
 
         existing_navs_dict = {
-            (nav['navFundName'], nav['navDate']): nav['id']
+            (nav['navFundName'], nav['navDate']): nav
             for nav in existing_navs
         }
 
@@ -241,16 +459,23 @@ class Command(BaseCommand):
         navs_to_create = []
 
         for nav in nav_data:
-            key = (nav['navFundName'].id, nav['navDate'])
+            key = (nav['navFundName_id'], nav['navDate'])
             if key in existing_navs_dict:
-                nav['id'] = existing_navs_dict[key]
+                existing = existing_navs_dict[key]
+                nav['id'] = existing['id']
+                # A blank price keeps the stored one, as the COPY path's COALESCE does
+                for field in ('navRepurchasePrice', 'navSalePrice'):
+                    if nav[field] is None:
+                        nav[field] = existing[field]
                 navs_to_update.append(NavModel(**nav))
             else:
                 navs_to_create.append(NavModel(**nav))
 
         try:
             NavModel.objects.bulk_create(navs_to_create, ignore_conflicts=True)
-            NavModel.objects.bulk_update(navs_to_update, ['nav'])
+            self.records_inserted += len(navs_to_create)
+            if not self.only_new:
+                NavModel.objects.bulk_update(navs_to_update, ['nav', 'navRepurchasePrice', 'navSalePrice'])
         except IntegrityError as e:
             logger.error(f"Integrity error during bulk NAV operation: {str(e)}")
             self.handle_integrity_error(nav_data)
@@ -260,10 +485,15 @@ class Command(BaseCommand):
     def handle_integrity_error(self, nav_data):
         for nav in nav_data:
             try:
-                NavModel.objects.update_or_create(
-                    navFundName=nav['navFundName'],
+                write = NavModel.objects.get_or_create if self.only_new else NavModel.objects.update_or_create
+                defaults = {'nav': nav['nav']}
+                for field in ('navRepurchasePrice', 'navSalePrice'):
+                    if nav[field] is not None:
+                        defaults[field] = nav[field]
+                write(
+                    navFundName_id=nav['navFundName_id'],
                     navDate=nav['navDate'],
-                    defaults={'nav': nav['nav']}
+                    defaults=defaults
                 )
             except IntegrityError as e:
                 error_msg = f'Integrity error for NAV record: {nav}. Error: {str(e)}'
@@ -276,6 +506,7 @@ class Command(BaseCommand):
         self.records_per_day[date.date()] += nav_count
         self.records_per_month[(date.year, date.month)] += nav_count
         self.total_records_fetched += nav_count
+        self.dates_completed += 1
 
     def print_summary(self):
         self.stdout.write(self.style.SUCCESS("\nSummary:"))
@@ -289,12 +520,14 @@ class Command(BaseCommand):
 
         self.stdout.write(f"\nTotal records fetched: {self.total_records_fetched}")
         self.stdout.write(f"Total records processed: {self.total_records_processed}")
+        self.stdout.write(f"Records inserted or changed: {self.records_inserted}")
+        self.stdout.write(f"Dates skipped as unchanged upstream: {self.skipped_dates}")
+        self.stdout.write(f"Throughput: {self.dates_per_minute():.1f} dates/min")
 
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT COUNT(*) FROM apis_navmodel")
-                total_records_in_db = cursor.fetchone()[0]
-            self.stdout.write(f"\nTotal records in the database: {total_records_in_db}")
+            # Planner estimate across all partitions instead of a full COUNT(*) scan
+            total_records_in_db = estimated_row_count(NavModel._meta.db_table)
+            self.stdout.write(f"\nEstimated records in the database: {total_records_in_db}")
         except OperationalError as e:
             self.stdout.write(self.style.ERROR(f"Error counting records in database: {str(e)}"))
 
@@ -8,6 +8,7 @@ import openpyxl
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from django.db import transaction
+from apis.amfi import fetch_nav_rows
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +64,6 @@ class Command(BaseCommand):
 
     def fetch_data_for_date(self, date, data):
         date_str = date.strftime('%d-%b-%Y')
-        url = f"https://portal.amfiindia.com/DownloadNAVHistoryReport_Po.aspx?frmdt={date_str}"
         logger.info(f"Fetching data for date: {date_str}")
 
         session = requests.Session()
@@ -71,45 +71,13 @@ class Command(BaseCommand):
         session.mount('https://', HTTPAdapter(max_retries=retries))
 
         try:
-            response = session.get(url, timeout=30)
-            response.raise_for_status()
-
-            data_lines = response.text.splitlines()
-
-            current_amc_name = None
             nav_count = 0
 
-            for line in data_lines:
-                try:
-                    line = line.strip()
-                    if not line or line.startswith("Open Ended Schemes") or line.startswith("Close Ended Schemes"):
-                        continue
-
-                    if ';' not in line:
-                        current_amc_name = line.strip()
-                        continue
-
-                    if current_amc_name and ';' in line:
-                        fields = line.split(';')
-                        if len(fields) < 8:
-                            continue
-
-                        scheme_name = fields[1]
-                        net_asset_value = fields[4]
-                        nav_date = fields[7]
-
-                        try:
-                            parsed_date = datetime.strptime(nav_date, '%d-%b-%Y').date() if nav_date else None
-                        except ValueError:
-                            parsed_date = None
-
-                        data.append(
-                            [parsed_date.strftime('%d-%b-%Y') if parsed_date else '', current_amc_name, scheme_name,
-                             net_asset_value])
-                        nav_count += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing line: {line}. Error: {str(e)}")
+            for row in fetch_nav_rows(date, session=session):
+                data.append(
+                    [row.nav_date.strftime('%d-%b-%Y') if row.nav_date else '', row.amc_name, row.scheme_name,
+                     str(row.nav) if row.nav is not None else ''])
+                nav_count += 1
 
             self.stdout.write(self.style.SUCCESS(f"\nRecords fetched for {date_str}: {nav_count}"))
             return nav_count
@@ -1,7 +1,7 @@
 import requests
-import csv
+from datetime import date
 from django.core.management.base import BaseCommand
-from io import StringIO
+from apis.amfi import open_feed, iter_feed_lines, read_header, nav_history_url
 
 
 class Command(BaseCommand):
@@ -9,21 +9,14 @@ class Command(BaseCommand):
 
     def handle(self, *args, **kwargs):
         # Define the URL
-        url = 'https://portal.amfiindia.com/DownloadNAVHistoryReport_Po.aspx?frmdt=01-Aug-2024'
+        url = nav_history_url(date(2024, 8, 1))
 
         try:
-            # Send a GET request to the URL
-            response = requests.get(url)
-            response.raise_for_status()  # Raises an HTTPError for bad responses
-
-            # Check if the content is text (since it looks like CSV data)
-            content = response.content.decode('utf-8')
-
-            # Use StringIO to read the content into a CSV reader
-            csv_reader = csv.reader(StringIO(content), delimiter=';')
+            # Stream the response; only the header line is needed
+            response = open_feed(url)
 
             # Extract the first row, which usually contains the keys/column names
-            keys = next(csv_reader)
+            keys = read_header(iter_feed_lines(response))
 
             # Print or return the keys (column headers)
             self.stdout.write(self.style.SUCCESS('Keys (Columns) from NAV data:'))
@@ -0,0 +1,108 @@
+from django.core.management.base import BaseCommand, CommandError
+from apis.mailback import import_mailback, REPORT_SCHEMAS, MailbackImportError, IMPORT_SKIPPED
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ('Import CAMS/KFin mailback files (DBF, CSV or XLSX) into their report tables, streaming them in chunks '
+            'and recording an import job per file')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            action='append',
+            default=[],
+            help='Mailback file to import; may be repeated',
+        )
+        parser.add_argument(
+            '--report',
+            type=str,
+            help='Report to load into (e.g. common_format or CommonFormatModel); detected from the columns if omitted',
+        )
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=['dbf', 'csv', 'xlsx'],
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--encoding',
+            type=str,
+            help='Text encoding of the file (default: cp1252 for DBF, utf-8 for CSV)',
+        )
+        parser.add_argument('--sheet', type=str, help='XLSX worksheet to read (default: the active one)')
+        parser.add_argument(
+            '--skip_rows',
+            type=int,
+            default=0,
+            help='Title rows above the header row of a CSV or XLSX file',
+        )
+        parser.add_argument(
+            '--map',
+            action='append',
+            default=[],
+            help='COLUMN=field mapping a file column onto a model field; may be repeated',
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            default=20000,
+            help='Rows read and written per chunk',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Import files already imported successfully (same checksum) again',
+        )
+        parser.add_argument(
+            '--list-reports',
+            action='store_true',
+            help='List the report names and their models, then exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['list_reports']:
+            for name, schema in REPORT_SCHEMAS.items():
+                self.stdout.write(f'{name}: {schema.model.__name__} ({len(schema.fields)} fields)')
+            return
+        if not options['file']:
+            raise CommandError('Pass at least one --file')
+
+        overrides = {}
+        for mapping in options['map']:
+            column, _, field = mapping.partition('=')
+            if not column or not field:
+                raise CommandError(f'--map must be COLUMN=field, got {mapping}')
+            overrides[column.strip()] = field.strip()
+
+        failed = 0
+        for path in options['file']:
+            try:
+                job = import_mailback(
+                    path, report=options.get('report'), file_format_name=options.get('format'),
+                    encoding=options.get('encoding'), sheet=options.get('sheet'), skip_rows=options['skip_rows'],
+                    overrides=overrides, chunk_size=options['chunk_size'], force=options['force'],
+                )
+            except (MailbackImportError, OSError) as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'{path}: {str(e)}'))
+                continue
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'{path}: import failed: {str(e)}'))
+                continue
+
+            if job.importStatus == IMPORT_SKIPPED:
+                self.stdout.write(f'{path}: already imported into {job.importReport}, skipped (use --force)')
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'{path}: {job.importRowsImported} rows imported into {job.importReport} in {job.importDuration}s '
+                f'({job.importRowsSkipped} blank rows skipped, {job.importValuesTruncated} values truncated)'))
+            if job.importUnmappedColumns:
+                self.stdout.write(self.style.WARNING(
+                    f"  Columns not imported: {', '.join(job.importUnmappedColumns)}"))
+
+        if failed:
+            raise CommandError(f'{failed} of {len(options["file"])} files failed to import')
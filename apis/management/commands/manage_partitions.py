@@ -0,0 +1,73 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apis.models import NavModel, ActivityLog
+from apis import partitions
+
+# table key -> (model, partition column, interval)
+PARTITIONED_MODELS = {
+    'nav': (NavModel, 'navDate', partitions.YEAR),
+    'activity': (ActivityLog, 'created_at', partitions.MONTH),
+}
+
+
+class Command(BaseCommand):
+    help = 'Convert tables to range partitions, create upcoming partitions and list existing ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            choices=sorted(PARTITIONED_MODELS),
+            default='nav',
+            help='Table to manage',
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Rebuild the table as a partitioned table and copy the existing rows into it',
+        )
+        parser.add_argument(
+            '--keep-legacy',
+            action='store_true',
+            help='With --convert, keep the original table as <table>_legacy instead of dropping it',
+        )
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=1,
+            help='Number of future periods (years or months) to create partitions for',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List partitions with their bounds and estimated row counts',
+        )
+
+    def handle(self, *args, **options):
+        model, field_name, interval = PARTITIONED_MODELS[options['table']]
+        table = model._meta.db_table
+        column = model._meta.get_field(field_name).column
+        ahead = max(options['ahead'], 0)
+
+        if options['convert']:
+            if partitions.is_partitioned(table):
+                raise CommandError(f'{table} is already partitioned')
+            self.stdout.write(f'Converting {table} to {interval}ly partitions on {column}...')
+            partitions.convert_to_partitioned(table, column, interval, periods_ahead=ahead,
+                                              keep_legacy=options['keep_legacy'])
+            self.stdout.write(self.style.SUCCESS(f'{table} is now partitioned'))
+        elif partitions.is_partitioned(table):
+            today = date.today()
+            last_day = today
+            for _ in range(ahead):
+                last_day = partitions.next_period(partitions.period_start(last_day, interval), interval)
+            created = partitions.ensure_partitions(table, column, interval, today, last_day)
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f'Created partition {name}'))
+            if not created:
+                self.stdout.write('All partitions already exist')
+        else:
+            raise CommandError(f'{table} is not partitioned yet; run with --convert first')
+
+        if options['list']:
+            for name, bounds, rows in partitions.list_partitions(table):
+                self.stdout.write(f'  {name}: {bounds} (~{rows} rows)')
@@ -0,0 +1,134 @@
+#master_cache.py
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import CountryModel
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+def master_namespace(model):
+    return model._meta.label_lower
+
+
+def _version_key(namespace):
+    return f'master:{namespace}:version'
+
+
+def cache_version(namespace):
+    """Current version of a namespace; every invalidation moves it on so old keys are never read again"""
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        cache.add(_version_key(namespace), 1, None)
+        version = cache.get(_version_key(namespace), 1)
+    return version
+
+
+def invalidate_master_data(namespace):
+    """Drop every cached response of a namespace once the current transaction commits"""
+    def bump():
+        try:
+            cache.add(_version_key(namespace), 1, None)
+            cache.incr(_version_key(namespace))
+        except Exception:
+            logger.warning(f"Could not invalidate cached {namespace} data", exc_info=True)
+    transaction.on_commit(bump)
+
+
+def cached_master_data(namespace, key, build):
+    """
+    Read-through cache for near-static lookup data.
+
+    Keys carry the namespace version, so invalidation is one INCR. On a miss only
+    the caller holding a short lock rebuilds the value; others wait briefly for it
+    instead of all querying the database at once. If the cache is unreachable the
+    value is built directly.
+    """
+    timeout = getattr(settings, 'MASTER_DATA_CACHE_SECONDS', 3600)
+    if not timeout:
+        return build()
+    try:
+        data_key = f'master:{namespace}:v{cache_version(namespace)}:{key}'
+        value = cache.get(data_key, MISSING)
+        if value is not MISSING:
+            return value
+
+        lock_key = f'{data_key}:lock'
+        lock_seconds = getattr(settings, 'MASTER_DATA_CACHE_LOCK_SECONDS', 10)
+        if not cache.add(lock_key, 1, lock_seconds):
+            deadline = time.monotonic() + lock_seconds
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = cache.get(data_key, MISSING)
+                if value is not MISSING:
+                    return value
+            logger.warning(f"Timed out waiting for cached {namespace} {key}, building it")
+    except Exception:
+        logger.warning(f"Master data cache unavailable for {namespace}", exc_info=True)
+        return build()
+
+    try:
+        value = build()
+    except Exception:
+        try:
+            cache.delete(lock_key)
+        except Exception:
+            logger.warning(f"Could not release the cache lock for {namespace} {key}", exc_info=True)
+        raise
+    try:
+        cache.set(data_key, value, timeout)
+        cache.delete(lock_key)
+    except Exception:
+        logger.warning(f"Could not cache {namespace} {key}", exc_info=True)
+    return value
+
+
+class MasterDataCacheMixin:
+    """
+    Cached `listing` for master ViewSets; processing and deletion call invalidate_cache().
+    The namespace is the serializer's model, so other views caching the same table
+    (such as the countries actions) are invalidated together.
+    """
+
+    @property
+    def cache_namespace(self):
+        return master_namespace(self.get_serializer_class().Meta.model)
+
+    def master_listing(self, pk, message):
+        serializer_class = self.get_serializer_class()
+
+        def build():
+            queryset = serializer_class.Meta.model.objects.filter(hideStatus=0)
+            if pk != "0":
+                queryset = queryset.filter(id=pk)
+            return {'code': 1, 'data': serializer_class(queryset.order_by('-id'), many=True).data,
+                    'message': message}
+
+        return cached_master_data(self.cache_namespace, f'listing:{pk}', build)
+
+    def invalidate_cache(self):
+        invalidate_master_data(self.cache_namespace)
+
+
+def country_choices():
+    """Country id/code/name/dial code list used by the ARN, AMC and client forms"""
+    def build():
+        return [
+            {
+                "id": country['id'],
+                "code": country['countryCode'],
+                "name": country['countryName'],
+                "dial_code": country['dailCode']
+            }
+            for country in CountryModel.objects.filter(hideStatus=0).values('id', 'countryCode', 'countryName',
+                                                                            'dailCode')
+        ]
+
+    return cached_master_data(master_namespace(CountryModel), 'countries', build)
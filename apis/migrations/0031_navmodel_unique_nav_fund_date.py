@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-17 21:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0030_accountwiseinvestormasterdetailsmodel_and_more'),
+    ]
+
+    operations = [
+        # Keep only the most recent row for each (fund, date) before enforcing uniqueness
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM apis_navmodel older
+                USING apis_navmodel newer
+                WHERE older."navFundName_id" = newer."navFundName_id"
+                  AND older."navDate" = newer."navDate"
+                  AND older.id < newer.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='navmodel',
+            constraint=models.UniqueConstraint(fields=('navFundName', 'navDate'), name='unique_nav_fund_date'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0031_navmodel_unique_nav_fund_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='navmodel',
+            name='navValue',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=20, null=True),
+        ),
+    ]
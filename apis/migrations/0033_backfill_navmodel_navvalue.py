@@ -0,0 +1,42 @@
+# Copies the text NAV into the numeric navValue column in id-range chunks.
+# The migration is non-atomic so every chunk commits on its own: row locks are
+# held for one chunk at a time and an interrupted run resumes where it stopped,
+# because only rows whose navValue is still NULL are touched.
+
+from django.db import migrations
+
+BATCH_SIZE = 50000
+
+NUMERIC_NAV = r"^-?[0-9]+(\.[0-9]+)?$"
+
+
+def backfill_nav_value(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT MIN(id), MAX(id) FROM apis_navmodel WHERE "navValue" IS NULL')
+        low, high = cursor.fetchone()
+        if low is None:
+            return
+
+        for start in range(low, high + 1, BATCH_SIZE):
+            cursor.execute(
+                """
+                UPDATE apis_navmodel
+                SET "navValue" = btrim(replace(nav, ',', ''))::numeric(20, 6)
+                WHERE id >= %s AND id < %s
+                  AND "navValue" IS NULL
+                  AND btrim(replace(nav, ',', '')) ~ %s
+                """,
+                [start, start + BATCH_SIZE, NUMERIC_NAV],
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('apis', '0032_navmodel_navvalue'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_nav_value, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0033_backfill_navmodel_navvalue'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='navmodel',
+            name='apis_navmod_nav_247598_idx',
+        ),
+        migrations.RemoveField(
+            model_name='navmodel',
+            name='nav',
+        ),
+        migrations.RenameField(
+            model_name='navmodel',
+            old_name='navValue',
+            new_name='nav',
+        ),
+    ]
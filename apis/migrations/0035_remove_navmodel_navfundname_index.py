@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0034_navmodel_numeric_nav'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='navmodel',
+            name='apis_navmod_navFund_6fbd43_idx',
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0035_remove_navmodel_navfundname_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestNavModel',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('latestNav', models.DecimalField(blank=True, decimal_places=6, max_digits=20, null=True)),
+                ('latestNavDate', models.DateField()),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+                ('latestNavFund', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='latestNavFund', to='apis.fundmodel')),
+            ],
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO apis_latestnavmodel ("latestNavFund_id", "latestNav", "latestNavDate", "updatedAt")
+                SELECT DISTINCT ON ("navFundName_id") "navFundName_id", nav, "navDate", now()
+                FROM apis_navmodel
+                WHERE "hideStatus" = 0 AND "navFundName_id" IS NOT NULL AND "navDate" IS NOT NULL
+                ORDER BY "navFundName_id", "navDate" DESC
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
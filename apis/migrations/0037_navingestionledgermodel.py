@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0036_latestnavmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NavIngestionLedgerModel',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('ledgerDate', models.DateField(unique=True)),
+                ('ledgerStatus', models.CharField(max_length=20)),
+                ('ledgerRowCount', models.IntegerField(default=0)),
+                ('ledgerChecksum', models.CharField(blank=True, max_length=64, null=True)),
+                ('ledgerDuration', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
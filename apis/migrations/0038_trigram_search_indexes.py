@@ -0,0 +1,109 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:12
+# Trigram GIN indexes behind the listing searches. The indexes are built
+# CONCURRENTLY, which cannot run inside a transaction, so writes to the
+# client and fund tables are not blocked while they build.
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('apis', '0037_navingestionledgermodel'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='amcentrymodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('amcName'), name='gin_trgm_ops'), name='amc_name_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='arnentrymodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('arnNumber'), name='gin_trgm_ops'), name='arn_number_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='aumentrymodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('aumInvoiceNumber'), name='gin_trgm_ops'), name='aum_invoice_number_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='aumentrymodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('aumMonth'), name='gin_trgm_ops'), name='aum_month_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='clientmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('clientName'), name='gin_trgm_ops'), name='client_name_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='clientmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('clientEmail'), name='gin_trgm_ops'), name='client_email_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='clientmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('clientPhone'), name='gin_trgm_ops'), name='client_phone_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='commissionentrymodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('commissionMonth'), name='gin_trgm_ops'), name='commission_month_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='couriermodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('courierClientAddress'), name='gin_trgm_ops'), name='courier_address_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='couriermodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('courierMobileNumber'), name='gin_trgm_ops'), name='courier_mobile_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='couriermodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('courierEmail'), name='gin_trgm_ops'), name='courier_email_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='formsmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('formsDescription'), name='gin_trgm_ops'), name='forms_description_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='fundmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('fundName'), name='gin_trgm_ops'), name='fund_name_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='fundmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('schemeCode'), name='gin_trgm_ops'), name='fund_scheme_code_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='gstentrymodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('gstInvoiceNumber'), name='gin_trgm_ops'), name='gst_invoice_number_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='industryaumentrymodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('industryName'), name='gin_trgm_ops'), name='industry_aum_name_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='issuemodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('issueDescription'), name='gin_trgm_ops'), name='issue_description_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='marketingmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('marketingDescription'), name='gin_trgm_ops'), name='marketing_description_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='statementmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('statementInvestorName'), name='gin_trgm_ops'), name='statement_investor_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='statementmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('statementInvestorPanNo'), name='gin_trgm_ops'), name='statement_pan_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='statementmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('statementFundName'), name='gin_trgm_ops'), name='statement_fund_name_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='taskmodel',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('taskTitle'), name='gin_trgm_ops'), name='task_title_trgm'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:21
+# Lookup indexes for the activity log, built CONCURRENTLY so audit writes are not
+# blocked. Run before converting the table with manage_partitions --table activity,
+# which recreates them on every partition.
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('apis', '0039_activitylog_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='activitylog',
+            index=models.Index(fields=['entity_type', 'entity_id', '-created_at'], name='apis_activi_entity__22b00a_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='activitylog',
+            index=models.Index(fields=['user', '-created_at'], name='apis_activi_user_id_098384_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='activitylog',
+            index=models.Index(fields=['-created_at'], name='apis_activi_created_6da029_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0040_activitylog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fundmodel',
+            name='fundCategory',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='fundmodel',
+            name='fundIsinGrowth',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='fundmodel',
+            name='fundIsinReinvestment',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='fundmodel',
+            name='fundSchemeType',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='navmodel',
+            name='navRepurchasePrice',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='navmodel',
+            name='navSalePrice',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='fundmodel',
+            index=models.Index(fields=['fundCategory', 'fundSchemeType'], name='fund_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fundmodel',
+            index=models.Index(fields=['fundIsinGrowth'], name='fund_isin_growth_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fundmodel',
+            index=models.Index(fields=['fundIsinReinvestment'], name='fund_isin_reinvestment_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.14 on 2026-10-17 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0041_fund_category_isin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MailbackImportJobModel',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('importReport', models.CharField(max_length=100)),
+                ('importFileName', models.CharField(max_length=500)),
+                ('importFileFormat', models.CharField(max_length=10)),
+                ('importFileSize', models.BigIntegerField(default=0)),
+                ('importChecksum', models.CharField(blank=True, max_length=64, null=True)),
+                ('importStatus', models.CharField(max_length=20)),
+                ('importRowsRead', models.IntegerField(default=0)),
+                ('importRowsImported', models.IntegerField(default=0)),
+                ('importRowsSkipped', models.IntegerField(default=0)),
+                ('importValuesTruncated', models.IntegerField(default=0)),
+                ('importColumns', models.JSONField(blank=True, null=True)),
+                ('importUnmappedColumns', models.JSONField(blank=True, null=True)),
+                ('importError', models.TextField(blank=True, null=True)),
+                ('importDuration', models.DecimalField(blank=True, decimal_places=3, max_digits=10, null=True)),
+                ('hideStatus', models.IntegerField(default=0)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('updatedAt', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['importReport', 'importChecksum'], name='mailback_import_checksum_idx')],
+            },
+        ),
+    ]
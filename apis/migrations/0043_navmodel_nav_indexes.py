@@ -0,0 +1,60 @@
+# Generated by Django 5.0.14 on 2026-10-17 23:05
+# The NAV value and date indexes dropped by 0034 with the old text column. They
+# are built CONCURRENTLY, outside a transaction, so the NAV table stays writable
+# while they build. Databases that already have them (built by an earlier 0034, or
+# kept by manage_partitions --table nav) skip the build.
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyIfMissing(AddIndexConcurrently):
+    """
+    Skips indexes that already exist. A partitioned table cannot build or drop an
+    index concurrently, so there the plain AddIndex statements are used instead.
+    """
+
+    def _is_partitioned(self, schema_editor, model):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+                           [schema_editor.quote_name(model._meta.db_table)])
+            row = cursor.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [schema_editor.quote_name(self.index.name)])
+            if cursor.fetchone()[0] is not None:
+                return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self._is_partitioned(schema_editor, model):
+            schema_editor.add_index(model, self.index)
+            return
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self._is_partitioned(schema_editor, model):
+            schema_editor.remove_index(model, self.index)
+            return
+        super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('apis', '0042_mailback_import_job'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfMissing(
+            model_name='navmodel',
+            index=models.Index(fields=['nav'], name='apis_navmod_nav_247598_idx'),
+        ),
+        AddIndexConcurrentlyIfMissing(
+            model_name='navmodel',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['navDate'], name='apis_navmod_navDate_282c24_brin'),
+        ),
+    ]
@@ -1,10 +1,13 @@
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.utils import timezone
 import os
 import uuid
 from django.core.files.storage import FileSystemStorage
 from django.contrib.auth.hashers import make_password, check_password
 from django.db.models import Index
+from django.contrib.postgres.indexes import BrinIndex
+from .search import trigram_index
 from django.contrib.auth.models import User
 
 
@@ -175,6 +178,11 @@ class ArnEntryModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('arnNumber', 'arn_number_trgm'),
+        ]
+
 
 class AmcEntryModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -191,6 +199,11 @@ class AmcEntryModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('amcName', 'amc_name_trgm'),
+        ]
+
 
 class FundManager(models.Manager):
     def get_funds_by_amc(self, amc_id):
@@ -210,12 +223,26 @@ class FundModel(models.Model):
                                     blank=True)
     fundName = models.CharField(max_length=1500, null=True, blank=True)
     schemeCode = models.CharField(max_length=50, unique=True, null=True, blank=True)
+    # Section header and ISIN columns of the AMFI NAV feed
+    fundSchemeType = models.CharField(max_length=50, null=True, blank=True)
+    fundCategory = models.CharField(max_length=200, null=True, blank=True)
+    fundIsinGrowth = models.CharField(max_length=12, null=True, blank=True)
+    fundIsinReinvestment = models.CharField(max_length=12, null=True, blank=True)
     hideStatus = models.IntegerField(default=0)
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
     objects = FundManager()
 
+    class Meta:
+        indexes = [
+            trigram_index('fundName', 'fund_name_trgm'),
+            trigram_index('schemeCode', 'fund_scheme_code_trgm'),
+            Index(fields=['fundCategory', 'fundSchemeType'], name='fund_category_idx'),
+            Index(fields=['fundIsinGrowth'], name='fund_isin_growth_idx'),
+            Index(fields=['fundIsinReinvestment'], name='fund_isin_reinvestment_idx'),
+        ]
+
 
 class AumEntryModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -230,6 +257,12 @@ class AumEntryModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('aumInvoiceNumber', 'aum_invoice_number_trgm'),
+            trigram_index('aumMonth', 'aum_month_trgm'),
+        ]
+
 
 class CommissionEntryModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -243,6 +276,11 @@ class CommissionEntryModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('commissionMonth', 'commission_month_trgm'),
+        ]
+
 
 class AumYoyGrowthEntryModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -266,6 +304,11 @@ class IndustryAumEntryModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('industryName', 'industry_aum_name_trgm'),
+        ]
+
 
 class GstEntryModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -282,12 +325,19 @@ class GstEntryModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('gstInvoiceNumber', 'gst_invoice_number_trgm'),
+        ]
+
 
 class NavModel(models.Model):
     id = models.AutoField(primary_key=True)
     navFundName = models.ForeignKey(FundModel, on_delete=models.CASCADE, related_name="navFundName",
                                     null=True, blank=True)
-    nav = models.CharField(max_length=200, null=True, blank=True)
+    nav = models.DecimalField(max_digits=20, decimal_places=6, null=True, blank=True)
+    navRepurchasePrice = models.DecimalField(max_digits=20, decimal_places=6, null=True, blank=True)
+    navSalePrice = models.DecimalField(max_digits=20, decimal_places=6, null=True, blank=True)
     navDate = models.DateField(null=True, blank=True)
     hideStatus = models.IntegerField(default=0)
     createdAt = models.DateTimeField(auto_now_add=True)
@@ -296,11 +346,36 @@ class NavModel(models.Model):
     class Meta:
         indexes = [
             Index(fields=['hideStatus', '-createdAt']),
-            Index(fields=['navFundName']),
             Index(fields=['nav']),
+            BrinIndex(fields=['navDate']),
         ]
+        constraints = [
+            # Also the index behind per-fund lookups and (fund, date range) history scans
+            models.UniqueConstraint(fields=['navFundName', 'navDate'], name='unique_nav_fund_date'),
+        ]
+
 
 
+# Most recent NAV of each fund, kept current by the NAV ingestion upsert
+class LatestNavModel(models.Model):
+    id = models.AutoField(primary_key=True)
+    latestNavFund = models.OneToOneField(FundModel, on_delete=models.CASCADE, related_name="latestNavFund")
+    latestNav = models.DecimalField(max_digits=20, decimal_places=6, null=True, blank=True)
+    latestNavDate = models.DateField()
+    updatedAt = models.DateTimeField(auto_now=True)
+
+
+# One row per AMFI history date fetched: lets the daily sync find gaps and skip unchanged files
+class NavIngestionLedgerModel(models.Model):
+    id = models.AutoField(primary_key=True)
+    ledgerDate = models.DateField(unique=True)
+    ledgerStatus = models.CharField(max_length=20)  # SUCCESS, EMPTY, FAILED
+    ledgerRowCount = models.IntegerField(default=0)
+    ledgerChecksum = models.CharField(max_length=64, null=True, blank=True)  # sha256 of the upstream file
+    ledgerDuration = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)  # seconds
+    createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
 class StatementModel(models.Model):
     id = models.AutoField(primary_key=True)
     statementDate = models.DateField(null=True, blank=True)
@@ -325,6 +400,13 @@ class StatementModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('statementInvestorName', 'statement_investor_trgm'),
+            trigram_index('statementInvestorPanNo', 'statement_pan_trgm'),
+            trigram_index('statementFundName', 'statement_fund_name_trgm'),
+        ]
+
 
 class FormsModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -342,6 +424,11 @@ class FormsModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('formsDescription', 'forms_description_trgm'),
+        ]
+
 
 class MarketingModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -363,6 +450,11 @@ class MarketingModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('marketingDescription', 'marketing_description_trgm'),
+        ]
+
 
 class EmployeeModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -440,6 +532,13 @@ class ClientModel(models.Model):
     def __str__(self):
         return self.clientPanNo
 
+    class Meta:
+        indexes = [
+            trigram_index('clientName', 'client_name_trgm'),
+            trigram_index('clientEmail', 'client_email_trgm'),
+            trigram_index('clientPhone', 'client_phone_trgm'),
+        ]
+
 
 class ClientFamilyDetailModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -743,6 +842,13 @@ class CourierModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('courierClientAddress', 'courier_address_trgm'),
+            trigram_index('courierMobileNumber', 'courier_mobile_trgm'),
+            trigram_index('courierEmail', 'courier_email_trgm'),
+        ]
+
 
 class CourierFileModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -769,6 +875,11 @@ class TaskModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('taskTitle', 'task_title_trgm'),
+        ]
+
 
 class DailyEntryModel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -817,21 +928,33 @@ class IssueModel(models.Model):
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            trigram_index('issueDescription', 'issue_description_trgm'),
+        ]
+
 
 class ActivityLog(models.Model):
     id = models.AutoField(primary_key=True)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     username = models.CharField(max_length=255)
-    action = models.CharField(max_length=50)  # LOGIN, LOGOUT, CREATE, UPDATE, DELETE
+    action = models.CharField(max_length=50)  # LOGIN, LOGOUT, CREATE, UPDATE, DELETE, CHECKPOINT (archiving)
     entity_type = models.CharField(max_length=100)  # Model name or entity type
     entity_id = models.CharField(max_length=100, null=True)  # ID of affected entity
     details = models.JSONField(null=True)  # Additional details about the action
     previous_data = models.JSONField(null=True)  # Store existing data before update/delete
     ip_address = models.GenericIPAddressField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)  # set when the event is queued, not when written
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Entity history, per-user activity and the time-ordered feed; the table is
+            # range-partitioned by month on created_at (manage_partitions --table activity)
+            Index(fields=['entity_type', 'entity_id', '-created_at']),
+            Index(fields=['user', '-created_at']),
+            Index(fields=['-created_at']),
+        ]
 
 
 #DBF
@@ -2680,3 +2803,30 @@ class INVKYCReportModel(models.Model):
     hideStatus = models.IntegerField(default=0)
     createdAt = models.DateTimeField(auto_now_add=True)
     updatedAt = models.DateTimeField(auto_now=True)
+
+
+class MailbackImportJobModel(models.Model):
+    id = models.AutoField(primary_key=True)
+    importReport = models.CharField(max_length=100)  # apis.mailback report name, e.g. common_format
+    importFileName = models.CharField(max_length=500)
+    importFileFormat = models.CharField(max_length=10)  # dbf, csv, xlsx
+    importFileSize = models.BigIntegerField(default=0)
+    importChecksum = models.CharField(max_length=64, null=True, blank=True)  # sha256 of the file
+    importStatus = models.CharField(max_length=20)  # RUNNING, SUCCESS, FAILED, SKIPPED
+    importRowsRead = models.IntegerField(default=0)
+    importRowsImported = models.IntegerField(default=0)
+    importRowsSkipped = models.IntegerField(default=0)  # blank rows
+    importValuesTruncated = models.IntegerField(default=0)  # values cut to their field's max_length
+    importColumns = models.JSONField(null=True, blank=True)  # file column -> model field
+    importUnmappedColumns = models.JSONField(null=True, blank=True)
+    importError = models.TextField(null=True, blank=True)
+    importDuration = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)  # seconds
+    hideStatus = models.IntegerField(default=0)
+    createdAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Re-imports of the same file are found by checksum
+            Index(fields=['importReport', 'importChecksum'], name='mailback_import_checksum_idx'),
+        ]
@@ -0,0 +1,417 @@
+#nav_ingest.py
+
+import csv
+import io
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.db.utils import IntegrityError
+from django.utils import timezone
+
+from .models import NavModel, AmcEntryModel, FundModel, LatestNavModel, NavIngestionLedgerModel
+
+logger = logging.getLogger(__name__)
+
+NAV_STAGING_TABLE = 'nav_staging'
+
+LEDGER_SUCCESS = 'SUCCESS'
+LEDGER_EMPTY = 'EMPTY'
+LEDGER_FAILED = 'FAILED'
+
+# FundModel columns filled from the feed's section headers and ISIN columns, in NavRow order
+FUND_META_FIELDS = ('fundSchemeType', 'fundCategory', 'fundIsinGrowth', 'fundIsinReinvestment')
+
+
+def supports_copy_upsert():
+    """COPY and INSERT ... ON CONFLICT are only available on PostgreSQL"""
+    return connection.vendor == 'postgresql'
+
+
+def _nav_columns():
+    qn = connection.ops.quote_name
+    return {
+        'table': qn(NavModel._meta.db_table),
+        'fund': qn(NavModel._meta.get_field('navFundName').column),
+        'date': qn(NavModel._meta.get_field('navDate').column),
+        'nav': qn(NavModel._meta.get_field('nav').column),
+        'repurchase': qn(NavModel._meta.get_field('navRepurchasePrice').column),
+        'sale': qn(NavModel._meta.get_field('navSalePrice').column),
+        'hide': qn(NavModel._meta.get_field('hideStatus').column),
+        'created': qn(NavModel._meta.get_field('createdAt').column),
+        'updated': qn(NavModel._meta.get_field('updatedAt').column),
+    }
+
+
+def _latest_nav_columns():
+    qn = connection.ops.quote_name
+    return {
+        'table': qn(LatestNavModel._meta.db_table),
+        'fund': qn(LatestNavModel._meta.get_field('latestNavFund').column),
+        'nav': qn(LatestNavModel._meta.get_field('latestNav').column),
+        'date': qn(LatestNavModel._meta.get_field('latestNavDate').column),
+        'updated': qn(LatestNavModel._meta.get_field('updatedAt').column),
+    }
+
+
+def _latest_nav_upsert(source_sql):
+    """INSERT ... ON CONFLICT moving each fund's snapshot forward from (fund_id, nav_date, nav) rows"""
+    latest = _latest_nav_columns()
+    return f"""
+        INSERT INTO {latest['table']} ({latest['fund']}, {latest['nav']}, {latest['date']}, {latest['updated']})
+        SELECT DISTINCT ON (fund_id) fund_id, nav, nav_date, now()
+        FROM ({source_sql}) AS source
+        ORDER BY fund_id, nav_date DESC
+        ON CONFLICT ({latest['fund']}) DO UPDATE
+            SET {latest['nav']} = EXCLUDED.{latest['nav']},
+                {latest['date']} = EXCLUDED.{latest['date']},
+                {latest['updated']} = EXCLUDED.{latest['updated']}
+            WHERE {latest['table']}.{latest['date']} <= EXCLUDED.{latest['date']}
+    """
+
+
+def _csv_value(value):
+    return '' if value is None else value
+
+
+def _csv_buffer(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for fund_id, nav_date, nav, repurchase_price, sale_price in rows:
+        writer.writerow([fund_id, nav_date.isoformat(), _csv_value(nav), _csv_value(repurchase_price),
+                         _csv_value(sale_price)])
+    buffer.seek(0)
+    return buffer
+
+
+def _nav_rows(rows):
+    # Rows without a fund or date can never conflict
+    return [row for row in rows if row[0] is not None and row[1] is not None]
+
+
+def _stage_navs(cursor, rows):
+    """COPY rows into a temporary (never WAL-logged) staging table dropped at commit"""
+    cursor.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {NAV_STAGING_TABLE} "
+        f"(fund_id integer, nav_date date, nav numeric(20, 6), repurchase_price numeric(20, 6), "
+        f"sale_price numeric(20, 6)) ON COMMIT DROP"
+    )
+    cursor.execute(f"TRUNCATE {NAV_STAGING_TABLE}")
+    cursor.copy_expert(
+        f"COPY {NAV_STAGING_TABLE} (fund_id, nav_date, nav, repurchase_price, sale_price) "
+        f"FROM STDIN WITH (FORMAT csv)",
+        _csv_buffer(rows),
+    )
+
+
+def _staged_nav_insert(columns):
+    return f"""
+        INSERT INTO {columns['table']} ({columns['fund']}, {columns['date']}, {columns['nav']},
+                                       {columns['repurchase']}, {columns['sale']}, {columns['hide']},
+                                       {columns['created']}, {columns['updated']})
+        SELECT DISTINCT ON (fund_id, nav_date) fund_id, nav_date, nav, repurchase_price, sale_price, 0, now(), now()
+        FROM {NAV_STAGING_TABLE}
+        ORDER BY fund_id, nav_date
+    """
+
+
+@transaction.atomic
+def copy_upsert_navs(rows):
+    """
+    Upsert (fund_id, nav_date, nav, repurchase_price, sale_price) tuples into NavModel
+    in a fixed number of round-trips.
+
+    The batch is streamed with COPY into a temporary (never WAL-logged) staging
+    table and merged with a single INSERT ... ON CONFLICT on the unique
+    (navFundName, navDate) constraint. The visible stored rows of the batch that
+    carry a NAV then move each fund's LatestNavModel snapshot forward. Rows without
+    a fund or date can never conflict and are skipped. A blank repurchase or sale
+    price never clears a stored one, so sources without those columns can be loaded
+    over full history.
+    Returns the number of NAV rows inserted or changed.
+    """
+    rows = _nav_rows(rows)
+    if not rows:
+        return 0
+
+    columns = _nav_columns()
+    with connection.cursor() as cursor:
+        _stage_navs(cursor, rows)
+        table = columns['table']
+        repurchase = f"COALESCE(EXCLUDED.{columns['repurchase']}, {table}.{columns['repurchase']})"
+        sale = f"COALESCE(EXCLUDED.{columns['sale']}, {table}.{columns['sale']})"
+        cursor.execute(f"""
+            {_staged_nav_insert(columns)}
+            ON CONFLICT ({columns['fund']}, {columns['date']}) DO UPDATE
+                SET {columns['nav']} = EXCLUDED.{columns['nav']},
+                    {columns['repurchase']} = {repurchase},
+                    {columns['sale']} = {sale},
+                    {columns['updated']} = EXCLUDED.{columns['updated']}
+                WHERE ({table}.{columns['nav']}, {table}.{columns['repurchase']}, {table}.{columns['sale']})
+                      IS DISTINCT FROM (EXCLUDED.{columns['nav']}, {repurchase}, {sale})
+        """)
+        changed = cursor.rowcount
+        # Read back the stored rows so a conflict with a soft-deleted row never moves the snapshot
+        cursor.execute(_latest_nav_upsert(f"""
+            SELECT stored.{columns['fund']} AS fund_id, stored.{columns['date']} AS nav_date,
+                   stored.{columns['nav']} AS nav
+            FROM {NAV_STAGING_TABLE} staged
+            JOIN {table} stored
+                ON stored.{columns['fund']} = staged.fund_id AND stored.{columns['date']} = staged.nav_date
+            WHERE stored.{columns['hide']} = 0 AND stored.{columns['nav']} IS NOT NULL
+        """))
+        return changed
+
+
+@transaction.atomic
+def copy_insert_new_navs(rows):
+    """
+    Insert the (fund_id, nav_date, nav, repurchase_price, sale_price) tuples whose
+    (fund, date) is not stored yet, leaving existing rows untouched; returns the
+    number inserted.
+
+    Same staging as copy_upsert_navs, but ON CONFLICT DO NOTHING, and only the rows
+    actually inserted with a NAV move LatestNavModel forward, all in one statement.
+    """
+    rows = _nav_rows(rows)
+    if not rows:
+        return 0
+
+    columns = _nav_columns()
+    with connection.cursor() as cursor:
+        _stage_navs(cursor, rows)
+        cursor.execute(f"""
+            WITH inserted AS (
+                {_staged_nav_insert(columns)}
+                ON CONFLICT ({columns['fund']}, {columns['date']}) DO NOTHING
+                RETURNING {columns['fund']} AS fund_id, {columns['date']} AS nav_date, {columns['nav']} AS nav
+            ), latest AS (
+                {_latest_nav_upsert("SELECT fund_id, nav_date, nav FROM inserted WHERE nav IS NOT NULL")}
+            )
+            SELECT COUNT(*) FROM inserted
+        """)
+        return cursor.fetchone()[0]
+
+
+@transaction.atomic
+def refresh_latest_navs(fund_ids):
+    """
+    Recompute the LatestNavModel snapshot of the given funds from visible NavModel rows with a NAV.
+
+    Used by the ORM ingest path and after manual edits or soft deletes, which can
+    move a fund's latest NAV backwards. Meant for small sets of funds.
+    """
+    fund_ids = {fund_id for fund_id in fund_ids if fund_id is not None}
+    if not fund_ids:
+        return
+
+    newest = NavModel.objects.filter(
+        navFundName_id=OuterRef('pk'), hideStatus=0, navDate__isnull=False, nav__isnull=False
+    ).order_by('-navDate')
+    funds = FundModel.objects.filter(id__in=fund_ids).annotate(
+        newest_date=Subquery(newest.values('navDate')[:1]),
+        newest_nav=Subquery(newest.values('nav')[:1]),
+    ).values_list('id', 'newest_date', 'newest_nav')
+
+    LatestNavModel.objects.filter(latestNavFund_id__in=fund_ids).delete()
+    LatestNavModel.objects.bulk_create([
+        LatestNavModel(latestNavFund_id=fund_id, latestNavDate=nav_date, latestNav=nav)
+        for fund_id, nav_date, nav in funds if nav_date is not None
+    ])
+
+
+def clean_scheme_code(scheme_code):
+    scheme_code = (scheme_code or '').strip()
+    return scheme_code if scheme_code and scheme_code != '-' else None
+
+
+def row_meta(row):
+    """FUND_META_FIELDS values carried by a NavRow"""
+    return row.scheme_type, row.category, row.isin_growth, row.isin_reinvestment
+
+
+def merged_meta(current, new):
+    """Fund metadata after a feed row: values the row leaves blank keep what is stored"""
+    return tuple(value if value is not None else old for old, value in zip(current, new))
+
+
+class NavEntityResolver:
+    """
+    In-memory AMC and fund lookup for NAV ingestion.
+
+    Every AmcEntryModel and FundModel row is loaded once up front; each batch
+    then creates its genuinely new AMCs and funds with one bulk_create apiece,
+    and moves the scheme code, category and ISINs of changed funds with one
+    bulk_update apiece. Keep a single instance for a whole run so the cache stays
+    warm across dates.
+    """
+
+    def __init__(self):
+        self.load()
+
+    def load(self):
+        self.amc_ids = dict(AmcEntryModel.objects.values_list('amcName', 'id'))
+        self.fund_ids = {}
+        self.fund_codes = {}
+        self.code_funds = {}
+        self.fund_meta = {}
+
+        funds = FundModel.objects.values_list('id', 'fundAmcName_id', 'fundName', 'schemeCode', *FUND_META_FIELDS)
+        for fund_id, amc_id, fund_name, scheme_code, *meta in funds.iterator(chunk_size=10000):
+            self.fund_ids[(amc_id, fund_name)] = fund_id
+            self.fund_meta[fund_id] = tuple(meta)
+            if scheme_code:
+                self.fund_codes[fund_id] = scheme_code
+                self.code_funds[scheme_code] = (fund_id, fund_name)
+
+    def resolve(self, rows, retry=True):
+        """Return the FundModel id for each NavRow in rows, creating missing AMCs and funds"""
+        try:
+            with transaction.atomic():
+                return self._resolve(rows)
+        except IntegrityError as e:
+            # Another writer created the same AMC or fund; reload and try once more
+            if not retry:
+                raise
+            logger.warning(f"Fund cache out of date, reloading: {str(e)}")
+            self.load()
+            return self.resolve(rows, retry=False)
+
+    def _resolve(self, rows):
+        self._create_amcs({row.amc_name for row in rows} - self.amc_ids.keys())
+
+        new_funds = {}
+        new_codes = {}
+        code_updates = {}
+        meta_updates = {}
+        resolved = []
+
+        for row in rows:
+            amc_id = self.amc_ids[row.amc_name]
+            scheme_code = clean_scheme_code(row.scheme_code)
+            key = (amc_id, row.scheme_name)
+            fund_id = self.fund_ids.get(key)
+
+            if fund_id is None:
+                owner = self.code_funds.get(scheme_code) if scheme_code else None
+                if owner:
+                    logger.warning(
+                        f"SchemeCode {scheme_code} already exists for '{owner[1]}'. Using existing fund.")
+                    fund_id = self.fund_ids[key] = owner[0]
+                elif scheme_code in new_codes:
+                    key = new_codes[scheme_code]
+                elif key not in new_funds:
+                    new_funds[key] = FundModel(fundAmcName_id=amc_id, fundName=row.scheme_name,
+                                               schemeCode=scheme_code,
+                                               **dict(zip(FUND_META_FIELDS, row_meta(row))))
+                    if scheme_code:
+                        new_codes[scheme_code] = key
+
+            elif scheme_code and self.fund_codes.get(fund_id) != scheme_code:
+                owner = self.code_funds.get(scheme_code)
+                if owner and owner[0] != fund_id:
+                    if owner[1] != row.scheme_name:
+                        logger.warning(
+                            f"SchemeCode {scheme_code} conflict: '{row.scheme_name}' vs '{owner[1]}'. "
+                            f"Using existing fund.")
+                    fund_id = self.fund_ids[key] = owner[0]
+                elif fund_id not in code_updates:
+                    logger.info(f"Updating schemeCode for '{row.scheme_name}' to {scheme_code}")
+                    code_updates[fund_id] = (scheme_code, row.scheme_name)
+
+            if fund_id is not None:
+                current = meta_updates.get(fund_id) or self.fund_meta.get(fund_id) or (None,) * len(FUND_META_FIELDS)
+                meta = merged_meta(current, row_meta(row))
+                if meta != current:
+                    meta_updates[fund_id] = meta
+
+            resolved.append(fund_id if fund_id is not None else key)
+
+        if new_funds:
+            for fund in FundModel.objects.bulk_create(new_funds.values()):
+                self._remember_fund(fund.id, fund.fundAmcName_id, fund.fundName, fund.schemeCode)
+                self.fund_meta[fund.id] = tuple(getattr(fund, field) for field in FUND_META_FIELDS)
+
+        if code_updates:
+            now = timezone.now()
+            FundModel.objects.bulk_update(
+                [FundModel(id=fund_id, schemeCode=scheme_code, updatedAt=now)
+                 for fund_id, (scheme_code, _) in code_updates.items()],
+                ['schemeCode', 'updatedAt'],
+            )
+            for fund_id, (scheme_code, fund_name) in code_updates.items():
+                self.code_funds.pop(self.fund_codes.get(fund_id), None)
+                self.fund_codes[fund_id] = scheme_code
+                self.code_funds[scheme_code] = (fund_id, fund_name)
+
+        if meta_updates:
+            now = timezone.now()
+            FundModel.objects.bulk_update(
+                [FundModel(id=fund_id, updatedAt=now, **dict(zip(FUND_META_FIELDS, meta)))
+                 for fund_id, meta in meta_updates.items()],
+                [*FUND_META_FIELDS, 'updatedAt'],
+                batch_size=1000,
+            )
+            self.fund_meta.update(meta_updates)
+
+        return [self.fund_ids[item] if isinstance(item, tuple) else item for item in resolved]
+
+    def _create_amcs(self, amc_names):
+        if not amc_names:
+            return
+        AmcEntryModel.objects.bulk_create([AmcEntryModel(amcName=name) for name in amc_names],
+                                          ignore_conflicts=True)
+        self.amc_ids.update(AmcEntryModel.objects.filter(amcName__in=amc_names).values_list('amcName', 'id'))
+
+    def _remember_fund(self, fund_id, amc_id, fund_name, scheme_code):
+        self.fund_ids[(amc_id, fund_name)] = fund_id
+        if scheme_code:
+            self.fund_codes[fund_id] = scheme_code
+            self.code_funds[scheme_code] = (fund_id, fund_name)
+
+
+def record_ledger(day, row_count=0, checksum=None, duration=None, status=None):
+    """Create or update the ingestion ledger entry of a NAV date"""
+    if status is None:
+        status = LEDGER_SUCCESS if row_count else LEDGER_EMPTY
+    NavIngestionLedgerModel.objects.update_or_create(
+        ledgerDate=day,
+        defaults={
+            'ledgerStatus': status,
+            'ledgerRowCount': row_count,
+            'ledgerChecksum': checksum,
+            'ledgerDuration': Decimal(f'{duration:.3f}') if duration is not None else None,
+        },
+    )
+
+
+def ledger_checksums(days):
+    """Checksums of successfully ingested dates, for skipping unchanged upstream files"""
+    return dict(
+        NavIngestionLedgerModel.objects.filter(ledgerDate__in=list(days))
+        .exclude(ledgerStatus=LEDGER_FAILED)
+        .values_list('ledgerDate', 'ledgerChecksum')
+    )
+
+
+def missing_nav_dates(first_day, last_day, recheck_days=0):
+    """
+    Trading dates (Mon-Fri) between first_day and last_day that still need fetching.
+
+    A date is done once the ledger holds a SUCCESS or EMPTY (holiday) entry for it.
+    The last recheck_days dates are always returned, since AMFI can publish late
+    or partial files for recent days; unchanged files are skipped by checksum.
+    """
+    done = set(
+        NavIngestionLedgerModel.objects.filter(ledgerDate__range=(first_day, last_day))
+        .exclude(ledgerStatus=LEDGER_FAILED)
+        .values_list('ledgerDate', flat=True)
+    )
+    trading_days = [
+        first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)
+        if (first_day + timedelta(days=offset)).weekday() < 5
+    ]
+    recheck = set(trading_days[-recheck_days:]) if recheck_days > 0 else set()
+    return [day for day in trading_days if day not in done or day in recheck]
@@ -0,0 +1,208 @@
+#pagination.py
+
+import base64
+import datetime
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework import status
+from rest_framework.response import Response
+
+from .query_planner import plan_queryset, query_budget
+
+logger = logging.getLogger(__name__)
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder truncates datetimes to milliseconds, which would skip rows on createdAt
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(ordering, value, pk):
+    """Opaque cursor pointing just after the row with the given sort value and id"""
+    payload = json.dumps([ordering, value, pk], cls=CursorJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (ordering, value, pk) from a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        ordering, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return ordering, value, int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+
+
+def keyset_filter(field, descending, value, pk):
+    """
+    Rows strictly after (value, pk) for ORDER BY field, id in the given direction.
+
+    NULL sort values are ordered last in both directions, matching keyset_order_by.
+    """
+    after = 'lt' if descending else 'gt'
+    if field == 'id':
+        return Q(**{f'id__{after}': pk})
+    if value is None:
+        return Q(**{f'{field}__isnull': True, f'id__{after}': pk})
+    return (
+        Q(**{f'{field}__{after}': value})
+        | Q(**{field: value, f'id__{after}': pk})
+        | Q(**{f'{field}__isnull': True})
+    )
+
+
+def keyset_order_by(field, descending):
+    if field == 'id':
+        return ['-id' if descending else 'id']
+    expression = F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+    return [expression, '-id' if descending else 'id']
+
+
+def exact_count(queryset):
+    """
+    COUNT(*) of a queryset, cached briefly per distinct SQL so repeated page loads
+    skip it. If the cache is unreachable the count is run directly.
+    """
+    timeout = getattr(settings, 'LISTING_COUNT_CACHE_SECONDS', 60)
+    if not timeout:
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    key = 'listing-count:' + hashlib.sha1(f'{sql}|{params!r}'.encode()).hexdigest()
+    try:
+        total = cache.get(key)
+    except Exception:
+        logger.warning("Listing count cache unavailable", exc_info=True)
+        return queryset.count()
+    if total is None:
+        total = queryset.count()
+        try:
+            cache.set(key, total, timeout)
+        except Exception:
+            logger.warning("Could not cache listing count", exc_info=True)
+    return total
+
+
+def estimated_count(queryset):
+    """Planner row estimate for a queryset on PostgreSQL; exact (cached) count elsewhere"""
+    if connection.vendor != 'postgresql':
+        return exact_count(queryset)
+    try:
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (ValueError, KeyError, IndexError, TypeError):
+        logger.warning("Could not estimate listing count, falling back to COUNT", exc_info=True)
+        return exact_count(queryset)
+
+
+class KeysetPaginationMixin:
+    """
+    Shared pagination for the `listing` actions.
+
+    Query parameters:
+      page_size  rows per page (default listing_page_size, capped at listing_max_page_size)
+      ordering   one of ordering_fields, optionally prefixed with '-' (default listing_ordering)
+      cursor     opaque next_cursor from a previous response; switches to keyset paging,
+                 which costs the same for every page
+      page       legacy OFFSET paging, used when no cursor is given
+      count      exact (cached), estimate (planner) or none
+
+    Responses keep the existing keys (total_count, total_pages, current_page for
+    page requests) and add next_cursor, which is None on the last page.
+
+    The page query is planned from the serializer (joins and only the columns it
+    reads, see query_planner), and the whole listing must stay within
+    listing_query_budget queries when QUERY_BUDGET_MODE is enabled.
+    """
+    ordering_fields = ('id', 'createdAt')
+    listing_ordering = '-id'
+    listing_page_size = 10
+    listing_max_page_size = 1000
+    listing_count = COUNT_EXACT
+    listing_query_budget = 4  # count, page and room for a prefetch or two
+
+    def get_listing_ordering(self, request):
+        ordering = request.query_params.get('ordering') or self.listing_ordering
+        field = ordering.lstrip('-')
+        if field not in self.ordering_fields:
+            raise InvalidCursor(f"Ordering by {field} is not supported")
+        return ordering, field, ordering.startswith('-')
+
+    def get_listing_count(self, request, queryset, default):
+        mode = request.query_params.get('count', default)
+        if mode not in COUNT_MODES:
+            raise InvalidCursor(f"Unknown count mode: {mode}")
+        if mode == COUNT_EXACT:
+            return exact_count(queryset)
+        if mode == COUNT_ESTIMATE:
+            return estimated_count(queryset)
+        return None
+
+    def apply_cursor(self, queryset, cursor, ordering, field, descending):
+        if cursor.isdigit() and ordering == '-id':
+            # Plain id cursors handed out by the earlier NavViewSet listing are inclusive
+            return queryset.filter(id__lte=int(cursor))
+        cursor_ordering, value, pk = decode_cursor(cursor)
+        if cursor_ordering != ordering:
+            raise InvalidCursor("Cursor does not match the requested ordering")
+        return queryset.filter(keyset_filter(field, descending, value, pk))
+
+    def listing_response(self, request, queryset):
+        with query_budget(self.listing_query_budget, f'{type(self).__name__}.listing'):
+            return self._listing_response(request, queryset)
+
+    def _listing_response(self, request, queryset):
+        try:
+            page_size = int(request.query_params.get('page_size', self.listing_page_size))
+            page_size = max(1, min(page_size, self.listing_max_page_size))
+            ordering, field, descending = self.get_listing_ordering(request)
+            cursor = request.query_params.get('cursor')
+            planned = plan_queryset(queryset, self.get_serializer_class(), extra_fields=(field,))
+
+            data = {'code': 1, 'message': "Retrieved Successfully"}
+            if cursor:
+                total_count = self.get_listing_count(request, queryset, COUNT_NONE)
+                page_queryset = self.apply_cursor(planned, cursor, ordering, field, descending)
+                rows = list(page_queryset.order_by(*keyset_order_by(field, descending))[:page_size + 1])
+                if total_count is not None:
+                    data['total_count'] = total_count
+            else:
+                page = max(int(request.query_params.get('page', 1)), 1)
+                total_count = self.get_listing_count(request, queryset, self.listing_count)
+                start = (page - 1) * page_size
+                rows = list(planned.order_by(*keyset_order_by(field, descending))[start:start + page_size + 1])
+                if total_count is not None:
+                    data['total_count'] = total_count
+                    data['total_pages'] = (total_count + page_size - 1) // page_size
+                data['current_page'] = page
+        except (InvalidCursor, ValueError, ValidationError) as e:
+            return Response({'code': 0, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = encode_cursor(ordering, getattr(last, field), last.id)
+
+        data['data'] = self.get_serializer(rows, many=True).data
+        data['next_cursor'] = next_cursor
+        return Response(data)
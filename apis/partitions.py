@@ -0,0 +1,208 @@
+#partitions.py
+
+import logging
+from datetime import date, datetime
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+YEAR = 'year'
+MONTH = 'month'
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def as_date(value):
+    """Dates pass through; timestamps (e.g. ActivityLog.created_at) are truncated to their day"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def period_start(day, interval):
+    day = as_date(day)
+    return date(day.year, 1, 1) if interval == YEAR else date(day.year, day.month, 1)
+
+
+def next_period(start, interval):
+    if interval == YEAR:
+        return date(start.year + 1, 1, 1)
+    return date(start.year + (start.month // 12), start.month % 12 + 1, 1)
+
+
+def iter_periods(first_day, last_day, interval):
+    """Yield (start, end) bounds of every period touching first_day..last_day"""
+    start = period_start(first_day, interval)
+    while start <= last_day:
+        end = next_period(start, interval)
+        yield start, end
+        start = end
+
+
+def partition_name(table, start, interval):
+    return f"{table}_p{start:%Y}" if interval == YEAR else f"{table}_p{start:%Y_%m}"
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def relation_exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    return cursor.fetchone()[0]
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def list_partitions(table):
+    """Return (name, bound expression, estimated rows) for every partition of table"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), GREATEST(c.reltuples, 0)::bigint
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+        """, [table])
+        return cursor.fetchall()
+
+
+def estimated_row_count(table):
+    """Planner row estimate for a table and all of its partitions, without scanning any of them"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+            FROM pg_class c
+            WHERE c.oid = to_regclass(%s)
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))
+        """, [table, table])
+        return cursor.fetchone()[0]
+
+
+def create_partition(cursor, table, column, start, end, interval):
+    """
+    Create the partition of table covering [start, end) unless it already exists.
+
+    Rows that landed in the default partition for that range are moved into the
+    new partition before it is attached, as PostgreSQL refuses the attach otherwise.
+    """
+    name = partition_name(table, start, interval)
+    if relation_exists(cursor, name):
+        return None
+
+    default = default_partition_name(table)
+    if relation_exists(cursor, default):
+        cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(default)} WHERE {qn(column)} >= %s AND {qn(column)} < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)",
+                       [start, end])
+    else:
+        cursor.execute(f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)",
+                       [start, end])
+    return name
+
+
+def drop_partition(cursor, table, name):
+    """Detach a partition from table and drop it"""
+    cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+    cursor.execute(f"DROP TABLE {qn(name)}")
+
+
+@transaction.atomic
+def ensure_partitions(table, column, interval, first_day, last_day):
+    """Create any missing partitions between first_day and last_day; returns the names created"""
+    created = []
+    with connection.cursor() as cursor:
+        for start, end in iter_periods(first_day, last_day, interval):
+            name = create_partition(cursor, table, column, start, end, interval)
+            if name:
+                created.append(name)
+    return created
+
+
+@transaction.atomic
+def convert_to_partitioned(table, column, interval, periods_ahead=1, keep_legacy=False):
+    """
+    Rebuild a plain table as a table range-partitioned on column, copying its rows.
+
+    Indexes and unique/foreign-key/check constraints are recreated under their
+    original names so later Django migrations still find them. The primary key
+    becomes UNIQUE (id, column), since PostgreSQL requires the partition key in
+    every unique constraint, and the id identity is replaced by an owned sequence.
+    The table is locked for the duration of the copy.
+    """
+    legacy = f"{table}_legacy"
+    sequence = f"{table}_id_part_seq"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+
+        cursor.execute("""
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = to_regclass(%s)
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        """, [table])
+        indexes = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT conname, contype, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f', 'c')
+        """, [table])
+        constraints = cursor.fetchall()
+
+        cursor.execute(f"SELECT MIN({qn(column)}), MAX({qn(column)}), MAX(id) FROM {qn(table)}")
+        min_day, max_day, max_id = cursor.fetchone()
+
+        # Free the global index names so they can be reused on the new table
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        for name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(name[:55] + '_legacy')}")
+        for name, contype, _ in constraints:
+            if contype in ('p', 'u'):
+                cursor.execute(
+                    f"ALTER TABLE {qn(legacy)} RENAME CONSTRAINT {qn(name)} TO {qn(name[:55] + '_legacy')}")
+
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) PARTITION BY RANGE ({qn(column)})")
+        cursor.execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id")
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s)", [sequence])
+
+        today = date.today()
+        first_day = as_date(min_day) or today
+        last_day = max(as_date(max_day) or today, today)
+        for _ in range(periods_ahead):
+            last_day = next_period(period_start(last_day, interval), interval)
+        for start, end in iter_periods(first_day, last_day, interval):
+            create_partition(cursor, table, column, start, end, interval)
+        cursor.execute(
+            f"CREATE TABLE {qn(default_partition_name(table))} PARTITION OF {qn(table)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+        if max_id:
+            cursor.execute("SELECT setval(%s, %s)", [sequence, max_id])
+
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + '_id_uniq')} UNIQUE (id, {qn(column)})")
+        for name, contype, definition in constraints:
+            if contype != 'p':
+                cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+        for name, definition in indexes:
+            cursor.execute(definition)
+
+        if not keep_legacy:
+            cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+    logger.info(f"Converted {table} to a partitioned table on {column}")
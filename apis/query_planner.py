@@ -0,0 +1,240 @@
+#query_planner.py
+
+import ast
+import functools
+import inspect
+import logging
+import textwrap
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+BUDGET_OFF = 'off'
+BUDGET_WARN = 'warn'
+BUDGET_RAISE = 'raise'
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryPlan:
+    """
+    Joins, prefetches and columns a serializer needs. columns maps a relation path
+    ('' for the model itself) to the field names read on it, or None when any
+    column may be read; known is False when the serializer touches the instance in
+    a way that cannot be followed, in which case no columns are deferred.
+    """
+
+    def __init__(self):
+        self.joins = set()
+        self.prefetches = set()
+        self.columns = {'': set()}
+        self.known = True
+
+    def add_column(self, path, name):
+        columns = self.columns.setdefault(path, set())
+        if columns is not None:
+            columns.add(name)
+
+    def all_columns(self, path):
+        self.columns[path] = None
+
+
+def _join(prefix, name):
+    return f'{prefix}__{name}' if prefix else name
+
+
+def resolve_path(plan, model, prefix, attrs, pk_only=False, tested_only=False):
+    """
+    Follow attribute names from model: forward foreign keys become joins, reverse and
+    many-to-many relations prefetches, and the first concrete field a column read.
+    pk_only marks a trailing relation read only by its id (PrimaryKeyRelatedField),
+    tested_only one that is only checked for None (`if obj.fk`).
+    """
+    for index, attr in enumerate(attrs):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # A property or method: it may read anything on this model
+            plan.all_columns(prefix)
+            return
+        if not field.is_relation:
+            plan.add_column(prefix, field.name)
+            return
+        if field.many_to_many or field.one_to_many:
+            plan.prefetches.add(_join(prefix, field.get_accessor_name() if field.auto_created else field.name))
+            return
+        if not field.concrete:
+            # Reverse one-to-one
+            plan.prefetches.add(_join(prefix, field.get_accessor_name()))
+            return
+        plan.add_column(prefix, field.name)
+        last = index == len(attrs) - 1
+        if last and pk_only:
+            return
+        prefix = _join(prefix, field.name)
+        plan.joins.add(prefix)
+        plan.columns.setdefault(prefix, set())
+        model = field.related_model
+        if last and not tested_only:
+            # The related object itself is used, e.g. str() or returned as is
+            plan.all_columns(prefix)
+            return
+
+
+def _attribute_chain(node):
+    attrs = []
+    while isinstance(node, ast.Attribute):
+        attrs.append(node.attr)
+        node = node.value
+    return node, list(reversed(attrs))
+
+
+def _is_truth_test(node, parents):
+    parent = parents.get(node)
+    if isinstance(parent, (ast.If, ast.IfExp, ast.While)):
+        return parent.test is node
+    if isinstance(parent, ast.UnaryOp) and isinstance(parent.op, ast.Not):
+        return True
+    return isinstance(parent, ast.BoolOp) and _is_truth_test(parent, parents)
+
+
+def _is_super_call_argument(node, parents):
+    parent = parents.get(node)
+    if not isinstance(parent, ast.Call) or node not in parent.args:
+        return False
+    func = parent.func
+    return (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Call)
+            and isinstance(func.value.func, ast.Name) and func.value.func.id == 'super')
+
+
+def analyze_method(plan, function, model, prefix):
+    """Record every instance.<field>.<field>... chain read by a to_representation or get_<field> method"""
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+    except (OSError, TypeError, SyntaxError):
+        plan.known = False
+        return
+    definition = tree.body[0]
+    params = [arg.arg for arg in definition.args.args]
+    if len(params) < 2:
+        return
+    instance = params[1]
+
+    parents = {child: node for node in ast.walk(definition) for child in ast.iter_child_nodes(node)}
+    for node in ast.walk(definition):
+        if not (isinstance(node, ast.Name) and node.id == instance):
+            continue
+        parent = parents.get(node)
+        if isinstance(parent, ast.Attribute):
+            top = parent
+            while isinstance(parents.get(top), ast.Attribute):
+                top = parents[top]
+            _, attrs = _attribute_chain(top)
+            resolve_path(plan, model, prefix, attrs, tested_only=_is_truth_test(top, parents))
+        elif not _is_super_call_argument(node, parents):
+            # Handed to something we cannot follow
+            plan.known = False
+
+
+def _overrides(serializer, name):
+    return getattr(type(serializer), name) is not getattr(serializers.ModelSerializer, name)
+
+
+def plan_fields(plan, serializer, model, prefix=''):
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            analyze_method(plan, getattr(type(serializer), field.method_name), model, prefix)
+            continue
+        if field.source == '*':
+            plan.known = False
+            continue
+        attrs = field.source_attrs
+        if isinstance(field, serializers.ListSerializer):
+            resolve_path(plan, model, prefix, attrs)
+            continue
+        if isinstance(field, serializers.ModelSerializer):
+            resolve_path(plan, model, prefix, attrs)
+            related_prefix = '__'.join(attrs) if not prefix else f"{prefix}__{'__'.join(attrs)}"
+            if related_prefix in plan.joins:
+                plan.columns[related_prefix] = set()
+                plan_fields(plan, field, field.Meta.model, related_prefix)
+            continue
+        pk_only = isinstance(field, serializers.PrimaryKeyRelatedField) or (
+            isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization())
+        resolve_path(plan, model, prefix, attrs, pk_only=pk_only)
+
+    if _overrides(serializer, 'to_representation'):
+        analyze_method(plan, type(serializer).to_representation, model, prefix)
+
+
+@functools.lru_cache(maxsize=None)
+def plan_serializer(serializer_class):
+    """Work out (and memoize) the QueryPlan of a ModelSerializer from its declared fields and methods"""
+    plan = QueryPlan()
+    plan_fields(plan, serializer_class(), serializer_class.Meta.model)
+    return plan
+
+
+def plan_queryset(queryset, serializer_class, extra_fields=()):
+    """
+    Apply a serializer's QueryPlan to queryset: select_related for every forward
+    relation it reads, prefetch_related for reverse ones, and only() the columns it
+    reads when all of them could be worked out. extra_fields are kept loaded too
+    (e.g. the pagination cursor field).
+    """
+    plan = plan_serializer(serializer_class)
+    if plan.joins:
+        queryset = queryset.select_related(*sorted(plan.joins))
+    if plan.prefetches:
+        queryset = queryset.prefetch_related(*sorted(plan.prefetches))
+    if not plan.known or plan.columns.get('') is None:
+        return queryset
+
+    only = set(plan.columns[''])
+    only.update(extra_fields)
+    for path, columns in plan.columns.items():
+        if not path:
+            continue
+        if columns is None or not columns:
+            only.add(path)
+        else:
+            only.update(f'{path}__{column}' for column in columns)
+    # Every traversed foreign key must itself be loaded
+    only.update(path for path in plan.joins)
+    return queryset.only(*sorted(only))
+
+
+def query_budget_mode():
+    return getattr(settings, 'QUERY_BUDGET_MODE', BUDGET_OFF)
+
+
+@contextmanager
+def query_budget(limit, label):
+    """
+    Count the queries run inside the block. With QUERY_BUDGET_MODE 'raise' (tests)
+    going over limit raises QueryBudgetExceeded, with 'warn' it is logged, and with
+    'off' (the default) nothing is captured.
+    """
+    mode = query_budget_mode()
+    if mode == BUDGET_OFF or limit is None:
+        yield
+        return
+    with CaptureQueriesContext(connection) as context:
+        yield
+    used = len(context.captured_queries)
+    if used <= limit:
+        return
+    message = f"{label} ran {used} queries, over its budget of {limit}"
+    if mode == BUDGET_RAISE:
+        raise QueryBudgetExceeded(message + ":\n" + "\n".join(q['sql'] for q in context.captured_queries))
+    logger.warning(message)
@@ -0,0 +1,125 @@
+#search.py
+
+import logging
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%d-%b-%Y', '%d %b %Y')
+TEXT_FIELDS = (models.CharField, models.TextField)
+MAX_INTEGER = 2 ** 31 - 1
+NUMERIC_FIELDS = (models.IntegerField, models.DecimalField, models.FloatField, models.AutoField, models.ForeignKey)
+
+
+def trigram_index(field, name):
+    """
+    GIN trigram index on UPPER(field), the expression Django's icontains compares on
+    PostgreSQL, so substring searches become index scans instead of table scans.
+    """
+    return GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=name)
+
+
+def parse_search_number(term):
+    try:
+        return Decimal(term.replace(',', ''))
+    except InvalidOperation:
+        return None
+
+
+def parse_search_dates(term):
+    """Return the [start, end) date range a search term denotes (a day, YYYY-MM or YYYY), or None"""
+    for fmt in DATE_FORMATS:
+        try:
+            day = datetime.strptime(term, fmt).date()
+            return day, day + timedelta(days=1)
+        except ValueError:
+            continue
+    match = re.fullmatch(r'(\d{4})(?:-(\d{1,2}))?', term)
+    if not match:
+        return None
+    year, month = int(match.group(1)), match.group(2)
+    if not month:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    month = int(month)
+    if not 1 <= month <= 12:
+        return None
+    return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
+
+
+def field_condition(field, term):
+    """Index-friendly condition on a single concrete field, or None if the term cannot match it"""
+    name = field.attname if isinstance(field, models.ForeignKey) else field.name
+    if isinstance(field, TEXT_FIELDS):
+        return Q(**{f'{name}__icontains': term})
+    if isinstance(field, models.DateField) and not isinstance(field, models.DateTimeField):
+        bounds = parse_search_dates(term)
+        return Q(**{f'{name}__gte': bounds[0], f'{name}__lt': bounds[1]}) if bounds else None
+    if isinstance(field, NUMERIC_FIELDS):
+        number = parse_search_number(term)
+        if number is None or not number.is_finite():
+            return None
+        if not isinstance(field, (models.DecimalField, models.FloatField)):
+            if number != number.to_integral_value() or abs(number) > MAX_INTEGER:
+                return None
+            number = int(number)
+        return Q(**{name: number})
+    return None
+
+
+def search_condition(model, paths, term):
+    """
+    Build one OR condition over field paths such as 'clientName' or 'navFundName__fundName'.
+
+    Paths through a relation become fk__in=(SELECT pk FROM related WHERE ...), so
+    every table is searched through its own trigram indexes instead of one OR
+    across a join that forces a sequential scan. Numeric and date fields only
+    match terms that parse as such, compared by equality or date range.
+    """
+    condition = Q()
+    matched = False
+    related_paths = defaultdict(list)
+
+    for path in paths:
+        name, _, rest = path.partition('__')
+        field = model._meta.get_field(name)
+        if rest:
+            related_paths[field].append(rest)
+            continue
+        field_q = field_condition(field, term)
+        if field_q is not None:
+            condition |= field_q
+            matched = True
+
+    for field, rest in related_paths.items():
+        related_model = field.related_model
+        related_q = search_condition(related_model, rest, term)
+        if related_q is not None:
+            condition |= Q(**{f'{field.name}__in': related_model._base_manager.filter(related_q).values('pk')})
+            matched = True
+
+    return condition if matched else None
+
+
+def apply_search(queryset, search_fields, term):
+    """Filter queryset to rows where any of search_fields matches term; no-op for an empty term"""
+    term = (term or '').strip()
+    if not term or not search_fields:
+        return queryset
+    condition = search_condition(queryset.model, search_fields, term)
+    return queryset.filter(condition) if condition is not None else queryset.none()
+
+
+class SearchMixin:
+    """Gives a ViewSet `search(queryset, term)` over its `search_fields`"""
+    search_fields = ()
+
+    def search(self, queryset, term):
+        return apply_search(queryset, self.search_fields, term)
@@ -123,7 +123,8 @@ class AmcEntryModelSerializers(CountryFieldMixin, serializers.ModelSerializer):
 
 
 class FundModelSerializers(serializers.ModelSerializer):
-    fundAmcName = AmcEntryModelSerializers(read_only=True)
+    # Only the AMC name is sent, so it is read straight off the related row
+    fundAmcName = serializers.CharField(source='fundAmcName.amcName', read_only=True, default=None)
     fundAmcNameId = serializers.PrimaryKeyRelatedField(
         queryset=AmcEntryModel.objects.all(),
         source='fundAmcName',
@@ -132,12 +133,8 @@ class FundModelSerializers(serializers.ModelSerializer):
 
     class Meta:
         model = FundModel
-        fields = ['id', 'fundAmcName', 'fundAmcNameId', 'fundName', 'schemeCode', 'hideStatus']
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation['fundAmcName'] = instance.fundAmcName.amcName if instance.fundAmcName else None
-        return representation
+        fields = ['id', 'fundAmcName', 'fundAmcNameId', 'fundName', 'schemeCode', 'fundSchemeType', 'fundCategory',
+                  'fundIsinGrowth', 'fundIsinReinvestment', 'hideStatus']
 
 
 class AumEntryModelSerializers(serializers.ModelSerializer):
@@ -214,6 +211,8 @@ class GstEntryModelSerializers(serializers.ModelSerializer):
 
 
 class NavModelSerializers(serializers.ModelSerializer):
+    nav = serializers.DecimalField(max_digits=20, decimal_places=6, normalize_output=True, allow_null=True,
+                                   required=False)
     navFundName = serializers.SerializerMethodField()
     amcName = serializers.SerializerMethodField()
 
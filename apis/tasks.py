@@ -13,9 +13,66 @@ logger = logging.getLogger(__name__)
 def fetch_daily_nav():
     logger.debug("fetch_daily_nav task started")
     try:
-        result = call_command('fetch_nav_data')
+        # Latest-NAV file: one download, only new (scheme, date) rows written
+        result = call_command('fetch_nav_data', latest=True)
         logger.info(f"fetch_daily_nav task completed. Result: {result}")
         return result
     except Exception as e:
         logger.error(f"Error in fetch_daily_nav: {str(e)}", exc_info=True)
         raise
+
+
+@shared_task(name='apis.tasks.sync_nav_history')
+def sync_nav_history():
+    # Fills dates missed by the daily run (and rechecks recent ones) from the history report
+    try:
+        return call_command('fetch_nav_data', sync=True)
+    except Exception as e:
+        logger.error(f"Error in sync_nav_history: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name='apis.tasks.ensure_nav_partitions')
+def ensure_nav_partitions():
+    from apis.models import NavModel
+    from apis.partitions import is_partitioned
+
+    if not is_partitioned(NavModel._meta.db_table):
+        logger.debug("apis_navmodel is not partitioned; nothing to do")
+        return None
+    try:
+        return call_command('manage_partitions', table='nav', ahead=1)
+    except Exception as e:
+        logger.error(f"Error in ensure_nav_partitions: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name='apis.tasks.ensure_activity_log_partitions')
+def ensure_activity_log_partitions():
+    from apis.models import ActivityLog
+    from apis.partitions import is_partitioned
+
+    if not is_partitioned(ActivityLog._meta.db_table):
+        logger.debug("apis_activitylog is not partitioned; nothing to do")
+        return None
+    try:
+        return call_command('manage_partitions', table='activity', ahead=2)
+    except Exception as e:
+        logger.error(f"Error in ensure_activity_log_partitions: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name='apis.tasks.archive_activity_logs')
+def archive_activity_logs():
+    try:
+        return call_command('archive_activity_logs')
+    except Exception as e:
+        logger.error(f"Error in archive_activity_logs: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name='apis.tasks.write_activity_logs')
+def write_activity_logs(events):
+    from apis.audit import write_events
+
+    return write_events(events)
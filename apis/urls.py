@@ -40,6 +40,7 @@ router.register('task', TaskViewSet, basename='task'),
 router.register('employee', EmployeeViewSet, basename='employee'),
 router.register('client', ClientViewSet, basename='client'),
 router.register('dailyEntry', DailyEntryViewSet, basename='dailyEntry'),
+router.register('activityLog', ActivityLogViewSet, basename='activityLog'),
 
 
 urlpatterns = [
@@ -7,8 +7,10 @@ from django.db.models import Model
 from decimal import Decimal
 from rest_framework_simplejwt.tokens import RefreshToken
 from ipware import get_client_ip
-from .models import ActivityLog
+from .audit import build_event, enqueue_event
+from .audit_diff import diff_details
 import datetime
+import json
 
 User = get_user_model()
 
@@ -111,9 +113,8 @@ class ActivityLogger:
             data = details['new_data']
             if isinstance(data, str):
                 try:
-                    import ast
-                    data = ast.literal_eval(data)
-                except:
+                    data = json.loads(data)
+                except ValueError:
                     data = {'raw_data': data}
 
             # Clean the request data
@@ -134,7 +135,7 @@ class ActivityLogger:
     @staticmethod
     def log_activity(request, action, entity_type=None, entity_id=None, details=None, instance=None,
                      previous_data=None):
-        """Log activity with proper handling of file uploads"""
+        """Log activity with proper handling of file uploads; the row is written by the audit writer"""
         try:
             client_ip, _ = get_client_ip(request)
             if not client_ip:
@@ -149,8 +150,13 @@ class ActivityLogger:
             if previous_data:
                 previous_data = ActivityLogger.clean_request_data(previous_data)
 
-            activity_log = ActivityLog(
-                user=request.user if request.user.is_authenticated else None,
+            # Updates store only the changed paths (plus periodic full checkpoints)
+            if action == 'UPDATE' and previous_data:
+                normalized_details, previous_data = diff_details(normalized_details, previous_data, entity_type,
+                                                                 entity_id)
+
+            event = build_event(
+                user_id=request.user.id if request.user.is_authenticated else None,
                 username=username,
                 action=action,
                 entity_type=entity_type,
@@ -159,9 +165,10 @@ class ActivityLogger:
                 previous_data=previous_data,
                 ip_address=client_ip
             )
-            activity_log.save()
+            # Queued for the audit writer; see apis/audit.py
+            enqueue_event(event)
 
-            return activity_log
+            return event
 
         except Exception as e:
             print(f"Error logging activity: {str(e)}")
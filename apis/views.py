@@ -1,7 +1,5 @@
-import base64
 import traceback
 from django.core.exceptions import ValidationError
-from django.core.files.base import ContentFile
 from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction
 from rest_framework import viewsets, status
@@ -10,13 +8,26 @@ from rest_framework.response import Response
 from django.db import connection
 from django.contrib.auth import authenticate
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Model
+from django.db.models import Q, Model, Count
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 import urllib.parse
+import itertools
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from .serializers import *
 from django.http import JsonResponse
 from datetime import datetime, timedelta, date
 from .utils import get_tokens_for_user, ActivityLogger
+from .nav_ingest import refresh_latest_navs
+from .pagination import KeysetPaginationMixin, COUNT_NONE, exact_count
+from .search import SearchMixin
+from .client_aggregate import load_client_aggregate, serialize_client_profile, client_snapshot, soft_delete_client
+from .client_writes import ClientGraphWriter
+from .audit_diff import reconstruct_entity
+from .audit_archive import iter_archived_logs
+from .master_cache import MasterDataCacheMixin, country_choices
+from .catalog import CatalogSyncMixin, conditional_response
+from . import analytics
 from django.core.management import call_command
 from django.db.models import Q
 from django.core.paginator import Paginator
@@ -173,7 +184,7 @@ class UserViewSet(viewsets.ViewSet):
             return Response({"detail": "An error occurred during logout"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class UserTypeViewSet(viewsets.ModelViewSet):
+class UserTypeViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = UserTypeModel.objects.filter(hideStatus=0)
     serializer_class = UserTypeModelSerializers
     permission_classes = [IsAuthenticated]  # Ensure only authenticated users can access these views
@@ -182,13 +193,7 @@ class UserTypeViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = UserTypeModelSerializers(UserTypeModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                      many=True)
-            else:
-                serializer = UserTypeModelSerializers(UserTypeModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                                                      many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -203,6 +208,7 @@ class UserTypeViewSet(viewsets.ModelViewSet):
                 serializer = UserTypeModelSerializers(instance=UserTypeModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -215,27 +221,24 @@ class UserTypeViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             UserTypeModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(CatalogSyncMixin, MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = CountryModel.objects.filter(hideStatus=0)
     serializer_class = CountryModelSerializers
     permission_classes = [IsAuthenticated]
+    catalog_version_cached = True
 
     @action(detail=True, methods=['GET'])
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                Country = CountryModel.objects.filter(hideStatus=0).order_by('-id')
-            else:
-                Country = CountryModel.objects.filter(hideStatus=0, id=pk).order_by('-id')
-            serializer = CountryModelSerializers(Country, many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All Retried"}
+            return self.catalog_response(request, lambda: self.master_listing(pk, "All Retried"))
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -251,6 +254,7 @@ class CountryViewSet(viewsets.ModelViewSet):
                 serializer = CountryModelSerializers(instance=instance, data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -262,14 +266,15 @@ class CountryViewSet(viewsets.ModelViewSet):
     def deletion(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            CountryModel.objects.filter(id=pk).update(hideStatus=1)
+            CountryModel.objects.filter(id=pk).update(hideStatus=1, updatedAt=timezone.now())
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class StateViewSet(viewsets.ModelViewSet):
+class StateViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = StateModel.objects.filter(hideStatus=0)
     serializer_class = StateModelSerializers
     permission_classes = [IsAuthenticated]
@@ -278,12 +283,7 @@ class StateViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                states = StateModel.objects.filter(hideStatus=0).order_by('-id')
-            else:
-                states = StateModel.objects.filter(hideStatus=0, id=pk).order_by('-id')
-            serializer = StateModelSerializers(states, many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All Retried"}
+            response = self.master_listing(pk, "All Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -299,6 +299,7 @@ class StateViewSet(viewsets.ModelViewSet):
                 serializer = StateModelSerializers(instance=instance, data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -311,13 +312,14 @@ class StateViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             StateModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class ModeViewSet(viewsets.ModelViewSet):
+class ModeViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = ModeModel.objects.filter(hideStatus=0)
     serializer_class = ModeModelSerializers
     permission_classes = [IsAuthenticated]
@@ -326,12 +328,7 @@ class ModeViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                modes = ModeModel.objects.filter(hideStatus=0).order_by('-id')
-            else:
-                modes = ModeModel.objects.filter(hideStatus=0, id=pk).order_by('-id')
-            serializer = ModeModelSerializers(modes, many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All Retried"}
+            response = self.master_listing(pk, "All Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -347,6 +344,7 @@ class ModeViewSet(viewsets.ModelViewSet):
                 serializer = ModeModelSerializers(instance=instance, data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -359,13 +357,14 @@ class ModeViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             ModeModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class IssueTypeViewSet(viewsets.ModelViewSet):
+class IssueTypeViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = IssueTypeModel.objects.filter(hideStatus=0)
     serializer_class = IssueTypeModelSerializers
     permission_classes = [IsAuthenticated]
@@ -374,14 +373,7 @@ class IssueTypeViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = IssueTypeModelSerializers(IssueTypeModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                       many=True)
-            else:
-                serializer = IssueTypeModelSerializers(
-                    IssueTypeModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -396,6 +388,7 @@ class IssueTypeViewSet(viewsets.ModelViewSet):
                 serializer = IssueTypeModelSerializers(instance=IssueTypeModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -408,13 +401,14 @@ class IssueTypeViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             IssueTypeModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class FormTypeViewSet(viewsets.ModelViewSet):
+class FormTypeViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = FormTypeModel.objects.filter(hideStatus=0)
     serializer_class = FormTypeModelSerializers
     permission_classes = [IsAuthenticated]
@@ -423,14 +417,7 @@ class FormTypeViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = FormTypeModelSerializers(FormTypeModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                      many=True)
-            else:
-                serializer = FormTypeModelSerializers(
-                    FormTypeModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -445,6 +432,7 @@ class FormTypeViewSet(viewsets.ModelViewSet):
                 serializer = FormTypeModelSerializers(instance=FormTypeModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -457,13 +445,14 @@ class FormTypeViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             FormTypeModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class GstTypeViewSet(viewsets.ModelViewSet):
+class GstTypeViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = GstTypeModel.objects.filter(hideStatus=0)
     serializer_class = GstTypeModelSerializers
     permission_classes = [IsAuthenticated]
@@ -472,14 +461,7 @@ class GstTypeViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = GstTypeModelSerializers(GstTypeModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                     many=True)
-            else:
-                serializer = GstTypeModelSerializers(
-                    GstTypeModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -494,6 +476,7 @@ class GstTypeViewSet(viewsets.ModelViewSet):
                 serializer = GstTypeModelSerializers(instance=GstTypeModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request", 'error': serializer.errors}
@@ -506,13 +489,14 @@ class GstTypeViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             GstTypeModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class FileTypeViewSet(viewsets.ModelViewSet):
+class FileTypeViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = FileTypeModel.objects.filter(hideStatus=0)
     serializer_class = FileTypeModelSerializers
     permission_classes = [IsAuthenticated]
@@ -521,14 +505,7 @@ class FileTypeViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = FileTypeModelSerializers(FileTypeModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                      many=True)
-            else:
-                serializer = FileTypeModelSerializers(
-                    FileTypeModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -543,6 +520,7 @@ class FileTypeViewSet(viewsets.ModelViewSet):
                 serializer = FileTypeModelSerializers(instance=FileTypeModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request", 'error': serializer.errors}
@@ -555,13 +533,14 @@ class FileTypeViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             FileTypeModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class GenderViewSet(viewsets.ModelViewSet):
+class GenderViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = GenderModel.objects.filter(hideStatus=0)
     serializer_class = GenderModelSerializers
     permission_classes = [IsAuthenticated]
@@ -570,13 +549,7 @@ class GenderViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = GenderModelSerializers(GenderModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                    many=True)
-            else:
-                serializer = GenderModelSerializers(GenderModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                                                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -591,6 +564,7 @@ class GenderViewSet(viewsets.ModelViewSet):
                 serializer = GenderModelSerializers(instance=GenderModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -603,13 +577,14 @@ class GenderViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             GenderModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class MaritalStatusViewSet(viewsets.ModelViewSet):
+class MaritalStatusViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = MaritalStatusModel.objects.filter(hideStatus=0)
     serializer_class = MaritalStatusModelSerializers
     permission_classes = [IsAuthenticated]
@@ -618,15 +593,7 @@ class MaritalStatusViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = MaritalStatusModelSerializers(
-                    MaritalStatusModel.objects.filter(hideStatus=0).order_by('-id'),
-                    many=True)
-            else:
-                serializer = MaritalStatusModelSerializers(
-                    MaritalStatusModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -642,6 +609,7 @@ class MaritalStatusViewSet(viewsets.ModelViewSet):
                                                            data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -654,13 +622,14 @@ class MaritalStatusViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             MaritalStatusModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class PoliticallyExposedPersonViewSet(viewsets.ModelViewSet):
+class PoliticallyExposedPersonViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = PoliticallyExposedPersonModel.objects.filter(hideStatus=0)
     serializer_class = PoliticallyExposedPersonModelSerializers
     permission_classes = [IsAuthenticated]
@@ -669,15 +638,7 @@ class PoliticallyExposedPersonViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = PoliticallyExposedPersonModelSerializers(
-                    PoliticallyExposedPersonModel.objects.filter(hideStatus=0).order_by('-id'),
-                    many=True)
-            else:
-                serializer = PoliticallyExposedPersonModelSerializers(
-                    PoliticallyExposedPersonModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -693,6 +654,7 @@ class PoliticallyExposedPersonViewSet(viewsets.ModelViewSet):
                     instance=PoliticallyExposedPersonModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -705,13 +667,14 @@ class PoliticallyExposedPersonViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             PoliticallyExposedPersonModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class BankNameViewSet(viewsets.ModelViewSet):
+class BankNameViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = BankNameModel.objects.filter(hideStatus=0)
     serializer_class = BankNameModelSerializers
     permission_classes = [IsAuthenticated]
@@ -720,13 +683,7 @@ class BankNameViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = BankNameModelSerializers(BankNameModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                      many=True)
-            else:
-                serializer = BankNameModelSerializers(BankNameModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                                                      many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -741,6 +698,7 @@ class BankNameViewSet(viewsets.ModelViewSet):
                 serializer = BankNameModelSerializers(instance=BankNameModel.objects.get(id=pk), data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -753,13 +711,14 @@ class BankNameViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             BankNameModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class RelationshipViewSet(viewsets.ModelViewSet):
+class RelationshipViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = RelationshipModel.objects.filter(hideStatus=0)
     serializer_class = RelationshipModelSerializers
     permission_classes = [IsAuthenticated]
@@ -768,15 +727,7 @@ class RelationshipViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = RelationshipModelSerializers(
-                    RelationshipModel.objects.filter(hideStatus=0).order_by('-id'),
-                    many=True)
-            else:
-                serializer = RelationshipModelSerializers(
-                    RelationshipModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -792,6 +743,7 @@ class RelationshipViewSet(viewsets.ModelViewSet):
                                                           data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -804,13 +756,14 @@ class RelationshipViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             RelationshipModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class AccountTypeViewSet(viewsets.ModelViewSet):
+class AccountTypeViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = AccountTypeModel.objects.filter(hideStatus=0)
     serializer_class = AccountTypeModelSerializers
     permission_classes = [IsAuthenticated]
@@ -819,15 +772,7 @@ class AccountTypeViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = AccountTypeModelSerializers(
-                    AccountTypeModel.objects.filter(hideStatus=0).order_by('-id'),
-                    many=True)
-            else:
-                serializer = AccountTypeModelSerializers(
-                    AccountTypeModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -843,6 +788,7 @@ class AccountTypeViewSet(viewsets.ModelViewSet):
                                                          data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -855,13 +801,14 @@ class AccountTypeViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             AccountTypeModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
         return Response(response)
 
 
-class AccountPreferenceViewSet(viewsets.ModelViewSet):
+class AccountPreferenceViewSet(MasterDataCacheMixin, viewsets.ModelViewSet):
     queryset = AccountPreferenceModel.objects.filter(hideStatus=0)
     serializer_class = AccountPreferenceModelSerializers
     permission_classes = [IsAuthenticated]
@@ -870,15 +817,7 @@ class AccountPreferenceViewSet(viewsets.ModelViewSet):
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = AccountPreferenceModelSerializers(
-                    AccountPreferenceModel.objects.filter(hideStatus=0).order_by('-id'),
-                    many=True)
-            else:
-                serializer = AccountPreferenceModelSerializers(
-                    AccountPreferenceModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                    many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            response = self.master_listing(pk, "All  Retried")
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -894,6 +833,7 @@ class AccountPreferenceViewSet(viewsets.ModelViewSet):
                                                                data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                self.invalidate_cache()
                 response = {'code': 1, 'message': "Done Successfully"}
             else:
                 response = {'code': 0, 'message': "Unable to Process Request"}
@@ -906,6 +846,7 @@ class AccountPreferenceViewSet(viewsets.ModelViewSet):
         user = request.user
         if user.is_authenticated:
             AccountPreferenceModel.objects.filter(id=pk).update(hideStatus=1)
+            self.invalidate_cache()
             response = {'code': 1, 'message': "Done Successfully"}
         else:
             response = {'code': 0, 'message': "Token is invalid"}
@@ -925,17 +866,7 @@ class ArnEntryViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['GET'])
     def countries(self, request):
-        countries = CountryModel.objects.filter(hideStatus=0).values('id', 'countryCode', 'countryName', 'dailCode')
-        country_data = [
-            {
-                "id": country['id'],
-                "code": country['countryCode'],
-                "name": country['countryName'],
-                "dial_code": country['dailCode']
-            }
-            for country in countries
-        ]
-        return Response(country_data)
+        return conditional_response(request, country_choices, (CountryModel,), cached=True)
 
     @action(detail=True, methods=['GET'])
     def listing(self, request, pk=None):
@@ -1035,39 +966,31 @@ class ArnEntryViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class AmcEntryViewSet(viewsets.ModelViewSet):
+class AmcEntryViewSet(CatalogSyncMixin, viewsets.ModelViewSet):
     queryset = AmcEntryModel.objects.filter(hideStatus=0)
     serializer_class = AmcEntryModelSerializers
     permission_classes = [IsAuthenticated]
+    catalog_related = (('amcGstType', GstTypeModel),)
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
 
     @action(detail=False, methods=['GET'])
     def countries(self, request):
-        countries = CountryModel.objects.filter(hideStatus=0).values('id', 'countryCode', 'countryName', 'dailCode')
-        country_data = [
-            {
-                "id": country['id'],
-                "code": country['countryCode'],
-                "name": country['countryName'],
-                "dial_code": country['dailCode']
-            }
-            for country in countries
-        ]
-        return Response(country_data)
+        return conditional_response(request, country_choices, (CountryModel,), cached=True)
 
     @action(detail=True, methods=['GET'])
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = AmcEntryModelSerializers(AmcEntryModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                      many=True)
-            else:
-                serializer = AmcEntryModelSerializers(AmcEntryModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                                                      many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            def build():
+                amcs = AmcEntryModel.objects.filter(hideStatus=0).select_related('amcGstType')
+                if pk != "0":
+                    amcs = amcs.filter(id=pk)
+                serializer = AmcEntryModelSerializers(amcs.order_by('-id'), many=True)
+                return {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+
+            return self.catalog_response(request, build)
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -1153,10 +1076,12 @@ class AmcEntryViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class FundViewSet(viewsets.ModelViewSet):
+class FundViewSet(CatalogSyncMixin, SearchMixin, viewsets.ModelViewSet):
     queryset = FundModel.objects.filter(hideStatus=0)
     serializer_class = FundModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('fundName', 'schemeCode')
+    catalog_related = (('fundAmcName', AmcEntryModel),)
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -1167,6 +1092,7 @@ class FundViewSet(viewsets.ModelViewSet):
         page = int(request.query_params.get('page', 1))
         page_size = int(request.query_params.get('pageSize', 50))
         search = request.query_params.get('search', '')
+        category = request.query_params.get('category')
 
         if not amc_id:
             return Response({'code': 0, 'message': 'AMC ID is required'})
@@ -1175,6 +1101,8 @@ class FundViewSet(viewsets.ModelViewSet):
 
         if search:
             funds = funds.filter(fundName__icontains=search)
+        if category:
+            funds = funds.filter(fundCategory=category)
 
         funds = funds.order_by('fundName')
 
@@ -1202,14 +1130,20 @@ class FundViewSet(viewsets.ModelViewSet):
         page_size = int(request.query_params.get('page_size', 100))
         search = request.query_params.get('search', '')
         amc_id = request.query_params.get('amc_id')
+        category = request.query_params.get('category')
+        isin = request.query_params.get('isin')
 
         queryset = self.get_queryset()
 
         if amc_id:
             queryset = queryset.filter(fundAmcName_id=amc_id)
+        if category:
+            queryset = queryset.filter(fundCategory=category)
+        if isin:
+            isin = isin.strip().upper()
+            queryset = queryset.filter(Q(fundIsinGrowth=isin) | Q(fundIsinReinvestment=isin))
 
-        if search:
-            queryset = queryset.filter(Q(fundName__icontains=search) | Q(schemeCode__icontains=search))
+        queryset = self.search(queryset, search)
 
         start = (page - 1) * page_size
         end = start + page_size
@@ -1226,17 +1160,35 @@ class FundViewSet(viewsets.ModelViewSet):
             'page_size': page_size
         })
 
+    @action(detail=False, methods=['GET'])
+    def categories(self, request):
+        """Scheme types and SEBI categories of the visible funds, with their fund counts"""
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        def build():
+            categories = (FundModel.objects.filter(hideStatus=0, fundCategory__isnull=False)
+                          .values('fundSchemeType', 'fundCategory')
+                          .annotate(fundCount=Count('id'))
+                          .order_by('fundSchemeType', 'fundCategory'))
+            return {'code': 1, 'data': list(categories), 'message': "Retrieved Successfully"}
+
+        return conditional_response(request, build, (FundModel,))
+
     @action(detail=True, methods=['GET'])
     def listing(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
-            if pk == "0":
-                serializer = FundModelSerializers(FundModel.objects.filter(hideStatus=0).order_by('-id'),
-                                                  many=True)
-            else:
-                serializer = FundModelSerializers(FundModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                                                  many=True)
-            response = {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+            def build():
+                funds = FundModel.objects.filter(hideStatus=0).select_related('fundAmcName')
+                if pk != "0":
+                    funds = funds.filter(id=pk)
+                serializer = FundModelSerializers(funds.order_by('-id'), many=True)
+                return {'code': 1, 'data': serializer.data, 'message': "All  Retried"}
+
+            # 304 while neither the funds nor the AMCs have changed since the client's copy
+            return self.catalog_response(request, build)
         else:
             response = {'code': 0, 'data': [], 'message': "Token is invalid"}
         return Response(response)
@@ -1322,10 +1274,11 @@ class FundViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class AumEntryViewSet(viewsets.ModelViewSet):
+class AumEntryViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = AumEntryModel.objects.filter(hideStatus=0)
     serializer_class = AumEntryModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('aumArnNumber__arnNumber', 'aumAmcName__amcName', 'aumInvoiceNumber', 'aumAmount', 'aumMonth')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -1336,8 +1289,6 @@ class AumEntryViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
@@ -1345,51 +1296,18 @@ class AumEntryViewSet(viewsets.ModelViewSet):
             'aumAmcName',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(aumArnNumber__arnNumber__icontains=search) |
-                Q(aumAmcName__amcName__icontains=search) |
-                Q(aumInvoiceNumber__icontains=search) |
-                Q(aumAmount__icontains=search) |
-                Q(aumMonth__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
+        queryset = self.search(queryset, search)
 
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(aumArnNumber__arnNumber__icontains=search) |
-                Q(aumAmcName__amcName__icontains=search) |
-                Q(aumInvoiceNumber__icontains=search) |
-                Q(aumAmount__icontains=search) |
-                Q(aumMonth__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -1494,10 +1412,16 @@ class AumEntryViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class CommissionEntryViewSet(viewsets.ModelViewSet):
+class CommissionEntryViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = CommissionEntryModel.objects.filter(hideStatus=0)
     serializer_class = CommissionEntryModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = (
+        'commissionArnNumber__arnNumber',
+        'commissionAmcName__amcName',
+        'commissionAmount',
+        'commissionMonth',
+    )
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -1508,8 +1432,6 @@ class CommissionEntryViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
@@ -1517,49 +1439,18 @@ class CommissionEntryViewSet(viewsets.ModelViewSet):
             'commissionAmcName',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(commissionArnNumber__arnNumber__icontains=search) |
-                Q(commissionAmcName__amcName__icontains=search) |
-                Q(commissionAmount__icontains=search) |
-                Q(commissionMonth__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
+        queryset = self.search(queryset, search)
 
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(commissionArnNumber__arnNumber__icontains=search) |
-                Q(commissionAmcName__amcName__icontains=search) |
-                Q(commissionAmount__icontains=search) |
-                Q(commissionMonth__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -1665,10 +1556,12 @@ class CommissionEntryViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class AumYoyGrowthEntryViewSet(viewsets.ModelViewSet):
+class AumYoyGrowthEntryViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = AumYoyGrowthEntryModel.objects.filter(hideStatus=0)
     serializer_class = AumYoyGrowthEntryModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('aumYoyGrowthAmcName__amcName', 'aumYoyGrowthAmount', 'aumYoyGrowthDate')
+    ordering_fields = ('id', 'createdAt', 'aumYoyGrowthDate')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -1679,55 +1572,24 @@ class AumYoyGrowthEntryViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
             'aumYoyGrowthAmcName',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(aumYoyGrowthAmcName__amcName__icontains=search) |
-                Q(aumYoyGrowthAmount__icontains=search) |
-                Q(aumYoyGrowthDate__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
+        queryset = self.search(queryset, search)
 
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(aumYoyGrowthAmcName__amcName__icontains=search) |
-                Q(aumYoyGrowthAmount__icontains=search) |
-                Q(aumYoyGrowthDate__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -1825,10 +1687,12 @@ class AumYoyGrowthEntryViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class IndustryAumEntryViewSet(viewsets.ModelViewSet):
+class IndustryAumEntryViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = IndustryAumEntryModel.objects.filter(hideStatus=0)
     serializer_class = IndustryAumEntryModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('industryName', 'industryAumDate', 'industryAumAmount', 'industryAumMode__modeName')
+    ordering_fields = ('id', 'createdAt', 'industryAumDate')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -1839,57 +1703,24 @@ class IndustryAumEntryViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
             'industryAumMode',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(industryAumMode__modeName__icontains=search) |
-                Q(industryName__icontains=search) |
-                Q(industryAumDate__icontains=search) |
-                Q(industryAumMode__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
+        queryset = self.search(queryset, search)
 
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(industryName__icontains=search) |
-                Q(industryAumDate__icontains=search) |
-                Q(industryAumAmount__icontains=search) |
-                Q(industryAumMode__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -1987,10 +1818,21 @@ class IndustryAumEntryViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class GstEntryViewSet(viewsets.ModelViewSet):
+class GstEntryViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = GstEntryModel.objects.filter(hideStatus=0)
     serializer_class = GstEntryModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = (
+        'gstAmcName__amcName',
+        'gstInvoiceDate',
+        'gstInvoiceNumber',
+        'gstTotalValue',
+        'gstTaxableValue',
+        'gstIGst',
+        'gstSGst',
+        'gstCGst',
+    )
+    ordering_fields = ('id', 'createdAt', 'gstInvoiceDate')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -2001,65 +1843,24 @@ class GstEntryViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
             'gstAmcName',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(gstAmcName__amcName__icontains=search) |
-                Q(gstInvoiceDate__icontains=search) |
-                Q(gstInvoiceNumber__icontains=search) |
-                Q(gstTotalValue__icontains=search) |
-                Q(gstTaxableValue__icontains=search) |
-                Q(gstIGst__icontains=search) |
-                Q(gstSGst__icontains=search) |
-                Q(gstCGst__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(gstAmcName__amcName__icontains=search) |
-                Q(gstInvoiceDate__icontains=search) |
-                Q(gstInvoiceNumber__icontains=search) |
-                Q(gstTotalValue__icontains=search) |
-                Q(gstTaxableValue__icontains=search) |
-                Q(gstIGst__icontains=search) |
-                Q(gstSGst__icontains=search) |
-                Q(gstCGst__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -2157,10 +1958,18 @@ class GstEntryViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = IssueModel.objects.filter(hideStatus=0)
     serializer_class = IssueModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = (
+        'issueType__issueTypeName',
+        'issueClientName__clientName',
+        'issueDate',
+        'issueResolutionDate',
+        'issueDescription',
+    )
+    ordering_fields = ('id', 'createdAt', 'issueDate')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -2180,8 +1989,6 @@ class IssueViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
@@ -2189,51 +1996,18 @@ class IssueViewSet(viewsets.ModelViewSet):
             'issueClientName',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(issueType__issueTypeName__icontains=search) |
-                Q(issueClientName__clientName__icontains=search) |
-                Q(issueDate__icontains=search) |
-                Q(issueResolutionDate__icontains=search) |
-                Q(issueDescription__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
+        queryset = self.search(queryset, search)
 
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(issueType__issueTypeName__icontains=search) |
-                Q(issueClientName__clientName__icontains=search) |
-                Q(issueDate__icontains=search) |
-                Q(issueResolutionDate__icontains=search) |
-                Q(issueDescription__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -2378,10 +2152,18 @@ class IssueViewSet(viewsets.ModelViewSet):
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
 
-class StatementViewSet(viewsets.ModelViewSet):
+class StatementViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = StatementModel.objects.filter(hideStatus=0)
     serializer_class = StatementModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = (
+        'statementAmcName__amcName',
+        'statementDate',
+        'statementInvestorName',
+        'statementInvestorPanNo',
+        'statementFundName',
+    )
+    ordering_fields = ('id', 'createdAt', 'statementDate')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -2392,59 +2174,24 @@ class StatementViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
             'statementAmcName',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(statementAmcName__amcName__icontains=search) |
-                Q(statementDate__icontains=search) |
-                Q(statementInvestorName__icontains=search) |
-                Q(statementInvestorPanNo__icontains=search) |
-                Q(statementFundName__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
+        queryset = self.search(queryset, search)
 
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(statementAmcName__amcName__icontains=search) |
-                Q(statementDate__icontains=search) |
-                Q(statementInvestorName__icontains=search) |
-                Q(statementInvestorPanNo__icontains=search) |
-                Q(statementFundName__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -2535,10 +2282,11 @@ class StatementViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class CourierViewSet(viewsets.ModelViewSet):
+class CourierViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = CourierModel.objects.filter(hideStatus=0)
     serializer_class = CourierModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('courierClientName__clientName', 'courierClientAddress', 'courierMobileNumber', 'courierEmail')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -2549,57 +2297,24 @@ class CourierViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
             'courierClientName',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(courierClientName__clientName__icontains=search) |
-                Q(courierClientAddress__icontains=search) |
-                Q(courierMobileNumber__icontains=search) |
-                Q(courierEmail__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
+        queryset = self.search(queryset, search)
 
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(courierClientName__clientName__icontains=search) |
-                Q(courierClientAddress__icontains=search) |
-                Q(courierMobileNumber__icontains=search) |
-                Q(courierEmail__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -2735,10 +2450,11 @@ class CourierFileViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class FormsViewSet(viewsets.ModelViewSet):
+class FormsViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = FormsModel.objects.filter(hideStatus=0)
     serializer_class = FormsModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('formsAmcName__amcName', 'formsType__formTypeName', 'formsDescription')
 
     def get_previous_data(self, instance):
         serializer = self.get_serializer(instance, context={'request': self.request})
@@ -2750,8 +2466,6 @@ class FormsViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
@@ -2759,47 +2473,18 @@ class FormsViewSet(viewsets.ModelViewSet):
             'formsType',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(formsAmcName__amcName__icontains=search) |
-                Q(formsType__formTypeName__icontains=search) |
-                Q(formsDescription__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
+        queryset = self.search(queryset, search)
 
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(formsAmcName__amcName__icontains=search) |
-                Q(formsType__formTypeName__icontains=search) |
-                Q(formsDescription__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -2896,10 +2581,11 @@ class FormsViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class MarketingViewSet(viewsets.ModelViewSet):
+class MarketingViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = MarketingModel.objects.filter(hideStatus=0)
     serializer_class = MarketingModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('marketingAmcName__amcName', 'marketingType__fileTypeName', 'marketingDescription')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -2922,8 +2608,6 @@ class MarketingViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
@@ -2931,48 +2615,18 @@ class MarketingViewSet(viewsets.ModelViewSet):
             'marketingType',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(marketingAmcName__amcName__icontains=search) |
-                Q(marketingType__fileTypeName__icontains=search) |
-                Q(marketingDescription__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True, context={'request': request})
-        data = serializer.data
-
-        response_data = {
-            'code': 1,
-            'data': data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
+        queryset = self.search(queryset, search)
 
-        return Response(response_data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(marketingAmcName__amcName__icontains=search) |
-                Q(marketingType__fileTypeName__icontains=search) |
-                Q(marketingDescription__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -3153,10 +2807,12 @@ class MarketingViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = TaskModel.objects.filter(hideStatus=0)
     serializer_class = TaskModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('taskClient__clientName', 'taskTitle', 'taskDate')
+    ordering_fields = ('id', 'createdAt', 'taskDate')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -3167,55 +2823,24 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
             'taskClient',
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(taskClient__clientName__icontains=search) |
-                Q(taskTitle__icontains=search) |
-                Q(taskDate__icontains=search)
-            )
-
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
+        queryset = self.search(queryset, search)
 
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(taskClient__clientName__icontains=search) |
-                Q(taskTitle__icontains=search) |
-                Q(taskDate__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -3454,10 +3079,11 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         return Response(response)
 
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = ClientModel.objects.filter(hideStatus=0)
     serializer_class = ClientModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('clientName', 'clientEmail', 'clientPhone')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -3468,53 +3094,22 @@ class ClientViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(clientName__icontains=search) |
-                Q(clientEmail__icontains=search) |
-                Q(clientPhone__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(clientName__icontains=search) |
-                Q(clientEmail__icontains=search) |
-                Q(clientPhone__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -3532,85 +3127,14 @@ class ClientViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['GET'])
     def countries(self, request):
-        countries = CountryModel.objects.filter(hideStatus=0).values('id', 'countryCode', 'countryName', 'dailCode')
-        country_data = [
-            {
-                "id": country['id'],
-                "code": country['countryCode'],
-                "name": country['countryName'],
-                "dial_code": country['dailCode']
-            }
-            for country in countries
-        ]
-        return Response(country_data)
+        return conditional_response(request, country_choices, (CountryModel,), cached=True)
 
     @action(detail=True, methods=['GET'])
     def listing_client(self, request, pk=None):
         user = request.user
         if user.is_authenticated:
             try:
-                client = ClientModelSerializers(ClientModel.objects.filter(hideStatus=0, id=pk).order_by('-id'),
-                                                many=True)
-                client_family = ClientFamilyDetailModelSerializers(
-                    ClientFamilyDetailModel.objects.filter(hideStatus=0, clientFamilyDetailId=pk).order_by('-id'),
-                    many=True)
-                client_children = ClientChildrenDetailModelSerializers(
-                    ClientChildrenDetailModel.objects.filter(hideStatus=0, clientChildrenId=pk).order_by('-id'),
-                    many=True)
-                client_present_address = ClientPresentAddressModelSerializers(
-                    ClientPresentAddressModel.objects.filter(hideStatus=0, clientPresentAddressId=pk).order_by('-id'),
-                    many=True)
-                client_permanent_address = ClientPermanentAddressModelSerializers(
-                    ClientPermanentAddressModel.objects.filter(hideStatus=0, clientPermanentAddressId=pk).order_by(
-                        '-id'), many=True)
-                client_office_address = ClientOfficeAddressModelSerializers(
-                    ClientOfficeAddressModel.objects.filter(hideStatus=0, clientOfficeAddressId=pk).order_by('-id'),
-                    many=True)
-                client_overseas_address = ClientOverseasAddressModelSerializers(
-                    ClientOverseasAddressModel.objects.filter(hideStatus=0, clientOverseasAddressId=pk).order_by('-id'),
-                    many=True)
-                client_nominee = ClientNomineeModelSerializers(
-                    ClientNomineeModel.objects.filter(hideStatus=0, clientNomineeId=pk).order_by('-id'), many=True)
-                client_insurance = ClientInsuranceModelSerializers(
-                    ClientInsuranceModel.objects.filter(hideStatus=0, clientInsuranceId=pk).order_by('-id'), many=True)
-                client_medical_insurance = ClientMedicalInsuranceModelSerializers(
-                    ClientMedicalInsuranceModel.objects.filter(hideStatus=0, clientMedicalInsuranceId=pk).order_by(
-                        '-id'), many=True)
-                client_term_insurance = ClientTermInsuranceModelSerializers(
-                    ClientTermInsuranceModel.objects.filter(hideStatus=0, clientTermInsuranceId=pk).order_by('-id'),
-                    many=True)
-                client_upload_files = ClientUploadFileModelSerializers(
-                    ClientUploadFileModel.objects.filter(hideStatus=0, clientUploadFileId=pk).order_by('-id'),
-                    many=True)
-                client_bank = ClientBankModelSerializers(
-                    ClientBankModel.objects.filter(hideStatus=0, clientBankId=pk).order_by('-id'), many=True)
-                client_tax = ClientTaxModelSerializers(
-                    ClientTaxModel.objects.filter(hideStatus=0, clientTaxId=pk).order_by('-id'), many=True)
-                client_attorney = ClientPowerOfAttorneyModelSerializers(
-                    ClientPowerOfAttorneyModel.objects.filter(hideStatus=0, clientPowerOfAttorneyId=pk).order_by('-id'),
-                    many=True)
-                client_guardian = ClientGuardianModelSerializers(
-                    ClientGuardianModel.objects.filter(hideStatus=0, clientGuardianId=pk).order_by('-id'),
-                    many=True)
-
-                combined_serializer = {
-                    "client": client.data,
-                    "family": client_family.data,
-                    "children": client_children.data,
-                    "present_address": client_present_address.data,
-                    "permanent_address": client_permanent_address.data,
-                    "office_address": client_office_address.data,
-                    "overseas_address": client_overseas_address.data,
-                    "nominee": client_nominee.data,
-                    "insurance": client_insurance.data,
-                    "medical_insurance": client_medical_insurance.data,
-                    "term_insurance": client_term_insurance.data,
-                    "upload_files": client_upload_files.data,
-                    "bank": client_bank.data,
-                    "tax": client_tax.data,
-                    "attorney": client_attorney.data,
-                    "guardian": client_guardian.data,
-                }
+                combined_serializer = serialize_client_profile(load_client_aggregate(pk))
                 return JsonResponse({'code': 1, 'data': combined_serializer, 'message': "All Retrieved"},
                                     encoder=CustomJSONEncoder)
             except Exception as e:
@@ -3635,46 +3159,29 @@ class ClientViewSet(viewsets.ModelViewSet):
 
         try:
             with transaction.atomic():
-                # Store previous data if updating
+                # Load the stored graph once; it is diffed against the payload and snapshotted in memory
                 previous_data = None
+                aggregate = None
                 if pk != "0":
-                    try:
-                        client_instance = ClientModel.objects.get(id=pk)
-                        previous_data = self._gather_previous_data(client_instance)
-                    except ClientModel.DoesNotExist:
+                    aggregate = load_client_aggregate(pk, include_hidden=True)
+                    if aggregate is None:
                         return Response({'code': 0, 'message': "Client not found"},
                                         status=status.HTTP_404_NOT_FOUND)
+                    previous_data = client_snapshot(aggregate)
 
-                # Process main client data
-                client_data = request.data.get('clientJson', {})
-                if pk == "0":
-                    client_serializer = ClientModelSerializers(data=client_data)
-                    action = 'CREATE'
-                else:
-                    client_serializer = ClientModelSerializers(instance=client_instance, data=client_data)
-                    action = 'UPDATE'
+                writer = ClientGraphWriter(aggregate)
+                client_serializer = writer.prepare(request.data)
+                action = 'CREATE' if pk == "0" else 'UPDATE'
 
-                if client_serializer.is_valid():
-                    client_instance = client_serializer.save()
-                else:
+                if not client_serializer.is_valid():
                     logger.error(f"Client serializer errors: {client_serializer.errors}")
                     return Response({'code': 0, 'message': "Invalid client data",
                                      'errors': client_serializer.errors})
 
-                # Process all related data
-                self._process_family_details(request, client_instance)
-                self._process_children_details(request, client_instance)
-                self._process_addresses(request, client_instance)
-                self._process_nominees(request, client_instance)
-                self._process_insurance_policies(request, client_instance)
-                self._process_file_uploads(request, client_instance)
-                self._process_bank_details(request, client_instance)
-                self._process_tax_details(request, client_instance)
-                self._process_guardian_details(request, client_instance)
-                self._process_attorney_details(request, client_instance)
-
-                # Gather new data after all processing
-                new_data = self._gather_previous_data(client_instance)
+                # Save the client and all related data
+                aggregate = writer.save()
+                client_instance = aggregate.client
+                new_data = client_snapshot(aggregate)
 
                 # Log the activity
                 ActivityLogger.log_activity(
@@ -3694,185 +3201,6 @@ class ClientViewSet(viewsets.ModelViewSet):
             return Response({'code': 0, 'message': f"An error occurred: {str(e)}"},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _process_family_details(self, request, client_instance):
-        """Process family details with error handling"""
-        family_data = request.data.get('familyJson', {})
-        family_instance, created = ClientFamilyDetailModel.objects.get_or_create(
-            clientFamilyDetailId=client_instance)
-        family_serializer = ClientFamilyDetailModelSerializers(
-            instance=family_instance,
-            data=family_data
-        )
-        if family_serializer.is_valid():
-            family_serializer.save()
-        else:
-            raise ValidationError(family_serializer.errors)
-
-    def _process_children_details(self, request, client_instance):
-        """Process children details with error handling"""
-        children_data = request.data.get('childrenJson', [])
-        existing_children = ClientChildrenDetailModel.objects.filter(
-            clientChildrenId=client_instance)
-        existing_children_ids = set(existing_children.values_list('id', flat=True))
-        processed_children_ids = set()
-
-        for child_data in children_data:
-            child_id = child_data.get('id')
-            if child_id:
-                child_instance = existing_children.filter(id=child_id).first()
-                if child_instance:
-                    child_serializer = ClientChildrenDetailModelSerializers(
-                        instance=child_instance,
-                        data=child_data
-                    )
-                    processed_children_ids.add(child_id)
-                else:
-                    child_serializer = ClientChildrenDetailModelSerializers(data=child_data)
-            else:
-                child_serializer = ClientChildrenDetailModelSerializers(data=child_data)
-
-            if child_serializer.is_valid():
-                child_serializer.save(clientChildrenId=client_instance)
-            else:
-                raise ValidationError(child_serializer.errors)
-
-        # Delete children that were not in the submitted data
-        children_to_delete = existing_children_ids - processed_children_ids
-        ClientChildrenDetailModel.objects.filter(id__in=children_to_delete).delete()
-
-    def _process_addresses(self, request, client_instance):
-        """Process all address types with error handling"""
-        addresses_types = [
-            ('presentAddressJson', ClientPresentAddressModelSerializers, 'clientPresentAddressId'),
-            ('permanentAddressJson', ClientPermanentAddressModelSerializers, 'clientPermanentAddressId'),
-            ('officeAddressJson', ClientOfficeAddressModelSerializers, 'clientOfficeAddressId'),
-            ('overseasAddressJson', ClientOverseasAddressModelSerializers, 'clientOverseasAddressId'),
-        ]
-
-        for address_key, serializer_class, client_field in addresses_types:
-            address_data = request.data.get(address_key, {})
-            if address_data:
-                address_instance, created = serializer_class.Meta.model.objects.get_or_create(
-                    **{client_field: client_instance})
-                address_serializer = serializer_class(
-                    instance=address_instance,
-                    data=address_data
-                )
-                if address_serializer.is_valid():
-                    address_serializer.save(**{client_field: client_instance})
-                else:
-                    raise ValidationError(address_serializer.errors)
-
-    def _process_nominees(self, request, client_instance):
-        """Process nominee details with error handling"""
-        nominee_data = request.data.get('nomineeJson', [])
-        ClientNomineeModel.objects.filter(clientNomineeId=client_instance).delete()
-
-        for nominee in nominee_data:
-            nominee_serializer = ClientNomineeModelSerializers(data=nominee)
-            if nominee_serializer.is_valid():
-                nominee_serializer.save(clientNomineeId=client_instance)
-            else:
-                raise ValidationError(nominee_serializer.errors)
-
-    def _process_insurance_policies(self, request, client_instance):
-        """Process all insurance types with error handling"""
-        insurance_types = [
-            ('insuranceJson', ClientInsuranceModelSerializers, 'clientInsuranceId'),
-            ('medicalInsuranceJson', ClientMedicalInsuranceModelSerializers, 'clientMedicalInsuranceId'),
-            ('termInsuranceJson', ClientTermInsuranceModelSerializers, 'clientTermInsuranceId'),
-        ]
-
-        for insurance_key, serializer_class, client_field in insurance_types:
-            insurance_data = request.data.get(insurance_key, [])
-            serializer_class.Meta.model.objects.filter(**{client_field: client_instance}).delete()
-
-            for policy in insurance_data:
-                policy[client_field] = client_instance.id
-                policy_serializer = serializer_class(data=policy)
-                if policy_serializer.is_valid():
-                    policy_serializer.save()
-                else:
-                    raise ValidationError(policy_serializer.errors)
-
-    def _process_file_uploads(self, request, client_instance):
-        """Process file uploads with error handling"""
-        upload_files_data = request.data.get('uploadFilesJson', {})
-        file_instance, created = ClientUploadFileModel.objects.get_or_create(
-            clientUploadFileId=client_instance)
-
-        if upload_files_data:
-            for field_name, file_data in upload_files_data.items():
-                if file_data:
-                    if isinstance(file_data, str) and file_data.startswith('data:'):
-                        format, imgstr = file_data.split(';base64,')
-                        ext = format.split('/')[-1]
-                        data = ContentFile(base64.b64decode(imgstr),
-                                           name=f'{field_name}.{ext}')
-                    elif isinstance(file_data, dict) and 'name' in file_data and 'content' in file_data:
-                        ext = file_data['name'].split('.')[-1]
-                        data = ContentFile(base64.b64decode(file_data['content']),
-                                           name=file_data['name'])
-                    else:
-                        logger.warning(f"Unexpected file data format for {field_name}")
-                        continue
-                    setattr(file_instance, field_name, data)
-            file_instance.save()
-
-    def _process_bank_details(self, request, client_instance):
-        """Process bank details with error handling"""
-        bank_data = request.data.get('bankJson', [])
-        ClientBankModel.objects.filter(clientBankId=client_instance).delete()
-
-        for bank in bank_data:
-            bank_serializer = ClientBankModelSerializers(data=bank)
-            if bank_serializer.is_valid():
-                bank_serializer.save(clientBankId=client_instance)
-            else:
-                raise ValidationError(bank_serializer.errors)
-
-    def _process_tax_details(self, request, client_instance):
-        """Process tax details with error handling"""
-        tax_data = request.data.get('taxJson', {})
-        tax_instance, created = ClientTaxModel.objects.get_or_create(
-            clientTaxId=client_instance)
-        tax_serializer = ClientTaxModelSerializers(
-            instance=tax_instance,
-            data=tax_data
-        )
-        if tax_serializer.is_valid():
-            tax_serializer.save(clientTaxId=client_instance)
-        else:
-            raise ValidationError(tax_serializer.errors)
-
-    def _process_guardian_details(self, request, client_instance):
-        """Process guardian details with error handling"""
-        guardian_data = request.data.get('guardianJSON', {})
-        guardian_instance, created = ClientGuardianModel.objects.get_or_create(
-            clientGuardianId=client_instance)
-        guardian_serializer = ClientGuardianModelSerializers(
-            instance=guardian_instance,
-            data=guardian_data
-        )
-        if guardian_serializer.is_valid():
-            guardian_serializer.save(clientGuardianId=client_instance)
-        else:
-            raise ValidationError(guardian_serializer.errors)
-
-    def _process_attorney_details(self, request, client_instance):
-        """Process attorney details with error handling"""
-        attorney_data = request.data.get('attorneyJson', {})
-        attorney_instance, created = ClientPowerOfAttorneyModel.objects.get_or_create(
-            clientPowerOfAttorneyId=client_instance)
-        attorney_serializer = ClientPowerOfAttorneyModelSerializers(
-            instance=attorney_instance,
-            data=attorney_data
-        )
-        if attorney_serializer.is_valid():
-            attorney_serializer.save(clientPowerOfAttorneyId=client_instance)
-        else:
-            raise ValidationError(attorney_serializer.errors)
-
     @action(detail=True, methods=['GET'])
     def deletion(self, request, pk=None):
         """
@@ -3923,125 +3251,23 @@ class ClientViewSet(viewsets.ModelViewSet):
         """
         Gather all related data for the client
         """
-
-        def get_single_instance_data(model, filter_kwargs, serializer_class):
-            instance = model.objects.filter(**filter_kwargs).first()
-            return serializer_class(instance).data if instance else None
-
-        def get_multiple_instances_data(model, filter_kwargs, serializer_class):
-            instances = model.objects.filter(**filter_kwargs)
-            return serializer_class(instances, many=True).data if instances.exists() else []
-
-        return {
-            'client': ClientModelSerializers(client).data,
-            'family': get_single_instance_data(
-                ClientFamilyDetailModel,
-                {'clientFamilyDetailId': client},
-                ClientFamilyDetailModelSerializers
-            ),
-            'children': get_multiple_instances_data(
-                ClientChildrenDetailModel,
-                {'clientChildrenId': client},
-                ClientChildrenDetailModelSerializers
-            ),
-            'present_address': get_single_instance_data(
-                ClientPresentAddressModel,
-                {'clientPresentAddressId': client},
-                ClientPresentAddressModelSerializers
-            ),
-            'permanent_address': get_single_instance_data(
-                ClientPermanentAddressModel,
-                {'clientPermanentAddressId': client},
-                ClientPermanentAddressModelSerializers
-            ),
-            'office_address': get_single_instance_data(
-                ClientOfficeAddressModel,
-                {'clientOfficeAddressId': client},
-                ClientOfficeAddressModelSerializers
-            ),
-            'overseas_address': get_single_instance_data(
-                ClientOverseasAddressModel,
-                {'clientOverseasAddressId': client},
-                ClientOverseasAddressModelSerializers
-            ),
-            'nominee': get_multiple_instances_data(
-                ClientNomineeModel,
-                {'clientNomineeId': client},
-                ClientNomineeModelSerializers
-            ),
-            'insurance': get_multiple_instances_data(
-                ClientInsuranceModel,
-                {'clientInsuranceId': client},
-                ClientInsuranceModelSerializers
-            ),
-            'medical_insurance': get_multiple_instances_data(
-                ClientMedicalInsuranceModel,
-                {'clientMedicalInsuranceId': client},
-                ClientMedicalInsuranceModelSerializers
-            ),
-            'term_insurance': get_multiple_instances_data(
-                ClientTermInsuranceModel,
-                {'clientTermInsuranceId': client},
-                ClientTermInsuranceModelSerializers
-            ),
-            'bank': get_multiple_instances_data(
-                ClientBankModel,
-                {'clientBankId': client},
-                ClientBankModelSerializers
-            ),
-            'tax': get_single_instance_data(
-                ClientTaxModel,
-                {'clientTaxId': client},
-                ClientTaxModelSerializers
-            ),
-            'attorney': get_single_instance_data(
-                ClientPowerOfAttorneyModel,
-                {'clientPowerOfAttorneyId': client},
-                ClientPowerOfAttorneyModelSerializers
-            ),
-            'guardian': get_single_instance_data(
-                ClientGuardianModel,
-                {'clientGuardianId': client},
-                ClientGuardianModelSerializers
-            )
-        }
+        return client_snapshot(load_client_aggregate(client.id, include_hidden=True))
 
     def _perform_soft_deletion(self, client):
         """
         Perform soft deletion by setting hideStatus to '1' for client and all related records
         """
-        # Update hideStatus for the main client
-        client.hideStatus = '1'
-        client.save()
-
-        # List of models and their foreign key fields to update
-        related_models = [
-            (ClientFamilyDetailModel, 'clientFamilyDetailId'),
-            (ClientChildrenDetailModel, 'clientChildrenId'),
-            (ClientPresentAddressModel, 'clientPresentAddressId'),
-            (ClientPermanentAddressModel, 'clientPermanentAddressId'),
-            (ClientOfficeAddressModel, 'clientOfficeAddressId'),
-            (ClientOverseasAddressModel, 'clientOverseasAddressId'),
-            (ClientNomineeModel, 'clientNomineeId'),
-            (ClientInsuranceModel, 'clientInsuranceId'),
-            (ClientMedicalInsuranceModel, 'clientMedicalInsuranceId'),
-            (ClientTermInsuranceModel, 'clientTermInsuranceId'),
-            (ClientUploadFileModel, 'clientUploadFileId'),
-            (ClientBankModel, 'clientBankId'),
-            (ClientTaxModel, 'clientTaxId'),
-            (ClientPowerOfAttorneyModel, 'clientPowerOfAttorneyId'),
-            (ClientGuardianModel, 'clientGuardianId')
-        ]
+        soft_delete_client(client)
 
-        # Update hideStatus for all related models
-        for model, fk_field in related_models:
-            model.objects.filter(**{fk_field: client}).update(hideStatus='1')
 
-
-class NavViewSet(viewsets.ModelViewSet):
+class NavViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = NavModel.objects.filter(hideStatus=0).order_by('-id')
     serializer_class = NavModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = ('navFundName__fundAmcName__amcName', 'navFundName__fundName', 'nav')
+    ordering_fields = ('id', 'navDate')
+    listing_page_size = 100
+    listing_count = COUNT_NONE
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -4052,54 +3278,22 @@ class NavViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 100))
         search = request.query_params.get('search', '')
-        cursor = request.query_params.get('cursor')
 
         queryset = self.get_queryset().select_related('navFundName', 'navFundName__fundAmcName')
 
-        if search:
-            queryset = queryset.filter(
-                Q(navFundName__fundAmcName__amcName__icontains=search) |
-                Q(navFundName__fundName__icontains=search) |
-                Q(nav__icontains=search)
-            )
-
-        if cursor:
-            queryset = queryset.filter(id__lte=int(cursor))
-
-        queryset = queryset.order_by('-id')[:page_size + 1]
-
-        results = list(queryset)
-        next_cursor = None
-        if len(results) > page_size:
-            next_cursor = results[-1].id
-            results = results[:-1]
+        queryset = self.search(queryset, search)
 
-        serializer = self.get_serializer(results, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'next_cursor': str(next_cursor) if next_cursor else None
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(navFundName__fundAmcName__amcName__icontains=search) |
-                Q(navFundName__fundName__icontains=search) |
-                Q(nav__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -4156,10 +3350,12 @@ class NavViewSet(viewsets.ModelViewSet):
                 # Update existing NAV entry
                 nav_entry = NavModel.objects.get(id=pk)
                 previous_data = self.get_previous_data(nav_entry)  # Capture previous data
+                previous_fund_id = nav_entry.navFundName_id
                 nav_entry.navFundName = fund
                 nav_entry.nav = nav
                 nav_entry.navDate = nav_date
                 nav_entry.save()
+                refresh_latest_navs([previous_fund_id])
                 # Log the update activity
                 ActivityLogger.log_activity(
                     request=request,
@@ -4170,6 +3366,7 @@ class NavViewSet(viewsets.ModelViewSet):
                     previous_data=previous_data
                 )
 
+            refresh_latest_navs([fund.id])
             serializer = self.get_serializer(nav_entry)
             return Response({'code': 1, 'data': serializer.data, 'message': "Done Successfully"})
 
@@ -4199,6 +3396,7 @@ class NavViewSet(viewsets.ModelViewSet):
                 # Soft delete the instance
                 nav_entry.hideStatus = 1
                 nav_entry.save()
+                refresh_latest_navs([nav_entry.navFundName_id])
 
                 response = {'code': 1, 'message': "Done Successfully"}
             except NavModel.DoesNotExist:
@@ -4246,20 +3444,21 @@ class NavViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['GET'])
     def get_nav_update_data(self, request, pk=None):
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM get_nav_update_data(%s)", [pk])
-                result = cursor.fetchone()
+            nav_entry = NavModel.objects.select_related('navFundName', 'navFundName__fundAmcName').filter(
+                id=pk).first()
 
-            if result:
+            if nav_entry:
+                fund = nav_entry.navFundName
+                amc = fund.fundAmcName if fund else None
                 data = {
-                    'navId': result[0],
-                    'nav': float(result[1]),
-                    'navDate': result[2].isoformat(),
-                    'fundId': result[3],
-                    'fundName': result[4],
-                    'schemeCode': result[5],
-                    'amcId': result[6],
-                    'amcName': result[7]
+                    'navId': nav_entry.id,
+                    'nav': float(nav_entry.nav) if nav_entry.nav is not None else None,
+                    'navDate': nav_entry.navDate.isoformat() if nav_entry.navDate else None,
+                    'fundId': fund.id if fund else None,
+                    'fundName': fund.fundName if fund else None,
+                    'schemeCode': fund.schemeCode if fund else None,
+                    'amcId': amc.id if amc else None,
+                    'amcName': amc.amcName if amc else None
                 }
                 return Response({'code': 1, 'data': data, 'message': 'NAV update data retrieved successfully'})
             else:
@@ -4268,6 +3467,142 @@ class NavViewSet(viewsets.ModelViewSet):
             return Response({'code': 0, 'message': f'Error retrieving NAV update data: {str(e)}'},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['GET'])
+    def history(self, request):
+        """NAV history of one fund as two parallel arrays, served by the (fund, date) unique index"""
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        fund_id = request.query_params.get('fund')
+        if not fund_id:
+            return Response({'code': 0, 'message': "fund is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            fund_id = int(fund_id)
+            date_from = request.query_params.get('from')
+            date_to = request.query_params.get('to')
+            date_from = date.fromisoformat(date_from) if date_from else None
+            date_to = date.fromisoformat(date_to) if date_to else None
+        except ValueError:
+            return Response({'code': 0, 'message': "Use a numeric fund id and YYYY-MM-DD dates"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = NavModel.objects.filter(navFundName_id=fund_id, hideStatus=0, nav__isnull=False,
+                                           navDate__isnull=False)
+        if date_from:
+            queryset = queryset.filter(navDate__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(navDate__lte=date_to)
+
+        dates = []
+        values = []
+        for nav_date, nav in queryset.order_by('navDate').values_list('navDate', 'nav'):
+            dates.append(nav_date.isoformat())
+            values.append(float(nav))
+
+        return Response({
+            'code': 1,
+            'data': {'fund': fund_id, 'dates': dates, 'values': values},
+            'message': "Retrieved Successfully"
+        })
+
+    @action(detail=False, methods=['GET', 'POST'])
+    def latest(self, request):
+        """Current NAV of many funds in one indexed lookup, by fund_ids (comma separated) or amc_id"""
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        params = request.data if request.method == 'POST' else request.query_params
+        fund_ids = params.get('fund_ids')
+        amc_id = params.get('amc_id')
+
+        queryset = LatestNavModel.objects.all()
+        try:
+            if fund_ids:
+                if isinstance(fund_ids, str):
+                    fund_ids = [fund_id for fund_id in fund_ids.split(',') if fund_id.strip()]
+                queryset = queryset.filter(latestNavFund_id__in=[int(fund_id) for fund_id in fund_ids])
+            elif amc_id:
+                queryset = queryset.filter(latestNavFund__fundAmcName_id=int(amc_id))
+            else:
+                return Response({'code': 0, 'message': "Provide either 'fund_ids' or 'amc_id'"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        except (TypeError, ValueError):
+            return Response({'code': 0, 'message': "Fund and AMC ids must be numeric"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        data = [
+            {
+                'fundId': fund_id,
+                'nav': float(nav) if nav is not None else None,
+                'navDate': nav_date.isoformat()
+            }
+            for fund_id, nav, nav_date in queryset.values_list('latestNavFund_id', 'latestNav', 'latestNavDate')
+        ]
+        return Response({'code': 1, 'data': data, 'message': "Retrieved Successfully"})
+
+    @action(detail=False, methods=['GET'])
+    def analytics(self, request):
+        """Return, rolling return, drawdown and volatility metrics for one fund (by id or ISIN) or every fund of an AMC or SEBI category"""
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            fund_id = request.query_params.get('fund')
+            isin = request.query_params.get('isin')
+            amc_id = request.query_params.get('amc_id')
+            category = request.query_params.get('category')
+            date_from = request.query_params.get('from')
+            date_to = request.query_params.get('to')
+            date_from = date.fromisoformat(date_from) if date_from else None
+            date_to = date.fromisoformat(date_to) if date_to else None
+
+            if fund_id:
+                series = analytics.load_nav_series(int(fund_id), date_from, date_to)
+                data = analytics.fund_metrics(series)
+            elif isin:
+                data = analytics.fund_metrics(analytics.load_isin_series(isin, date_from, date_to))
+            elif amc_id:
+                data = analytics.amc_metrics(int(amc_id), date_from, date_to)
+            elif category:
+                data = analytics.category_metrics(category, date_from, date_to)
+            else:
+                return Response({'code': 0, 'message': "Provide one of 'fund', 'isin', 'amc_id' or 'category'"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'code': 0, 'message': "Use numeric ids and YYYY-MM-DD dates"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'code': 1, 'data': data, 'message': "Retrieved Successfully"})
+
+    @action(detail=False, methods=['POST'])
+    def xirr(self, request):
+        """XIRR of a list of cash flows: {"cashflows": [{"date": "YYYY-MM-DD", "amount": -1000}, ...]}"""
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            if not isinstance(request.data, dict):
+                raise TypeError("The body must be a JSON object")
+            cashflows = [
+                (date.fromisoformat(flow['date']), float(flow['amount']))
+                for flow in request.data.get('cashflows', [])
+            ]
+        except (KeyError, TypeError, ValueError):
+            return Response({'code': 0, 'message': "Each cash flow needs a YYYY-MM-DD date and a numeric amount"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        rate = analytics.xirr(cashflows)
+        return Response({
+            'code': 1,
+            'data': {'xirr': rate if rate == rate else None},
+            'message': "Calculated Successfully"
+        })
+
     @action(detail=False, methods=['GET'])
     def funds_by_amc(self, request):
         amc_id = request.query_params.get('amc_id')
@@ -4282,10 +3617,17 @@ class NavViewSet(viewsets.ModelViewSet):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class DailyEntryViewSet(viewsets.ModelViewSet):
+class DailyEntryViewSet(SearchMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = DailyEntryModel.objects.filter(hideStatus=0)
     serializer_class = DailyEntryModelSerializers
     permission_classes = [IsAuthenticated]
+    search_fields = (
+        'dailyEntryClientName__clientName',
+        'dailyEntryFundName__fundName',
+        'dailyEntryIssueType__issueTypeName',
+        'applicationDate',
+    )
+    ordering_fields = ('id', 'createdAt', 'applicationDate')
 
     def get_previous_data(self, instance):
         return self.get_serializer(instance).data
@@ -4352,8 +3694,6 @@ class DailyEntryViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        page_size = int(request.query_params.get('page_size', 10))
-        page = int(request.query_params.get('page', 1))
         search = request.query_params.get('search', '')
 
         queryset = self.get_queryset().select_related(
@@ -4364,49 +3704,18 @@ class DailyEntryViewSet(viewsets.ModelViewSet):
             'dailyEntryIssueType'
         )
 
-        if search:
-            queryset = queryset.filter(
-                Q(dailyEntryClientName__clientName__icontains=search) |
-                Q(dailyEntryFundName__fundName__icontains=search) |
-                Q(dailyEntryIssueType__issueTypeName__icontains=search) |
-                Q(applicationDate__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
-        total_pages = (total_count + page_size - 1) // page_size
-
-        start = (page - 1) * page_size
-        end = start + page_size
-
-        queryset = queryset.order_by('-id')[start:end]
-
-        serializer = self.get_serializer(queryset, many=True)
-
-        data = {
-            'code': 1,
-            'data': serializer.data,
-            'message': "Retrieved Successfully",
-            'total_count': total_count,
-            'total_pages': total_pages,
-            'current_page': page
-        }
-
-        return Response(data)
+        return self.listing_response(request, queryset)
 
     @action(detail=False, methods=['GET'])
     def total_count(self, request):
         search = request.query_params.get('search', '')
         queryset = self.get_queryset()
 
-        if search:
-            queryset = queryset.filter(
-                Q(dailyEntryClientName__clientName__icontains=search) |
-                Q(dailyEntryFundName__fundName__icontains=search) |
-                Q(dailyEntryIssueType__issueTypeName__icontains=search) |
-                Q(applicationDate__icontains=search)
-            )
+        queryset = self.search(queryset, search)
 
-        total_count = queryset.count()
+        total_count = exact_count(queryset)
         return Response({'total_count': total_count})
 
     @action(detail=True, methods=['GET'])
@@ -4609,3 +3918,113 @@ class DailyEntryViewSet(viewsets.ModelViewSet):
                 'code': 0,
                 'message': f"Error processing deletion: {str(e)}"
             }, status=500)
+
+
+class ActivityLogViewSet(KeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ActivityLog.objects.all()
+    serializer_class = ActivityLogSerializer
+    permission_classes = [IsAuthenticated]
+    ordering_fields = ('created_at',)
+    listing_ordering = '-created_at'
+    listing_page_size = 50
+    listing_count = COUNT_NONE
+
+    def get_log_filters(self, request):
+        """entity_type, entity_id, user, action, since and until query parameters; raises ValueError"""
+        params = request.query_params
+        filters = {
+            'entity_type': params.get('entity_type') or None,
+            'entity_id': params.get('entity_id') or None,
+            'user_id': int(params['user']) if params.get('user') else None,
+            'action': params.get('action') or None,
+        }
+        for name in ('since', 'until'):
+            value = params.get(name)
+            moment = None
+            if value:
+                moment = parse_datetime(value)
+                if moment is None:
+                    day = parse_date(value)
+                    if day is None:
+                        raise ValueError(f"Invalid {name}: {value}")
+                    moment = datetime.combine(day, datetime.min.time())
+                if timezone.is_naive(moment):
+                    moment = timezone.make_aware(moment)
+            filters[name] = moment
+        return filters
+
+    def filter_logs(self, queryset, filters):
+        # Every filter maps onto the (entity_type, entity_id, created_at), (user, created_at)
+        # or created_at indexes; since/until also prune the monthly partitions
+        if filters['entity_type']:
+            queryset = queryset.filter(entity_type=filters['entity_type'])
+        if filters['entity_id']:
+            queryset = queryset.filter(entity_id=filters['entity_id'])
+        if filters['user_id'] is not None:
+            queryset = queryset.filter(user_id=filters['user_id'])
+        if filters['action']:
+            queryset = queryset.filter(action=filters['action'])
+        if filters['since']:
+            queryset = queryset.filter(created_at__gte=filters['since'])
+        if filters['until']:
+            queryset = queryset.filter(created_at__lte=filters['until'])
+        return queryset
+
+    @action(detail=False, methods=['GET'])
+    def listing(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+        try:
+            filters = self.get_log_filters(request)
+        except ValueError as e:
+            return Response({'code': 0, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self.listing_response(request, self.filter_logs(self.get_queryset(), filters))
+
+    @action(detail=False, methods=['GET'])
+    def history(self, request):
+        """State of one entity as of `at` (default now), rebuilt from its checkpoints and diffs"""
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+        entity_type = request.query_params.get('entity_type')
+        entity_id = request.query_params.get('entity_id')
+        if not entity_type or not entity_id:
+            return Response({'code': 0, 'message': "entity_type and entity_id are required"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        at = None
+        if request.query_params.get('at'):
+            at = parse_datetime(request.query_params['at'])
+            if at is None:
+                return Response({'code': 0, 'message': "Invalid at"}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+        state = reconstruct_entity(entity_type, entity_id, at=at)
+        if state is None:
+            return Response({'code': 0, 'message': "No audited state for this entity"},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response({'code': 1, 'data': state, 'message': "Retrieved Successfully"})
+
+    @action(detail=False, methods=['GET'])
+    def archive(self, request):
+        """Same filters as listing, answered from the archived months under MEDIA_ROOT, oldest first"""
+        user = request.user
+        if not user.is_authenticated:
+            return Response({'code': 0, 'message': "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
+        try:
+            filters = self.get_log_filters(request)
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = max(1, min(int(request.query_params.get('page_size', self.listing_page_size)),
+                                   self.listing_max_page_size))
+        except ValueError as e:
+            return Response({'code': 0, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        start = (page - 1) * page_size
+        rows = list(itertools.islice(iter_archived_logs(**filters), start, start + page_size + 1))
+        return Response({
+            'code': 1,
+            'data': rows[:page_size],
+            'current_page': page,
+            'has_next': len(rows) > page_size,
+            'message': "Retrieved Successfully",
+        })
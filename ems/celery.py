@@ -19,6 +19,22 @@ app.conf.beat_schedule = {
         'task': 'apis.tasks.fetch_daily_nav',
         'schedule': crontab(hour=10, minute=30),  # This will use Asia/Kolkata timezone
     },
+    'sync-nav-history': {
+        'task': 'apis.tasks.sync_nav_history',
+        'schedule': crontab(hour=23, minute=0),
+    },
+    'ensure-nav-partitions': {
+        'task': 'apis.tasks.ensure_nav_partitions',
+        'schedule': crontab(day_of_month=1, hour=2, minute=0),
+    },
+    'ensure-activity-log-partitions': {
+        'task': 'apis.tasks.ensure_activity_log_partitions',
+        'schedule': crontab(day_of_month=1, hour=2, minute=15),
+    },
+    'archive-activity-logs': {
+        'task': 'apis.tasks.archive_activity_logs',
+        'schedule': crontab(day_of_month=1, hour=3, minute=0),
+    },
 }
 
 
@@ -143,6 +143,25 @@ MIME_TYPES = {
     'pdf': 'application/pdf',
 }
 
+# Shared cache on the Redis instance used by Celery: listing counts and the
+# master-data lookups (apis/master_cache.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/2',
+        'KEY_PREFIX': 'ems',
+    }
+}
+MASTER_DATA_CACHE_SECONDS = 3600
+
+# Listings fail ('raise', use in tests) or log ('warn') when they run more queries than
+# their listing_query_budget (apis/query_planner.py); 'off' skips the count
+QUERY_BUDGET_MODE = 'off'
+
+# Host the AMFI NAV feeds are read from; point it at `manage.py amfi_standin` to ingest
+# offline (e.g. http://127.0.0.1:8765). Unset reads from AMFI.
+AMFI_FEED_BASE_URL = os.getenv('AMFI_FEED_BASE_URL')
+
 # Celery settings
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/1'
@@ -156,6 +175,8 @@ CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 # Optional: Routing tasks to different queues
 CELERY_TASK_ROUTES = {
     'apis.tasks.fetch_daily_nav': {'queue': 'nav_tasks'},
+    'apis.tasks.sync_nav_history': {'queue': 'nav_tasks'},
+    'apis.tasks.write_activity_logs': {'queue': 'audit'},
     # Add more tasks and queues as needed
 }
 
@@ -167,6 +188,17 @@ CELERY_QUEUES = {
 }
 
 
+# Activity log writer (apis/audit.py): 'buffered' bulk-writes from a background thread,
+# 'celery' hands batches to the audit queue, 'sync' saves inline (use in tests)
+ACTIVITY_LOG_MODE = 'buffered'
+ACTIVITY_LOG_BATCH_SIZE = 200
+ACTIVITY_LOG_FLUSH_MS = 500
+# UPDATE entries store a diff; every Nth update of an entity also stores its full state
+ACTIVITY_LOG_CHECKPOINT_EVERY = 20
+# Months kept in apis_activitylog; older ones are archived under MEDIA_ROOT/activity_log_archive
+ACTIVITY_LOG_RETENTION_MONTHS = 12
+
+
 # For Celery result backend (optional)
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/1'
 CELERY_CACHE_BACKEND = 'django-cache'